@@ -0,0 +1,101 @@
+"""
+Throughput del bot: órdenes secuenciales (execute_trade) vs execute_batch concurrente.
+
+Usa el FakeBroker con latencia y errores inyectados (503 transitorios) para medir
+órdenes por segundo y la latencia por orden (p50/p99, reintentos incluidos) con
+distintos tamaños de pool, sin red ni claves de Alpaca. El rate limit se desactiva
+para medir solo la concurrencia (con el límite real de 200 req/min manda el bucket).
+
+Uso:
+    python -m benchmarks.bench_bot_throughput
+    python -m benchmarks.bench_bot_throughput --orders 400 --latency 0.1 --error-rate 0.1
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.execution import bot as bot_module
+from src.execution.bot import TokenBucket, TradingBot
+from src.execution.broker import make_broker
+
+WORKERS = (1, 4, 8, 16)
+
+
+def synthetic_signals(n_orders: int) -> pd.DataFrame:
+    tickers = [f"T{i:04d}" for i in range(n_orders)]
+    return pd.DataFrame({"ticker": tickers, "signal": "BUY", "confidence": 0.9})
+
+
+def make_bot(signals, latency, jitter, error_rate, seed):
+    prices = dict.fromkeys(signals["ticker"], 100.0)
+    broker = make_broker(
+        "fake",
+        cash=1e12,
+        prices=prices,
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        seed=seed,
+    )
+    return TradingBot(client=broker)
+
+
+def summarize(name, report, elapsed):
+    latency_ms = report["latency_s"].to_numpy() * 1000
+    return {
+        "modo": name,
+        "órdenes/s": len(report) / elapsed,
+        "enviadas": int((report["status"] == "submitted").sum()),
+        "fallidas": int((report["status"] != "submitted").sum()),
+        "reintentos": int((report["attempts"] - 1).clip(lower=0).sum()),
+        "p50 ms": np.percentile(latency_ms, 50),
+        "p99 ms": np.percentile(latency_ms, 99),
+        "s total": elapsed,
+    }
+
+
+def run(n_orders=200, latency=0.05, jitter=0.02, error_rate=0.05, seed=42) -> pd.DataFrame:
+    signals = synthetic_signals(n_orders)
+    rows = []
+
+    bot = make_bot(signals, latency, jitter, error_rate, seed)
+    t0 = time.perf_counter()
+    report = pd.DataFrame(
+        [bot.execute_trade(r.ticker, r.signal, r.confidence) for r in signals.itertuples(index=False)]
+    )
+    rows.append(summarize("secuencial", report, time.perf_counter() - t0))
+
+    unlimited = TokenBucket(rate=1e9, capacity=1e9)
+    for workers in WORKERS:
+        bot = make_bot(signals, latency, jitter, error_rate, seed)
+        t0 = time.perf_counter()
+        report = bot.execute_batch(signals, max_workers=workers, rate_limiter=unlimited)
+        rows.append(summarize(f"batch x{workers}", report, time.perf_counter() - t0))
+    return pd.DataFrame(rows).set_index("modo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Segundos por llamada")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--backoff", type=float, default=0.05, help="Backoff inicial de reintento")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.CRITICAL)  # los fallos ya salen en la tabla
+    bot_module.RETRY_BACKOFF = args.backoff
+
+    print(
+        f"⏱️ {args.orders} órdenes, latencia {args.latency * 1000:.0f}+U(0, {args.jitter * 1000:.0f}) ms, "
+        f"{args.error_rate:.0%} de errores 503"
+    )
+    print(run(args.orders, args.latency, args.jitter, args.error_rate).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
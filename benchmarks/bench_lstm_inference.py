@@ -0,0 +1,76 @@
+"""
+Latencia de inferencia LSTM: `model.predict` (Keras) vs `TFLitePredictor`.
+
+Mide el costo por llamada de predecir una sola ventana (1, seq_length, F), el caso
+del dashboard y del bot, y el tiempo de carga de cada artefacto.
+
+Uso:
+    python -m benchmarks.bench_lstm_inference
+    python -m benchmarks.bench_lstm_inference --features 20 --calls 500
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+
+import tensorflow as tf  # noqa: E402
+
+from src.models.inference import TFLitePredictor  # noqa: E402
+from src.models.train_lstm import SEQ_LENGTH, build_lstm_model, export_tflite  # noqa: E402
+
+
+def run(n_features: int = 9, calls: int = 200, seq_length: int = SEQ_LENGTH) -> pd.DataFrame:
+    """Retorna tiempos de carga (ms) y latencia por llamada (ms) por backend."""
+    x = np.random.default_rng(42).random((1, seq_length, n_features), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        keras_path = Path(tmp) / "lstm.keras"
+        tflite_path = Path(tmp) / "lstm.tflite"
+        model = build_lstm_model((seq_length, n_features))
+        model.save(keras_path)
+        export_tflite(model, tflite_path, seq_length, n_features)
+
+        t0 = time.perf_counter()
+        keras_model = tf.keras.models.load_model(keras_path)
+        keras_load = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        predictor = TFLitePredictor(tflite_path)
+        tflite_load = time.perf_counter() - t0
+
+        cases = {
+            "keras model.predict": (keras_load, lambda: keras_model.predict(x, verbose=0)),
+            "keras model(x)": (keras_load, lambda: keras_model(x, training=False)),
+            "TFLitePredictor.predict": (tflite_load, lambda: predictor.predict(x)),
+        }
+        rows = []
+        for name, (load_s, fn) in cases.items():
+            fn()  # calentamiento
+            best = min(timeit.repeat(fn, number=calls, repeat=3)) / calls
+            rows.append({"backend": name, "carga (ms)": load_s * 1000, "latencia (ms)": best * 1000})
+
+    table = pd.DataFrame(rows).set_index("backend")
+    table["speedup vs predict"] = table["latencia (ms)"].iloc[0] / table["latencia (ms)"]
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--features", type=int, default=9)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"⏱️ Inferencia LSTM de una ventana ({args.features} features, {args.calls} llamadas)")
+    print(run(args.features, args.calls).round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
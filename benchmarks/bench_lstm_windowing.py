@@ -0,0 +1,88 @@
+"""
+Benchmark de ventanas LSTM: tensor 3D materializado vs ventanas perezosas (tf.data).
+
+Para cada (filas, seq_length) reporta la memoria del tensor (N, seq_length, F) que
+`fit` materializa a partir de `create_sequences`, la memoria pico del camino perezoso
+(array 2D + un batch de ventanas) y el mejor tiempo de recorrer una época completa.
+
+Uso:
+    python -m benchmarks.bench_lstm_windowing
+    python -m benchmarks.bench_lstm_windowing --rows 100000 --seq-lengths 10 60 120
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+
+from src.models.train_lstm import make_sequences, make_series_dataset  # noqa: E402
+
+DEFAULT_ROWS = [10_000, 100_000]
+DEFAULT_SEQ_LENGTHS = [10, 60, 120]
+N_FEATURES = 20
+BATCH_SIZE = 64
+
+
+def _epoch_seconds(iterable, repeat: int = 2) -> float:
+    """Mejor tiempo de recorrer el dataset completo (la primera pasada incluye el trazado)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in iterable:
+            pass
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(rows=DEFAULT_ROWS, seq_lengths=DEFAULT_SEQ_LENGTHS, n_features=N_FEATURES) -> pd.DataFrame:
+    import tensorflow as tf
+
+    results = []
+    rng = np.random.default_rng(42)
+    for n_rows in rows:
+        data = rng.random((n_rows, n_features), dtype=np.float32)
+        target = rng.integers(0, 2, n_rows).astype(np.float32)
+        for seq_length in seq_lengths:
+            # Camino materializado: Keras convierte la vista en un tensor contiguo
+            X_seq, y_seq = make_sequences(data, target, seq_length)
+            eager = tf.data.Dataset.from_tensor_slices(
+                (np.ascontiguousarray(X_seq), y_seq)
+            ).batch(BATCH_SIZE)
+            eager_mb = X_seq.size * X_seq.itemsize / 1e6
+            eager_s = _epoch_seconds(eager)
+            del eager
+
+            lazy = make_series_dataset(data, target, seq_length, batch_size=BATCH_SIZE)
+            lazy_mb = (data.nbytes + BATCH_SIZE * seq_length * n_features * 4) / 1e6
+            lazy_s = _epoch_seconds(lazy)
+
+            results.append(
+                {
+                    "filas": n_rows,
+                    "seq_length": seq_length,
+                    "materializado (MB)": eager_mb,
+                    "perezoso (MB)": lazy_mb,
+                    "materializado (s/época)": eager_s,
+                    "perezoso (s/época)": lazy_s,
+                }
+            )
+    return pd.DataFrame(results).set_index(["filas", "seq_length"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--seq-lengths", type=int, nargs="+", default=DEFAULT_SEQ_LENGTHS)
+    parser.add_argument("--features", type=int, default=N_FEATURES)
+    args = parser.parse_args()
+
+    print(f"⏱️ Ventanas LSTM ({args.features} features, batch {BATCH_SIZE})")
+    print(run(args.rows, args.seq_lengths, args.features).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
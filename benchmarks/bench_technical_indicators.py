@@ -0,0 +1,80 @@
+"""
+Microbenchmark de los kernels de indicadores técnicos.
+
+Mide cada indicador sobre series OHLCV sintéticas de 5k, 50k y 500k filas para
+detectar regresiones de rendimiento. Reporta el mejor tiempo (ms) de N repeticiones.
+
+Uso:
+    python -m benchmarks.bench_technical_indicators
+    python -m benchmarks.bench_technical_indicators --sizes 5000 50000 --repeat 3
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from src.features import technical_indicators as ti
+
+DEFAULT_SIZES = [5_000, 50_000, 500_000]
+
+
+def make_ohlcv(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Genera un random walk OHLCV reproducible (índice por minuto para admitir 500k filas)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_rows)))
+    spread = rng.uniform(0, 0.02, n_rows)
+    return pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.002, n_rows)),
+            "High": close * (1 + spread),
+            "Low": close * (1 - spread),
+            "Close": close,
+            "Volume": rng.integers(1e5, 1e7, n_rows).astype(float),
+        },
+        index=pd.date_range("2000-01-01", periods=n_rows, freq="min"),
+    )
+
+
+def build_cases(df: pd.DataFrame) -> dict:
+    high, low, close, volume = df["High"], df["Low"], df["Close"], df["Volume"]
+    return {
+        "atr": lambda: ti.calculate_atr(high, low, close),
+        "obv": lambda: ti.calculate_obv(close, volume),
+        "stochastic": lambda: ti.calculate_stochastic(high, low, close),
+        "adx": lambda: ti.calculate_adx(high, low, close),
+        "rolling_zscore": lambda: ti.calculate_rolling_zscore(close),
+        "vwap_features": lambda: ti.calculate_vwap_features(high, low, close, volume),
+        "multi_horizon_returns": lambda: ti.calculate_multi_horizon_returns(close),
+        "add_technical_features[extended]": lambda: ti.add_technical_features(
+            df, extended=True
+        ),
+    }
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = 5) -> pd.DataFrame:
+    """Ejecuta el benchmark y retorna una tabla (kernel x filas) en milisegundos."""
+    results = {}
+    for n_rows in sizes:
+        cases = build_cases(make_ohlcv(n_rows))
+        for name, fn in cases.items():
+            best = min(timeit.repeat(fn, number=1, repeat=repeat))
+            results.setdefault(name, {})[n_rows] = best * 1000
+    table = pd.DataFrame(results).T
+    table.columns = [f"{n:,} filas (ms)" for n in table.columns]
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"⏱️ Benchmark de indicadores técnicos (mejor de {args.repeat})")
+    print(run(args.sizes, args.repeat).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
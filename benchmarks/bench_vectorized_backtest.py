@@ -0,0 +1,110 @@
+"""
+Backtesting: `cerebro.run()` de backtrader vs el motor vectorizado.
+
+Verifica que ambos den el mismo valor final sobre la estrategia actual
+(`MLStrategy`) y mide cuántas combinaciones de parámetros por segundo evalúa el
+barrido vectorizado (umbral de compra x offset de venta x holding).
+
+Uso:
+    python -m benchmarks.bench_vectorized_backtest
+    python -m benchmarks.bench_vectorized_backtest --years 10 --thresholds 100
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from src.backtesting.strategy import MLStrategy
+from src.backtesting.vectorized import (
+    COMMISSION,
+    START_CASH,
+    momentum_signals,
+    positions_from_signals,
+    run_vectorized,
+    sweep_thresholds,
+)
+
+HOLDINGS = (None, 1, 5, 10, 20)
+
+
+def synthetic_prices(n_bars: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.002, n_bars))
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.002,
+            "low": np.minimum(open_, close) * 0.998,
+            "close": close,
+            "volume": 1000,
+        },
+        index=pd.bdate_range("2015-01-01", periods=n_bars),
+    )
+
+
+def run_cerebro(df: pd.DataFrame) -> float:
+    cerebro = bt.Cerebro()
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.addstrategy(MLStrategy)
+    cerebro.broker.setcash(START_CASH)
+    cerebro.broker.setcommission(commission=COMMISSION)
+    with contextlib.redirect_stdout(io.StringIO()):  # la estrategia loguea cada orden
+        cerebro.run()
+    return cerebro.broker.getvalue()
+
+
+def run(years: int = 5, n_thresholds: int = 50, n_offsets: int = 20) -> pd.DataFrame:
+    df = synthetic_prices(252 * years)
+    open_, close = df["open"].to_numpy(), df["close"].to_numpy()
+
+    t0 = time.perf_counter()
+    cerebro_value = run_cerebro(df)
+    cerebro_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    entries, exits = momentum_signals(close)
+    vector_value = run_vectorized(open_, close, positions_from_signals(entries, exits))[
+        "final_value"
+    ][0]
+    vector_s = time.perf_counter() - t0
+
+    prob = np.random.default_rng(0).uniform(0, 1, len(df))
+    t0 = time.perf_counter()
+    table = sweep_thresholds(
+        open_,
+        close,
+        prob,
+        np.linspace(0.5, 0.7, n_thresholds),
+        np.linspace(0.0, 0.2, n_offsets),
+        HOLDINGS,
+    )
+    sweep_s = time.perf_counter() - t0
+
+    return pd.DataFrame(
+        [
+            {"motor": "backtrader", "combinaciones": 1, "valor final": cerebro_value, "s": cerebro_s},
+            {"motor": "vectorizado", "combinaciones": 1, "valor final": vector_value, "s": vector_s},
+            {"motor": "vectorizado (barrido)", "combinaciones": len(table), "valor final": np.nan, "s": sweep_s},
+        ]
+    ).assign(**{"combinaciones/s": lambda t: t["combinaciones"] / t["s"]}).set_index("motor")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--thresholds", type=int, default=50)
+    parser.add_argument("--offsets", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"⏱️ Backtest de {args.years} años ({252 * args.years} barras)")
+    print(run(args.years, args.thresholds, args.offsets).round(4).to_string())
+
+
+if __name__ == "__main__":
+    main()
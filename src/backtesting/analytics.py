@@ -0,0 +1,232 @@
+"""
+Métricas de desempeño de backtests, vectorizadas con NumPy.
+
+Las mismas funciones sirven para cualquier motor:
+- `summarize(value, exposure, turnover, trade_returns, trade_cols)`: núcleo sobre
+  la curva de equity (n,) o (n, k) -> retorno total, CAGR, volatilidad, Sharpe,
+  Sortino, drawdown máximo, exposición, turnover anualizado y hit rate de trades.
+- Adaptadores: `vectorized_metrics` (resultado de `run_vectorized`),
+  `portfolio_metrics` (resultado de `run_portfolio`) y `backtrader_metrics`
+  (estrategia corrida con el analyzer `EquityRecorder` de strategy.py).
+- `rolling_metrics(value, window)`: retorno, volatilidad y Sharpe móviles y
+  drawdown de una corrida, con sumas acumuladas (sin `rolling().apply`).
+- `compact_table(df)`: tabla de resultados en tipos compactos (float32 /
+  category) para guardar miles de corridas en Parquet y compararlas sin re-correr.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting.vectorized import COMMISSION, STAKE
+
+TRADING_DAYS = 252
+ROLLING_WINDOW = 63  # ~3 meses de sesiones
+
+METRICS = (
+    "total_return",
+    "cagr",
+    "volatility",
+    "sharpe",
+    "sortino",
+    "max_drawdown",
+    "exposure",
+    "turnover",
+    "n_round_trips",
+    "hit_rate",
+    "avg_trade_return",
+)
+
+
+def _as_2d(a):
+    a = np.asarray(a, dtype=np.float64)
+    return a[:, None] if a.ndim == 1 else a
+
+
+def _returns(value):
+    """Retornos simples barra a barra de una curva (n, k)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nan_to_num(value[1:] / value[:-1] - 1, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def drawdown(value) -> np.ndarray:
+    """Caída desde el máximo previo en cada barra (0 = en máximos)."""
+    value = np.asarray(value, dtype=np.float64)
+    return 1 - value / np.maximum.accumulate(value, axis=0)
+
+
+def trade_returns(open_, position, commission=COMMISSION):
+    """
+    Retorno neto de comisiones de cada trade cerrado (entrada y salida al open), a
+    partir de la posición vigente por barra (n,) o (n, k). Retorna (returns, cols):
+    el retorno de cada trade y la columna a la que pertenece. Las posiciones aún
+    abiertas al final no cuentan (como el `TradeAnalyzer` de backtrader).
+    """
+    held = _as_2d(position) != 0
+    prices = np.broadcast_to(_as_2d(open_), held.shape)
+    change = np.diff(held.astype(np.int8), axis=0, prepend=0).T  # +1 entrada, -1 salida
+
+    # Eventos ordenados por columna y luego por barra: entradas y salidas alternan
+    cols, rows = np.nonzero(change)
+    kind = change[cols, rows]
+    entry = np.flatnonzero(kind == 1)
+    exit_ = entry + 1
+    closed = exit_ < len(kind)
+    closed[closed] &= cols[exit_[closed]] == cols[entry[closed]]
+    entry, exit_ = entry[closed], exit_[closed]
+
+    entry_price = prices[rows[entry], cols[entry]]
+    exit_price = prices[rows[exit_], cols[exit_]]
+    returns = (exit_price * (1 - commission) - entry_price * (1 + commission)) / entry_price
+    return returns, cols[entry]
+
+
+def summarize(value, exposure=None, turnover=None, trade_rets=None, trade_cols=None) -> dict:
+    """
+    Métricas de una o varias corridas.
+    - value: curva de equity (n,) o (n, k).
+    - exposure: fracción del valor invertida en cada barra (mismo shape).
+    - turnover: valor operado en cada barra como fracción del valor (mismo shape).
+    - trade_rets / trade_cols: retornos de trades cerrados y su columna (`trade_returns`).
+    Retorna un dict de floats (entrada 1D) o de arrays (k,).
+    """
+    one_run = np.ndim(value) == 1
+    value = _as_2d(value)
+    n, k = value.shape
+    returns = _returns(value)
+
+    mean = returns.mean(axis=0) if n > 1 else np.zeros(k)
+    std = returns.std(axis=0, ddof=1) if n > 2 else np.zeros(k)
+    downside = np.sqrt((np.minimum(returns, 0) ** 2).mean(axis=0)) if n > 1 else np.zeros(k)
+    total = value[-1] / value[0] - 1
+    years = max(n - 1, 1) / TRADING_DAYS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), 0.0)
+        sortino = np.where(downside > 0, mean / downside * np.sqrt(TRADING_DAYS), 0.0)
+        cagr = np.where(value[-1] > 0, (value[-1] / value[0]) ** (1 / years) - 1, -1.0)
+
+    metrics = {
+        "total_return": total,
+        "cagr": cagr,
+        "volatility": std * np.sqrt(TRADING_DAYS),
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "max_drawdown": drawdown(value).max(axis=0),
+        "exposure": _as_2d(exposure).mean(axis=0) if exposure is not None else np.full(k, np.nan),
+        "turnover": (
+            _as_2d(turnover).mean(axis=0) * TRADING_DAYS if turnover is not None else np.full(k, np.nan)
+        ),
+    }
+
+    # Trades: conteo, aciertos y retorno medio por columna con bincount
+    if trade_rets is None:
+        metrics.update(
+            n_round_trips=np.zeros(k, dtype=np.int64),
+            hit_rate=np.full(k, np.nan),
+            avg_trade_return=np.full(k, np.nan),
+        )
+    else:
+        trade_rets = np.asarray(trade_rets, dtype=np.float64)
+        trade_cols = np.zeros(len(trade_rets), dtype=np.int64) if trade_cols is None else trade_cols
+        count = np.bincount(trade_cols, minlength=k)
+        wins = np.bincount(trade_cols, weights=trade_rets > 0, minlength=k)
+        sums = np.bincount(trade_cols, weights=trade_rets, minlength=k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            metrics.update(
+                n_round_trips=count,
+                hit_rate=np.where(count > 0, wins / count, np.nan),
+                avg_trade_return=np.where(count > 0, sums / count, np.nan),
+            )
+
+    if one_run:
+        return {key: float(v[0]) if key != "n_round_trips" else int(v[0]) for key, v in metrics.items()}
+    return metrics
+
+
+def vectorized_metrics(result, open_, close, stake=STAKE, commission=COMMISSION) -> dict:
+    """Métricas de un resultado de `run_vectorized`: arrays (k,), una entrada por columna."""
+    value = result["value"]
+    held = result["position"].astype(np.float64)
+    open_, close = _as_2d(open_), _as_2d(close)
+    traded = np.abs(np.diff(held, axis=0, prepend=0.0)) * stake * open_
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exposure = held * stake * close / value
+        turnover = traded / value
+    rets, cols = trade_returns(open_, held, commission)
+    return summarize(value, exposure, turnover, rets, cols)
+
+
+def portfolio_metrics(result, open_, commission=COMMISSION) -> dict:
+    """
+    Métricas de un resultado de `run_portfolio`; un trade es cada tramo continuo con
+    peso > 0 en un ticker.
+    """
+    rets, cols = trade_returns(open_, result["weights"] > 0, commission)
+    # Todas las posiciones del portafolio cuentan para un único conjunto de trades
+    return summarize(result["value"], result["exposure"], result["turnover"], rets, np.zeros_like(cols))
+
+
+def backtrader_metrics(strategy, analyzer="equity") -> dict:
+    """Métricas de una estrategia corrida con `EquityRecorder` (`cerebro.addanalyzer(..., _name=analyzer)`)."""
+    record = getattr(strategy.analyzers, analyzer).get_analysis()
+    return summarize(
+        np.asarray(record["value"], dtype=np.float64),
+        np.asarray(record["exposure"], dtype=np.float64),
+        np.asarray(record["turnover"], dtype=np.float64),
+        np.asarray(record["trade_returns"], dtype=np.float64),
+    )
+
+
+def rolling_metrics(value, window=ROLLING_WINDOW) -> pd.DataFrame:
+    """
+    Retorno de cada ventana móvil de `window` barras, volatilidad y Sharpe
+    anualizados sobre la misma ventana, y drawdown, para una curva de equity
+    (Series o array 1D).
+    """
+    index = value.index if isinstance(value, pd.Series) else None
+    value = np.asarray(value, dtype=np.float64)
+    returns = np.concatenate([[0.0], _returns(value[:, None])[:, 0]])
+
+    # Sumas acumuladas: media y varianza de cada ventana en O(n)
+    csum = np.concatenate([[0.0], np.cumsum(returns)])
+    csq = np.concatenate([[0.0], np.cumsum(returns**2)])
+    mean = np.full(len(value), np.nan)
+    var = np.full(len(value), np.nan)
+    if len(value) >= window > 1:
+        s = csum[window:] - csum[:-window]
+        sq = csq[window:] - csq[:-window]
+        mean[window - 1 :] = s / window
+        var[window - 1 :] = np.maximum(sq - s**2 / window, 0.0) / (window - 1)
+    std = np.sqrt(var)
+
+    window_return = np.full(len(value), np.nan)
+    if len(value) > window:
+        window_return[window:] = value[window:] / value[:-window] - 1
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), np.where(np.isnan(std), np.nan, 0.0))
+    return pd.DataFrame(
+        {
+            "rolling_return": window_return,
+            "rolling_volatility": std * np.sqrt(TRADING_DAYS),
+            "rolling_sharpe": sharpe,
+            "drawdown": drawdown(value),
+        },
+        index=index,
+    )
+
+
+def compact_table(df: pd.DataFrame, keep=()) -> pd.DataFrame:
+    """
+    Tabla de resultados con tipos compactos para Parquet: float32 para las métricas y
+    category para textos repetidos. Las columnas de `keep` quedan intactas.
+    """
+    out = df.copy()
+    for col in out.columns:
+        if col in keep:
+            continue
+        series = out[col]
+        if pd.api.types.is_float_dtype(series):
+            out[col] = series.astype(np.float32)
+        elif series.dtype == object and series.nunique(dropna=True) <= max(len(series) // 2, 1):
+            out[col] = series.astype("category")
+    return out
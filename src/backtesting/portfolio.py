@@ -0,0 +1,214 @@
+"""
+Backtest de portafolio multi-activo con asignación cross-sectional.
+
+Todo el universo se simula a la vez sobre matrices fechas x tickers (sin un objeto
+estrategia por activo):
+
+1. Señales: P(sube) por ticker -> long / flat con los mismos umbrales de confianza
+   que el bot (`positions_from_signals` sobre todas las columnas).
+2. Pesos objetivo por fecha (`target_weights`): igual peso, proporcional a la
+   confianza o proporcional con tope por activo; lo no asignado queda en caja.
+3. Rebalanceo diario (`run_portfolio`): los pesos decididos al cierre de t se
+   operan al open de t+1 sobre una única caja compartida; el costo de transacción
+   es `commission` x turnover (suma de |peso objetivo - peso derivado|).
+
+El valor se compone open a open con un `cumprod` y se valúa al cierre de cada día,
+igual que el motor vectorizado de un solo activo.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting.analytics import summarize
+from src.backtesting.sweep import TICKERS, probability_bounds
+from src.backtesting.vectorized import COMMISSION, START_CASH, positions_from_signals
+
+WEIGHTINGS = ("equal", "confidence", "capped")
+MAX_WEIGHT = 0.10  # tope por activo del esquema "capped"
+
+
+def long_positions(prob, threshold=0.0) -> np.ndarray:
+    """
+    Long (1) / flat (0) por fecha y ticker: se entra con P > 0.5 + umbral/2 y se sale
+    con P <= 0.5 - umbral/2 (umbral de confianza, como en el bot).
+    """
+    prob = np.asarray(prob, dtype=np.float64)
+    buy, sell = probability_bounds(threshold)
+    return positions_from_signals(prob > buy, prob <= sell)
+
+
+def target_weights(long, confidence=None, scheme="equal", max_weight=MAX_WEIGHT) -> np.ndarray:
+    """
+    Pesos objetivo (fechas x tickers) entre los activos en long. Suman <= 1; el resto
+    es caja.
+    - equal: 1 / n_long.
+    - confidence: proporcional a la confianza (|p - 0.5| * 2).
+    - capped: como confidence pero con tope `max_weight` por activo (el excedente
+      queda en caja).
+    """
+    if scheme not in WEIGHTINGS:
+        raise ValueError(f"scheme debe ser uno de {WEIGHTINGS}, no '{scheme}'")
+    long = np.asarray(long, dtype=np.float64)
+
+    if scheme == "equal":
+        raw = long
+    else:
+        if confidence is None:
+            raise ValueError(f"El esquema '{scheme}' requiere la confianza")
+        # Piso pequeño: un activo en long con confianza ~0 conserva algo de peso
+        raw = long * np.maximum(np.nan_to_num(np.asarray(confidence, dtype=np.float64)), 1e-6)
+
+    total = raw.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(total > 0, raw / total, 0.0)
+    if scheme == "capped":
+        weights = np.minimum(weights, max_weight)
+    return weights
+
+
+def run_portfolio(open_, close, weights, cash=START_CASH, commission=COMMISSION) -> dict:
+    """
+    Simula el portafolio para `weights` (fechas x tickers, decididos al cierre).
+    Retorna la curva de valor al cierre, los pesos vigentes, turnover y costos por día.
+    """
+    open_ = np.asarray(open_, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    target = np.asarray(weights, dtype=np.float64)
+
+    # Sin precio (activo no listado aún / ya deslistado) no hay posición posible
+    tradable = np.isfinite(open_) & np.isfinite(close)
+    target = np.where(tradable, target, 0.0)
+
+    # Pesos vigentes desde el open de t: los decididos al cierre de t-1
+    held = np.zeros_like(target)
+    held[1:] = target[:-1]
+    held = np.where(tradable, held, 0.0)
+
+    # Retornos open->open (para componer) y open->close (para valuar al cierre)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret_oo = np.zeros_like(open_)
+        ret_oo[:-1] = open_[1:] / open_[:-1] - 1
+        ret_oc = close / open_ - 1
+    ret_oo = np.nan_to_num(ret_oo, nan=0.0, posinf=0.0, neginf=0.0)
+    ret_oc = np.nan_to_num(ret_oc, nan=0.0, posinf=0.0, neginf=0.0)
+
+    # Pesos derivados por el mercado justo antes del rebalanceo del open de t
+    period_ret = (held * ret_oo).sum(axis=1)
+    drifted = np.zeros_like(held)
+    drifted[1:] = held[:-1] * (1 + ret_oo[:-1]) / (1 + period_ret[:-1, None])
+
+    turnover = np.abs(held - drifted).sum(axis=1)
+    costs = commission * turnover  # fracción del valor pagada en comisiones
+
+    # Valor al open de t (después de costos) y valuación al cierre de t
+    growth = (1 - costs) * np.concatenate([[1.0], 1 + period_ret[:-1]])
+    value_open = cash * np.cumprod(growth)
+    value_close = value_open * (1 + (held * ret_oc).sum(axis=1))
+
+    return {
+        "value": value_close,
+        "weights": held,
+        "turnover": turnover,
+        "costs": costs * value_open / (1 - costs),
+        "exposure": held.sum(axis=1),
+    }
+
+
+def portfolio_backtest(
+    open_: pd.DataFrame,
+    close: pd.DataFrame,
+    prob: pd.DataFrame,
+    scheme="equal",
+    threshold=0.0,
+    max_weight=MAX_WEIGHT,
+    cash=START_CASH,
+    commission=COMMISSION,
+) -> pd.DataFrame:
+    """
+    Backtest de portafolio sobre paneles fechas x tickers alineados (mismo índice y
+    columnas). Retorna un DataFrame diario con value, exposure, turnover y costs.
+    """
+    prob = prob.reindex(index=close.index, columns=close.columns)
+    open_ = open_.reindex(index=close.index, columns=close.columns)
+    p = prob.to_numpy(dtype=np.float64)
+    long = long_positions(p, threshold)
+    weights = target_weights(long, np.abs(p - 0.5) * 2, scheme, max_weight)
+    result = run_portfolio(open_.to_numpy(), close.to_numpy(), weights, cash, commission)
+    return pd.DataFrame(
+        {
+            "value": result["value"],
+            "exposure": result["exposure"],
+            "turnover": result["turnover"],
+            "costs": result["costs"],
+        },
+        index=close.index,
+    )
+
+
+def load_panels(tickers, model_type="LSTM", gold_path=None, models_dir="models"):
+    """
+    Paneles open / close / prob (fechas x tickers) desde el Dataset Maestro y los modelos.
+    Los tickers que no se pueden cargar o puntuar se omiten con un aviso.
+    """
+    from src.backtesting.strategy import (
+        load_backtest_data,
+        load_strategy_model,
+        precompute_probabilities,
+    )
+
+    opens, closes, probs = {}, {}, {}
+    for ticker in tickers:
+        try:
+            df = load_backtest_data(ticker, gold_path)
+            model, scaler = load_strategy_model(ticker, model_type, models_dir)
+            if df is None or model is None:
+                print(f"⚠️ Sin datos o modelo para {ticker}, se omite.")
+                continue
+            # p. ej. solo precios crudos: el scaler rechaza las features que faltan
+            prob = precompute_probabilities(model, scaler, df, model_type)
+        except Exception as e:
+            print(f"⚠️ Error al puntuar {ticker} ({type(e).__name__}: {e}), se omite.")
+            continue
+        opens[ticker], closes[ticker] = df["Open"], df["Close"]
+        probs[ticker] = pd.Series(prob, index=df.index)
+    return pd.DataFrame(opens), pd.DataFrame(closes), pd.DataFrame(probs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest de portafolio multi-activo")
+    parser.add_argument("--tickers", nargs="+", default=TICKERS)
+    parser.add_argument("--model-type", choices=("LSTM", "SVM"), default="LSTM")
+    parser.add_argument("--scheme", choices=WEIGHTINGS, default="equal")
+    parser.add_argument("--threshold", type=float, default=0.0)
+    parser.add_argument("--max-weight", type=float, default=MAX_WEIGHT)
+    parser.add_argument("--commission", type=float, default=COMMISSION)
+    args = parser.parse_args([] if argv is None else argv)
+
+    open_, close, prob = load_panels(args.tickers, args.model_type)
+    if close.empty:
+        print("❌ No hay tickers con datos y modelo.")
+        return None
+
+    t0 = time.perf_counter()
+    daily = portfolio_backtest(
+        open_, close, prob, args.scheme, args.threshold, args.max_weight, commission=args.commission
+    )
+    elapsed = time.perf_counter() - t0
+    print(f"💼 Portafolio {args.scheme} ({close.shape[1]} tickers, {len(close)} días) en {elapsed:.3f}s")
+    print(f"Valor Inicial del Portafolio: {START_CASH:.2f}")
+    print(f"Valor Final del Portafolio: {daily['value'].iloc[-1]:.2f}")
+    metrics = summarize(daily["value"].to_numpy(), daily["exposure"], daily["turnover"])
+    print(
+        f"📊 Sharpe: {metrics['sharpe']:.2f} | Sortino: {metrics['sortino']:.2f} | "
+        f"Max DD: {metrics['max_drawdown']:.2%} | Exposición: {metrics['exposure']:.2%} | "
+        f"Turnover anual: {metrics['turnover']:.2f}x | Costos: {daily['costs'].sum():.2f}"
+    )
+    return daily
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
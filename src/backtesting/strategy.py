@@ -5,10 +5,139 @@ import tensorflow as tf
 import numpy as np
 from datetime import datetime
 import os
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.backtesting.analytics import backtrader_metrics
+from src.features.dataset import PRICE_COLS, feature_columns, feature_matrix
+from src.models.inference import TFLitePredictor
 
 # Configuración
 TICKER = "TSLA"  # Probemos con tu mejor modelo
 MODEL_TYPE = "LSTM"  # O "SVM"
+SEQ_LEN = 10
+GOLD_PATH = "data/gold/master_dataset_{ticker}.parquet"  # precios + features
+PRICES_PATH = "data/raw/prices/{ticker}_latest.parquet"  # respaldo: solo precios
+PROB_LINE = "prob"
+
+
+def make_feed_class(feature_names):
+    """
+    Subclase de `PandasData` con una línea por feature del Dataset Maestro más la
+    probabilidad precalculada del modelo (`prob`). OHLCV van en las líneas estándar.
+    """
+    extra = [
+        name
+        for name in feature_names
+        if name not in PRICE_COLS and name != PROB_LINE and name.isidentifier()
+    ]
+    lines = tuple(extra) + (PROB_LINE,)
+    # -1: backtrader busca la columna por nombre (sin distinguir mayúsculas)
+    params = tuple((name, -1) for name in lines)
+    return type(
+        "MasterDatasetFeed",
+        (bt.feeds.PandasData,),
+        {"lines": lines, "params": params, "feature_names": tuple(extra)},
+    )
+
+
+def precompute_probabilities(model, scaler, df, model_type=MODEL_TYPE, seq_len=SEQ_LEN):
+    """
+    P(sube mañana) para cada barra en UNA llamada batch al modelo, con las mismas
+    features del entrenamiento (src/features/dataset.py). Las barras sin historia
+    suficiente quedan en NaN.
+    """
+    probs = np.full(len(df), np.nan)
+    if model_type.upper() == "SVM":
+        X = scaler.transform(feature_matrix(df, feature_columns(df.columns, "svm")))
+        valid = np.isfinite(X).all(axis=1)
+        if valid.any():
+            margin = np.asarray(model.decision_function(X[valid]), dtype=float)
+            probs[valid] = 1.0 / (1.0 + np.exp(-margin))
+        return probs
+
+    if len(df) < seq_len:
+        return probs
+    X = scaler.transform(feature_matrix(df, feature_columns(df.columns, "lstm")))
+    # Ventana terminada en cada barra t (vista, sin copiar): (n - seq_len + 1, seq_len, F)
+    windows = sliding_window_view(X, seq_len, axis=0).transpose(0, 2, 1)
+    valid = np.isfinite(windows).all(axis=(1, 2))
+    if valid.any():
+        out = model.predict(np.ascontiguousarray(windows[valid], dtype=np.float32), verbose=0)
+        probs[seq_len - 1 :][valid] = np.asarray(out, dtype=float).ravel()
+    return probs
+
+
+def load_strategy_model(ticker=TICKER, model_type=MODEL_TYPE, models_dir="models"):
+    """(modelo, scaler) entrenados del ticker, o (None, None) si no hay artefactos."""
+    try:
+        if model_type.upper() == "SVM":
+            return (
+                joblib.load(os.path.join(models_dir, f"svm_{ticker}.pkl")),
+                joblib.load(os.path.join(models_dir, f"scaler_{ticker}.pkl")),
+            )
+        scaler = joblib.load(os.path.join(models_dir, f"scaler_lstm_{ticker}.pkl"))
+        tflite_path = os.path.join(models_dir, f"lstm_{ticker}.tflite")
+        if os.path.exists(tflite_path):
+            return TFLitePredictor(tflite_path), scaler
+        return tf.keras.models.load_model(os.path.join(models_dir, f"lstm_{ticker}.keras")), scaler
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar el modelo {model_type} de {ticker}: {e}")
+        return None, None
+
+
+def load_backtest_data(ticker=TICKER, gold_path=None, prices_path=None):
+    """Dataset Maestro (Gold) del ticker; si no está local, solo los precios crudos."""
+    for pattern in (gold_path or GOLD_PATH, prices_path or PRICES_PATH):
+        path = pattern.format(ticker=ticker)
+        if os.path.exists(path):
+            df = pd.read_parquet(path)
+            if "Date" in df.columns:
+                df.index = pd.to_datetime(df["Date"])  # Asegurar índice de fecha
+            return df
+    return None
+
+
+class EquityRecorder(bt.Analyzer):
+    """
+    Registra por barra el valor del portafolio, la exposición (posición valuada / valor)
+    y el turnover (valor operado / valor), y el retorno neto de cada trade cerrado.
+    `analytics.backtrader_metrics` calcula las métricas a partir de este registro.
+    """
+
+    def start(self):
+        self.value, self.exposure, self.turnover, self.trade_returns = [], [], [], []
+        self._traded = 0.0
+        self._entry_value = {}
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self._traded += abs(order.executed.size * order.executed.price)
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self._entry_value[trade.ref] = abs(trade.value)
+        elif trade.isclosed:
+            entry_value = self._entry_value.pop(trade.ref, 0.0)
+            if entry_value > 0:
+                self.trade_returns.append(trade.pnlcomm / entry_value)
+
+    def next(self):
+        value = self.strategy.broker.getvalue()
+        invested = sum(
+            self.strategy.getposition(data).size * data.close[0] for data in self.strategy.datas
+        )
+        self.value.append(value)
+        self.exposure.append(invested / value if value else 0.0)
+        self.turnover.append(self._traded / value if value else 0.0)
+        self._traded = 0.0
+
+    def get_analysis(self):
+        return {
+            "value": self.value,
+            "exposure": self.exposure,
+            "turnover": self.turnover,
+            "trade_returns": self.trade_returns,
+        }
 
 
 class MLStrategy(bt.Strategy):
@@ -17,6 +146,8 @@ class MLStrategy(bt.Strategy):
         ("scaler", None),
         ("model_type", "LSTM"),
         ("seq_len", 10),  # Debe coincidir con SEQ_LENGTH del entrenamiento
+        ("threshold", 0.5),  # P(sube) mínima para comprar
+        ("sell_threshold", None),  # P(sube) máxima para vender (None: igual a threshold)
     )
 
     def __init__(self):
@@ -25,8 +156,12 @@ class MLStrategy(bt.Strategy):
         self.buyprice = None
         self.buycomm = None
 
-        # Historial para crear secuencias LSTM
-        self.data_history = []
+        # Probabilidad precalculada del modelo (feed de make_feed_class), si existe
+        self.prob = getattr(self.datas[0].lines, PROB_LINE, None)
+        self.feature_names = list(getattr(self.datas[0], "feature_names", ()))
+        self.sell_threshold = (
+            self.p.threshold if self.p.sell_threshold is None else self.p.sell_threshold
+        )
 
     def notify_order(self, order):
         if order.status in [order.Submitted, order.Accepted]:
@@ -50,14 +185,8 @@ class MLStrategy(bt.Strategy):
         print(f"{dt.isoformat()} {txt}")
 
     def get_features(self):
-        # En una implementación real, aquí reconstruiríamos TODOS los indicadores (RSI, MACD, Sentiment).
-        # Para este MVP, usaremos el 'Close' crudo simulando que es la única feature,
-        # SOLO para probar que el motor de Backtrader gira.
-        # (Nota: Esto simplifica la realidad, ya que tu modelo espera 17 features)
-
-        # Hack para tesis: Le pasaremos al modelo datos Dummy si no tenemos las features en tiempo real en backtrader
-        # Ojo: Para hacerlo estricto, deberíamos cargar el CSV "Master Dataset" en Backtrader con todas las columnas.
-        pass
+        """Valores de las features del Dataset Maestro en la barra actual."""
+        return np.array([getattr(self.datas[0].lines, name)[0] for name in self.feature_names])
 
     def next(self):
         # Simulación simple: Si el modelo dice "Subirá", compramos.
@@ -67,6 +196,23 @@ class MLStrategy(bt.Strategy):
         if self.order:
             return
 
+        # Señal del modelo precalculada: next() solo lee la línea
+        if self.prob is not None:
+            prob = self.prob[0]
+            if np.isnan(prob):
+                return
+            if not self.position and prob > self.p.threshold:
+                self.log(f"SEÑAL DE COMPRA (Modelo): p={prob:.2f}")
+                self.order = self.buy()
+            elif self.position and prob <= self.sell_threshold:
+                self.log(f"SEÑAL DE VENTA (Modelo): p={prob:.2f}")
+                self.order = self.sell()
+            return
+
+        # En la primera barra dataclose[-1] no existe (backtrader devuelve el último close de la serie)
+        if len(self) < 2:
+            return
+
         # Lógica de Trading (Placeholder para probar el motor)
         if not self.position:
             if self.dataclose[0] > self.dataclose[-1]:  # Si sube hoy
@@ -78,58 +224,79 @@ class MLStrategy(bt.Strategy):
                 self.order = self.sell()
 
 
-def run_backtest():
+def run_backtest(ticker=TICKER, model_type=MODEL_TYPE, model=None, scaler=None):
     cerebro = bt.Cerebro()
 
-    # 1. Cargar Datos (Usamos los Parquet que generamos)
-    # Backtrader necesita CSV o Pandas DataFrame directo
-    data_path = f"data/raw/prices/{TICKER}_latest.parquet"  # Usamos raw price para simular mercado
-    if not os.path.exists(data_path):
+    # 1. Cargar Datos: Dataset Maestro (precios + features) o, si falta, precios crudos
+    df = load_backtest_data(ticker)
+    if df is None:
         # Si no está local (porque seed_mock subió a nube), bajamos de nube o creamos dummy
         print(
             "⚠️ No encuentro datos locales. Asegúrate de tener el archivo o descárgalo de GCS."
         )
         return
 
-    df = pd.read_parquet(data_path)
-    df.index = pd.to_datetime(df["Date"])  # Asegurar índice de fecha
+    # 2. Señales del modelo para toda la historia en un único predict batch
+    if model is None:
+        model, scaler = load_strategy_model(ticker, model_type)
+    feature_names = feature_columns(df.columns, "lstm")
+    if model is not None:
+        try:
+            df = df.assign(**{PROB_LINE: precompute_probabilities(model, scaler, df, model_type)})
+        except Exception as e:
+            print(f"⚠️ No se pudieron precalcular las señales del modelo: {e}")
 
-    # Crear Feed de Datos
-    data = bt.feeds.PandasData(dataname=df)
+    # Crear Feed de Datos (features + prob como líneas; sin prob, la estrategia usa el cruce simple)
+    if PROB_LINE in df.columns:
+        data = make_feed_class(feature_names)(dataname=df)
+    else:
+        data = bt.feeds.PandasData(dataname=df)
     cerebro.adddata(data)
 
-    # 2. Configurar Estrategia
-    cerebro.addstrategy(MLStrategy)
+    # 3. Configurar Estrategia (+ registro de equity y trades para las métricas)
+    cerebro.addstrategy(MLStrategy, model_type=model_type)
+    cerebro.addanalyzer(EquityRecorder, _name="equity")
 
-    # 3. Configurar Dinero Inicial
+    # 4. Configurar Dinero Inicial
     start_cash = 10000.0
     cerebro.broker.setcash(start_cash)
     cerebro.broker.setcommission(commission=0.001)  # 0.1% comisión
 
     print(f"Valor Inicial del Portafolio: {start_cash:.2f}")
-    cerebro.run()
-    print(f"Valor Final del Portafolio: {cerebro.broker.getvalue():.2f}")
+    strategy = cerebro.run()[0]
+    final_value = cerebro.broker.getvalue()
+    print(f"Valor Final del Portafolio: {final_value:.2f}")
+
+    metrics = backtrader_metrics(strategy)
+    print(
+        f"📊 Sharpe: {metrics['sharpe']:.2f} | Sortino: {metrics['sortino']:.2f} | "
+        f"Max DD: {metrics['max_drawdown']:.2%} | Hit rate: {metrics['hit_rate']:.2%} "
+        f"({metrics['n_round_trips']} trades) | Exposición: {metrics['exposure']:.2%} | "
+        f"Turnover anual: {metrics['turnover']:.2f}x"
+    )
 
-    # 4. Gráfica
+    # 5. Gráfica
     # cerebro.plot() # Descomentar si tienes entorno gráfico (X11)
+    return final_value
 
 
 if __name__ == "__main__":
     # Descargar datos de prueba de GCS para que el script funcione local
     from google.cloud import storage
-    import io
 
     bucket_name = "market-oracle-tesis-data-lake"
-    blob_path = f"data/raw/prices/{TICKER}_latest.parquet"
 
     print(f"📥 Descargando datos de {TICKER} para backtesting...")
     storage_client = storage.Client()
     bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(blob_path)
 
-    if blob.exists():
-        os.makedirs("data/raw/prices", exist_ok=True)
-        blob.download_to_filename(blob_path)
-        run_backtest()
+    # Preferimos el Dataset Maestro (features para el modelo); si no, precios crudos
+    for blob_path in (GOLD_PATH.format(ticker=TICKER), PRICES_PATH.format(ticker=TICKER)):
+        blob = bucket.blob(blob_path)
+        if blob.exists():
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            blob.download_to_filename(blob_path)
+            run_backtest()
+            break
     else:
         print("❌ No encontré datos en GCS. Corre seed_mock_data.py primero.")
@@ -0,0 +1,285 @@
+"""
+Barrido paralelo de backtests sobre una grilla de configuraciones.
+
+Grilla: tickers x tipos de modelo x umbrales de confianza x comisiones. Cada
+(ticker, modelo) es una tarea del pool de procesos: el worker carga el Dataset
+Maestro y el modelo, puntúa la historia en un único predict batch (una sola vez
+por worker gracias a su caché) y evalúa todas las combinaciones umbral x comisión
+de esa tarea con el motor vectorizado (o con backtrader, `engine="backtrader"`).
+
+Los resultados (valor final, trades y las métricas de `analytics.summarize`:
+Sharpe, Sortino, drawdown, turnover, hit rate, exposición...) se acumulan en una
+sola tabla Parquet compacta que se reescribe de forma atómica tras cada tarea; al
+relanzar un barrido interrumpido se omiten las configuraciones ya terminadas.
+
+Uso:
+    python -m src.backtesting.sweep --tickers AAPL TSLA --thresholds 0 0.1 0.2 --workers 4
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting.analytics import backtrader_metrics, compact_table, vectorized_metrics
+from src.backtesting.vectorized import START_CASH, positions_from_signals, run_vectorized
+
+TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"]
+MODEL_TYPES = ("LSTM", "SVM")
+ENGINES = ("vectorized", "backtrader")
+RESULTS_PATH = "data/backtests/sweep_results.parquet"
+
+# Parámetros que identifican una configuración (config_id = hash de estos valores)
+CONFIG_KEYS = ("ticker", "model_type", "threshold", "commission", "engine")
+
+# Caché del worker: (ticker, modelo, rutas) -> (df, prob) o mensaje de error
+_worker_cache = {}
+
+
+def config_id(config: dict) -> str:
+    payload = json.dumps({k: config[k] for k in CONFIG_KEYS}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def build_grid(tickers, model_types, thresholds, commissions, engine="vectorized") -> list:
+    """Configuraciones del barrido (una por combinación), con su `config_id`."""
+    grid = []
+    for ticker, model_type, threshold, commission in itertools.product(
+        tickers, model_types, thresholds, commissions
+    ):
+        config = {
+            "ticker": ticker,
+            "model_type": model_type,
+            "threshold": float(threshold),
+            "commission": float(commission),
+            "engine": engine,
+        }
+        config["config_id"] = config_id(config)
+        grid.append(config)
+    return grid
+
+
+def probability_bounds(threshold):
+    """
+    Umbral de confianza -> (P mínima para comprar, P máxima para vender). La confianza
+    es |p - 0.5| * 2, como en el dashboard y el bot.
+    """
+    return 0.5 + threshold / 2, 0.5 - threshold / 2
+
+
+# --- Worker ---
+
+
+def _load_signals(ticker, model_type, gold_path, prices_path, models_dir):
+    """(df, prob) del ticker; se calcula una vez por worker."""
+    from src.backtesting.strategy import (
+        load_backtest_data,
+        load_strategy_model,
+        precompute_probabilities,
+    )
+
+    key = (ticker, model_type, gold_path, prices_path, models_dir)
+    if key not in _worker_cache:
+        df = load_backtest_data(ticker, gold_path, prices_path)
+        if df is None:
+            _worker_cache[key] = "sin datos"
+        else:
+            model, scaler = load_strategy_model(ticker, model_type, models_dir)
+            if model is None:
+                _worker_cache[key] = "sin modelo"
+            else:
+                _worker_cache[key] = (df, precompute_probabilities(model, scaler, df, model_type))
+    return _worker_cache[key]
+
+
+def _run_backtrader(df, prob, buy, sell, commission):
+    """Valor final, órdenes ejecutadas y métricas con cerebro + MLStrategy."""
+    import backtrader as bt
+
+    from src.backtesting.strategy import PROB_LINE, EquityRecorder, MLStrategy, make_feed_class
+    from src.features.dataset import feature_columns
+
+    feed = make_feed_class(feature_columns(df.columns))(dataname=df.assign(**{PROB_LINE: prob}))
+    cerebro = bt.Cerebro()
+    cerebro.adddata(feed)
+    cerebro.addstrategy(MLStrategy, threshold=buy, sell_threshold=sell)
+    cerebro.addanalyzer(EquityRecorder, _name="equity")
+    cerebro.broker.setcash(START_CASH)
+    cerebro.broker.setcommission(commission=commission)
+    with contextlib.redirect_stdout(io.StringIO()):  # la estrategia loguea cada orden
+        strategy = cerebro.run()[0]
+
+    n_trades = sum(order.status == order.Completed for order in cerebro.broker.orders)
+    return cerebro.broker.getvalue(), n_trades, backtrader_metrics(strategy)
+
+
+def _evaluate(df, prob, configs):
+    """Valor final, trades y métricas de cada configuración sobre las probabilidades `prob`."""
+    open_, close = df["Open"].to_numpy(np.float64), df["Close"].to_numpy(np.float64)
+    rows = []
+    vectorized = [c for c in configs if c["engine"] == "vectorized"]
+
+    # Motor vectorizado: todas las combinaciones de una comisión en una sola matriz
+    for commission in sorted({c["commission"] for c in vectorized}):
+        group = [c for c in vectorized if c["commission"] == commission]
+        buy, sell = probability_bounds(np.array([c["threshold"] for c in group]))
+        entries = prob[:, None] > buy[None, :]
+        exits = prob[:, None] <= sell[None, :]
+        result = run_vectorized(
+            open_, close, positions_from_signals(entries, exits), commission=commission
+        )
+        metrics = vectorized_metrics(result, open_, close, commission=commission)
+        for j, c in enumerate(group):
+            rows.append(
+                {
+                    **c,
+                    "final_value": float(result["final_value"][j]),
+                    "n_trades": int(result["n_trades"][j]),
+                    **{key: values[j].item() for key, values in metrics.items()},
+                }
+            )
+
+    for c in configs:
+        if c["engine"] != "backtrader":
+            continue
+        buy, sell = probability_bounds(c["threshold"])
+        final_value, n_trades, metrics = _run_backtrader(df, prob, buy, sell, c["commission"])
+        rows.append({**c, "final_value": final_value, "n_trades": n_trades, **metrics})
+    return rows
+
+
+def run_task(ticker, model_type, configs, gold_path=None, prices_path=None, models_dir="models"):
+    """
+    Evalúa las configuraciones de un (ticker, modelo). Retorna una fila por configuración;
+    si la carga o la evaluación fallan, filas con status "error" (el pool sigue).
+    """
+    t0 = time.perf_counter()
+    try:
+        loaded = _load_signals(ticker, model_type, gold_path, prices_path, models_dir)
+        rows = loaded if isinstance(loaded, str) else _evaluate(*loaded, configs)
+    except Exception as e:
+        rows = f"{type(e).__name__}: {e}"
+    if isinstance(rows, str):
+        # Sin status "ok": se reintenta al reanudar el barrido
+        return [{**c, "status": "error", "error": rows} for c in configs]
+
+    elapsed = time.perf_counter() - t0
+    for row in rows:
+        row.update(
+            {
+                "return": row["final_value"] / START_CASH - 1,
+                "status": "ok",
+                "error": None,
+                "task_s": elapsed,
+            }
+        )
+    return rows
+
+
+# --- Orquestación ---
+
+
+def load_results(path) -> pd.DataFrame:
+    path = Path(path)
+    return pd.read_parquet(path) if path.exists() else pd.DataFrame()
+
+
+def _checkpoint(results: pd.DataFrame, path):
+    """
+    Reescribe la tabla completa de forma atómica (un corte nunca deja un Parquet roto),
+    con métricas en float32; los parámetros de la configuración se guardan exactos.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    compact_table(results, keep=CONFIG_KEYS + ("config_id", "final_value")).to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def run_sweep(
+    grid,
+    results_path=RESULTS_PATH,
+    workers=None,
+    gold_path=None,
+    prices_path=None,
+    models_dir="models",
+) -> pd.DataFrame:
+    """
+    Ejecuta las configuraciones pendientes de `grid` y retorna la tabla completa.
+    - `workers=0`: en el proceso actual (sin pool); `None`: un proceso por núcleo.
+    - Se reanuda desde `results_path`: las configuraciones con status "ok" no se repiten.
+    """
+    results = load_results(results_path)
+    done = set(results.loc[results["status"] == "ok", "config_id"]) if len(results) else set()
+    pending = [c for c in grid if c["config_id"] not in done]
+    print(f"🧪 Barrido: {len(grid)} configuraciones, {len(grid) - len(pending)} ya hechas")
+
+    # Una tarea por (ticker, modelo): los datos y el predict se comparten entre sus configs
+    tasks = {}
+    for c in pending:
+        tasks.setdefault((c["ticker"], c["model_type"]), []).append(c)
+
+    def collect(rows):
+        nonlocal results
+        new = pd.DataFrame(rows)
+        if len(results):
+            results = results[~results["config_id"].isin(new["config_id"])]
+            results = pd.concat([results, new], ignore_index=True)
+        else:
+            results = new
+        _checkpoint(results, results_path)
+
+    args = (gold_path, prices_path, models_dir)
+    if workers == 0:
+        for (ticker, model_type), configs in tasks.items():
+            collect(run_task(ticker, model_type, configs, *args))
+    elif tasks:
+        # spawn: TensorFlow no es seguro tras fork
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(run_task, ticker, model_type, configs, *args)
+                for (ticker, model_type), configs in tasks.items()
+            ]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barrido paralelo de backtests")
+    parser.add_argument("--tickers", nargs="+", default=TICKERS)
+    parser.add_argument("--model-types", nargs="+", choices=MODEL_TYPES, default=["LSTM"])
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.0, 0.1, 0.2, 0.3])
+    parser.add_argument("--commissions", type=float, nargs="+", default=[0.001])
+    parser.add_argument("--engine", choices=ENGINES, default="vectorized")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    args = parser.parse_args([] if argv is None else argv)
+
+    grid = build_grid(args.tickers, args.model_types, args.thresholds, args.commissions, args.engine)
+    results = run_sweep(grid, args.output, workers=args.workers)
+    ok = results[results["status"] == "ok"] if len(results) else results
+    if len(ok):
+        print(ok.sort_values("sharpe", ascending=False).head(20).round(4).to_string(index=False))
+    if len(ok) < len(results):
+        errors = results.loc[results["status"] != "ok", ["ticker", "model_type", "error"]]
+        print(f"⚠️ {len(errors)} configuraciones con error (se reintentan al relanzar):")
+        print(errors.drop_duplicates().to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
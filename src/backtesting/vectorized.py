@@ -0,0 +1,160 @@
+"""
+Backtester vectorizado (NumPy) sobre arrays de señales precalculadas.
+
+Reproduce las reglas del broker de backtrader que usa `strategy.run_backtest`:
+- Posiciones long / flat con stake fijo (`FixedSize`, 1 acción por defecto).
+- La decisión tomada al cierre de la barra t se ejecuta al OPEN de la barra t+1
+  (orden de mercado); la decisión de la última barra no llega a ejecutarse.
+- Comisión proporcional al valor operado (0.1%) en cada compra y venta.
+- Valor del portafolio = caja + posición * close.
+- Se asume caja suficiente para el stake (backtrader rechazaría la orden si no).
+
+Todas las funciones aceptan señales de shape (n,) o (n, k): cada columna es una
+combinación de parámetros (umbral, holding, ...) y se evalúan todas a la vez con
+operaciones matriciales, sin loop por barra.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+START_CASH = 10000.0
+COMMISSION = 0.001  # 0.1% por operación
+STAKE = 1  # acciones por orden (sizer por defecto de backtrader)
+
+
+def _as_2d(a):
+    a = np.asarray(a)
+    return a[:, None] if a.ndim == 1 else a
+
+
+def _ffill_state(signal, initial=0):
+    """Propaga hacia adelante el último valor no-NaN de cada columna (shape (n, k))."""
+    n = signal.shape[0]
+    known = ~np.isnan(signal)
+    last = np.where(known, np.arange(n)[:, None], -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+    cols = np.arange(signal.shape[1])
+    state = signal[np.maximum(last, 0), cols]
+    return np.where(last >= 0, state, initial)
+
+
+def positions_from_signals(entries, exits) -> np.ndarray:
+    """
+    Estado deseado long (1) / flat (0) al cierre de cada barra: se entra con `entries`
+    estando flat y se sale con `exits` estando long. Si ambas coinciden en una
+    barra, gana la salida.
+    """
+    entries, exits = _as_2d(entries).astype(bool), _as_2d(exits).astype(bool)
+    signal = np.full(entries.shape, np.nan)
+    signal[entries] = 1.0
+    signal[exits] = 0.0
+    return _ffill_state(signal).astype(np.int8)
+
+
+def holding_positions(entries, holding) -> np.ndarray:
+    """Long durante `holding` barras tras cada señal de entrada (se renueva con cada señal)."""
+    entries = _as_2d(entries).astype(np.int32)
+    counts = np.cumsum(entries, axis=0)
+    lagged = np.zeros_like(counts)
+    if holding < len(counts):
+        lagged[holding:] = counts[:-holding]
+    return (counts - lagged > 0).astype(np.int8)
+
+
+def momentum_signals(close):
+    """Regla de `MLStrategy`: entra si el close sube respecto a la barra anterior, sale si baja."""
+    close = np.asarray(close, dtype=np.float64)
+    change = np.zeros_like(close)
+    change[1:] = close[1:] - close[:-1]
+    return change > 0, change < 0
+
+
+def threshold_signals(prob, buy_thresholds, sell_thresholds=None):
+    """
+    Entradas (prob > umbral de compra) y salidas (prob <= umbral de venta) para cada
+    umbral, como matrices (n, k), igual que `MLStrategy.next`. Sin `sell_thresholds`
+    se usa el mismo umbral.
+    """
+    prob = np.asarray(prob, dtype=np.float64)[:, None]
+    buy = np.atleast_1d(np.asarray(buy_thresholds, dtype=np.float64))[None, :]
+    sell = buy if sell_thresholds is None else np.atleast_1d(sell_thresholds)[None, :]
+    return prob > buy, prob <= sell
+
+
+def run_vectorized(
+    open_, close, positions, cash=START_CASH, commission=COMMISSION, stake=STAKE
+) -> dict:
+    """
+    Simula el portafolio para `positions` (estado deseado al cierre, shape (n,) o (n, k)).
+    Retorna arrays por barra (`value`, `position`) y por columna (`final_value`,
+    `n_trades`, `commission`).
+    """
+    open_ = np.asarray(open_, dtype=np.float64)[:, None]
+    close = np.asarray(close, dtype=np.float64)[:, None]
+    desired = _as_2d(positions).astype(np.float64)
+
+    # Ejecución en la barra siguiente: la posición vigente en t es la deseada en t-1
+    held = np.zeros_like(desired)
+    held[1:] = desired[:-1]
+    trades = np.diff(held, axis=0, prepend=0.0) * stake  # acciones compradas(+)/vendidas(-)
+
+    notional = trades * open_
+    fees = np.abs(notional) * commission
+    cash_path = cash - np.cumsum(notional + fees, axis=0)
+    value = cash_path + held * stake * close
+
+    return {
+        "value": value,
+        "position": held.astype(np.int8),
+        "final_value": value[-1],
+        "n_trades": np.count_nonzero(trades, axis=0),
+        "commission": fees.sum(axis=0),
+    }
+
+
+def sweep_thresholds(
+    open_,
+    close,
+    prob,
+    buy_thresholds,
+    sell_offsets=(0.0,),
+    holdings=(None,),
+    cash=START_CASH,
+    commission=COMMISSION,
+    stake=STAKE,
+) -> pd.DataFrame:
+    """
+    Evalúa la grilla umbral de compra x offset de venta x holding en un solo pase
+    matricial. `holding=None` usa salidas por umbral (sell = buy - offset); un entero
+    mantiene la posición ese número de barras tras cada entrada.
+    """
+    grid = list(itertools.product(buy_thresholds, sell_offsets, holdings))
+    buy = np.array([g[0] for g in grid], dtype=np.float64)
+    sell = buy - np.array([g[1] for g in grid], dtype=np.float64)
+    entries, exits = threshold_signals(prob, buy, sell)
+
+    positions = np.empty(entries.shape, dtype=np.int8)
+    by_holding = {}
+    for j, (_, _, holding) in enumerate(grid):
+        by_holding.setdefault(holding, []).append(j)
+    for holding, cols in by_holding.items():
+        if holding is None:
+            positions[:, cols] = positions_from_signals(entries[:, cols], exits[:, cols])
+        else:
+            positions[:, cols] = holding_positions(entries[:, cols], holding)
+
+    result = run_vectorized(open_, close, positions, cash, commission, stake)
+    return pd.DataFrame(
+        {
+            "buy_threshold": buy,
+            "sell_threshold": sell,
+            "holding": [g[2] for g in grid],
+            "final_value": result["final_value"],
+            "return": result["final_value"] / cash - 1,
+            "n_trades": result["n_trades"],
+            "commission": result["commission"],
+        }
+    )
+
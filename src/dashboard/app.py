@@ -2,74 +2,117 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from google.cloud import storage
-import io
-import tensorflow as tf
 import joblib
 from pathlib import Path
 
+from src.data.parquet_io import read_parquet_blob
+from src.features.dataset import feature_columns, feature_matrix
+from src.models.inference import TFLitePredictor
+from src.models.registry import ModelRegistry
+
 # Configuración de página
 st.set_page_config(layout="wide", page_title="Market Sentiment Oracle 🔮")
 
 # Constantes
 BUCKET_NAME = "market-oracle-tesis-data-lake"
 TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"]
+SEQ_LEN = 10
+# El gráfico solo necesita OHLC + 3 indicadores; el resto se lee solo para la ventana de predicción
+CHART_COLUMNS = ["Open", "High", "Low", "Close", "rsi_14", "daily_sentiment", "bb_upper", "bb_lower"]
+PREDICTION_ROWS = 20
 
 
 @st.cache_data
-def load_data(ticker):
-    """Descarga datos cacheados para no ir a GCS en cada clic"""
+def load_data(ticker, columns=None, tail_rows=None):
+    """
+    Descarga datos cacheados para no ir a GCS en cada clic.
+    `columns` limita las columnas decodificadas y `tail_rows` lee solo los últimos
+    row groups (ventana de predicción).
+    """
     client = storage.Client()
     bucket = client.bucket(BUCKET_NAME)
 
     # Cargar Precios + Indicadores (Gold Layer)
     blob_path = f"data/gold/master_dataset_{ticker}.parquet"
-    blob = bucket.blob(blob_path)
-    if not blob.exists():
-        return None
-
-    data = blob.download_as_bytes()
-    df = pd.read_parquet(io.BytesIO(data))
-    return df
+    return read_parquet_blob(bucket, blob_path, columns=columns, tail_rows=tail_rows)
 
 
 @st.cache_resource
 def load_model(ticker):
-    """Carga el modelo LSTM y el scaler entrenados"""
+    """
+    Carga el modelo LSTM y el scaler entrenados.
+    Prefiere el export TFLite (inferencia ligera); si no existe, usa el .keras.
+    """
     try:
         # Secure path handling to prevent directory traversal
         base_dir = Path("models").resolve()
 
         # Construct absolute paths
         model_path = base_dir.joinpath(f"lstm_{ticker}.keras").resolve()
+        tflite_path = base_dir.joinpath(f"lstm_{ticker}.tflite").resolve()
         scaler_path = base_dir.joinpath(f"scaler_lstm_{ticker}.pkl").resolve()
 
         # Validate paths are strictly within the models directory
-        if not model_path.is_relative_to(base_dir) or not scaler_path.is_relative_to(base_dir):
+        if not all(p.is_relative_to(base_dir) for p in (model_path, tflite_path, scaler_path)):
             # Log this security event if logging was configured
             return None, None
 
+        if not scaler_path.exists():
+            return None, None
+        scaler = joblib.load(str(scaler_path))
+
+        if tflite_path.exists():
+            try:
+                return TFLitePredictor(tflite_path), scaler
+            except Exception:
+                pass  # Export corrupto o runtime ausente: usar el modelo Keras
+
         # Check existence before loading
-        if not model_path.exists() or not scaler_path.exists():
+        if not model_path.exists():
             return None, None
 
+        # TensorFlow completo solo si hace falta el modelo Keras
+        import tensorflow as tf
+
         model = tf.keras.models.load_model(str(model_path))
-        scaler = joblib.load(str(scaler_path))
         return model, scaler
     except Exception:
         return None, None
 
 
+@st.cache_resource
+def get_registry():
+    """Registro de modelos en el bucket (caché local en disco); cachea los artefactos por versión."""
+    return ModelRegistry(bucket=storage.Client().bucket(BUCKET_NAME))
+
+
+def model_version(ticker):
+    """Última versión registrada del LSTM del ticker (None si no está registrado)."""
+    name = f"lstm_{ticker}"
+    registry = get_registry()
+    registry.refresh([name])  # detecta reentrenamientos sin reiniciar la app
+    return registry.latest_version(name)
+
+
+def load_registered_model(ticker, version):
+    """Modelo y scaler de una versión registrada (TFLite si se exportó)."""
+    name = f"lstm_{ticker}"
+    registry = get_registry()
+    try:
+        role = "tflite" if "tflite" in registry.entry(name, version)["artifacts"] else "model"
+        return registry.load(name, role, version), registry.load(name, "scaler", version)
+    except Exception:
+        return None, None
+
+
 def make_prediction(model, scaler, df):
     """Genera la predicción para 'mañana' usando los últimos 10 días"""
-    SEQ_LEN = 10
     if len(df) < SEQ_LEN:
         return 0.5  # Sin datos suficientes
 
-    # Preparar features
-    feature_cols = [
-        c for c in df.columns if c not in ["Target", "date_only", "Ticker", "Date"]
-    ]
-    last_sequence = df[feature_cols].tail(SEQ_LEN).values
+    # Preparar features (mismo conjunto que el entrenamiento del LSTM)
+    feature_cols = feature_columns(df.columns, "lstm")
+    last_sequence = feature_matrix(df, feature_cols, tail=SEQ_LEN)
 
     # Escalar
     last_sequence_scaled = scaler.transform(last_sequence)
@@ -91,7 +134,7 @@ def main():
     selected_ticker = st.sidebar.selectbox("Selecciona un Activo", TICKERS)
     
     # Cargar datos
-    df = load_data(selected_ticker)
+    df = load_data(selected_ticker, columns=CHART_COLUMNS)
     
     if df is not None:
         # Métricas Principales
@@ -113,9 +156,16 @@ def main():
         )
     
         # Predicción IA
-        model, scaler = load_model(selected_ticker)
+        # Versión registrada si existe; si no, los archivos sueltos de models/
+        version = model_version(selected_ticker)
+        model, scaler = (None, None)
+        if version is not None:
+            model, scaler = load_registered_model(selected_ticker, version)
+        if model is None:
+            model, scaler = load_model(selected_ticker)
+        df_recent = load_data(selected_ticker, tail_rows=PREDICTION_ROWS)
         if model:
-            prob = make_prediction(model, scaler, df)
+            prob = make_prediction(model, scaler, df_recent)
             sentiment = "🟢 ALCISTA" if prob > 0.5 else "🔴 BAJISTA"
             confidence = abs(prob - 0.5) * 2  # Escalar a 0-100% de fuerza
             col4.metric("Predicción IA", sentiment, f"Confianza: {confidence:.1%}")
@@ -161,7 +211,7 @@ def main():
     
         # Data Table
         with st.expander("Ver Datos Crudos"):
-            st.dataframe(df.tail(20))
+            st.dataframe(df_recent.tail(20))
     
     else:
         st.error("No se encontraron datos. Ejecuta el pipeline de datos primero.")
@@ -0,0 +1,121 @@
+"""
+Lectura/escritura de Parquet con proyección de columnas y predicate pushdown.
+
+Los lectores aceptan `columns` y un rango de fechas (`start`/`end`) que se pasan a
+pyarrow como filtros: los row groups cuyas estadísticas min/max de la columna de
+fecha quedan fuera del rango no se decodifican. Para que esa poda funcione, los
+escritores ordenan por fecha y fijan un tamaño de row group acotado.
+"""
+
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+DATE_COL = "Date"
+
+# ~1 año de sesiones por row group: un rango de fechas poda años completos
+DAILY_ROW_GROUP_SIZE = 252
+
+
+def _as_source(source):
+    """Acepta ruta, bytes o file-like."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def _schema_names(source) -> list:
+    names = pq.read_schema(source).names
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return names
+
+
+def date_filters(start=None, end=None, date_col: str = DATE_COL):
+    """Filtros pyarrow (DNF) para start <= date_col <= end, o None si no hay rango."""
+    filters = []
+    if start is not None:
+        filters.append((date_col, ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append((date_col, "<=", pd.Timestamp(end)))
+    return filters or None
+
+
+def read_parquet(
+    source, columns=None, start=None, end=None, date_col: str = DATE_COL
+) -> pd.DataFrame:
+    """
+    Lee un Parquet (ruta, bytes o file-like) leyendo solo las columnas pedidas y los
+    row groups que pueden contener fechas en [start, end].
+    - Las columnas pedidas que no existen en el archivo se ignoran.
+    - El índice guardado por pandas (p. ej. 'Date' en Gold) se restaura siempre.
+    - Si `date_col` no existe en el archivo, el rango de fechas no se aplica.
+    """
+    source = _as_source(source)
+    filters = date_filters(start, end, date_col)
+
+    if columns is not None or filters is not None:
+        names = _schema_names(source)
+        if columns is not None:
+            columns = [c for c in columns if c in names]
+        if filters is not None and date_col not in names:
+            filters = None
+
+    return pd.read_parquet(source, columns=columns, filters=filters)
+
+
+def read_parquet_tail(source, n_rows: int, columns=None) -> pd.DataFrame:
+    """
+    Últimas `n_rows` filas de un Parquet ordenado por fecha, decodificando solo los
+    row groups finales necesarios (útil para ventanas de inferencia).
+    """
+    parquet_file = pq.ParquetFile(_as_source(source))
+    if columns is not None:
+        names = parquet_file.schema_arrow.names
+        columns = [c for c in columns if c in names]
+
+    groups, rows = [], 0
+    for i in reversed(range(parquet_file.num_row_groups)):
+        groups.insert(0, i)
+        rows += parquet_file.metadata.row_group(i).num_rows
+        if rows >= n_rows:
+            break
+
+    table = parquet_file.read_row_groups(
+        groups, columns=columns, use_pandas_metadata=True
+    )
+    return table.to_pandas().tail(n_rows)
+
+
+def read_parquet_blob(bucket, blob_name: str, tail_rows=None, **kwargs):
+    """
+    Descarga un blob de GCS y lo lee con read_parquet (o read_parquet_tail si se
+    pide `tail_rows`). Retorna None si el blob no existe.
+    """
+    blob = bucket.blob(blob_name)
+    if not blob.exists():
+        return None
+
+    data = blob.download_as_bytes()
+    if tail_rows is not None:
+        return read_parquet_tail(data, tail_rows, columns=kwargs.get("columns"))
+    return read_parquet(data, **kwargs)
+
+
+def write_parquet(
+    df: pd.DataFrame,
+    destination,
+    date_col: str = DATE_COL,
+    row_group_size: int = DAILY_ROW_GROUP_SIZE,
+):
+    """
+    Escribe un Parquet ordenado por fecha (columna `date_col` o, si no existe, el
+    índice) con row groups de `row_group_size` filas, para que las estadísticas
+    por row group permitan podar lecturas por rango de fechas.
+    """
+    if date_col in df.columns:
+        df = df.sort_values(date_col, kind="stable")
+    else:
+        df = df.sort_index(kind="stable")
+    df.to_parquet(destination, row_group_size=row_group_size)
@@ -1,5 +1,12 @@
 import logging
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime
+from functools import partial
+from zoneinfo import ZoneInfo
 
 # Intento importar dotenv solo si existe (Entorno Local)
 try:
@@ -12,10 +19,20 @@ except ImportError:
     print(
         "INFO: Running in Cloud mode (dotenv not found), relying on Environment Variables"
     )
+import pandas as pd
+import requests
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import MarketOrderRequest
+from alpaca.trading.stream import TradingStream
 from alpaca.trading.enums import OrderSide, TimeInForce
 from alpaca.common.exceptions import APIError
+from google.cloud import storage
+
+from src.execution.broker import make_broker
+from src.execution.journal import UNRESOLVED, OrderJournal, client_order_id_for
+from src.execution.state import BrokerState
+from src.models.prediction_service import PredictionService
+from src.models.registry import ModelRegistry
 
 load_dotenv()
 
@@ -25,33 +42,129 @@ logging.basicConfig(
 )
 
 
+CONFIDENCE_THRESHOLD = 0.75
+ORDER_NOTIONAL = 10000  # USD per BUY
+MARKET_TZ = ZoneInfo("America/New_York")  # trading day of the deterministic order ids
+
+# Batch execution defaults
+MAX_WORKERS = 8
+ORDER_TIMEOUT = 10.0  # seconds per attempt
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled on every retry
+RATE_LIMIT_PER_SEC = 200 / 60  # Alpaca trading API: 200 requests per minute
+RATE_LIMIT_BURST = 20
+
+RESULT_COLUMNS = [
+    "ticker",
+    "signal",
+    "confidence",
+    "status",  # skipped | submitted | duplicate | no_position | insufficient_funds | failed | timeout
+    "order_id",
+    "attempts",
+    "latency_s",
+    "error",
+]
+
+
+def trading_day():
+    return datetime.now(MARKET_TZ).date()
+
+
+def is_transient(error):
+    """Whether a failed broker call is worth retrying (throttling, 5xx, network, timeout)."""
+    if isinstance(error, APIError):
+        return error.status_code is not None and (error.status_code == 429 or error.status_code >= 500)
+    return isinstance(error, (FutureTimeout, TimeoutError, requests.ConnectionError, requests.Timeout))
+
+
+def call_with_timeout(request, timeout):
+    """
+    Runs `request` on its own daemon thread and waits up to `timeout` seconds
+    (`FutureTimeout` past that). An abandoned call keeps running in the background
+    but never holds the interpreter open at exit, unlike a pool thread.
+    """
+    future = Future()
+
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(request())
+            except BaseException as e:
+                future.set_exception(e)
+
+    threading.Thread(target=run, name="broker-call", daemon=True).start()
+    return future.result(timeout=timeout)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity` at once."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 class TradingBot:
     """
     A trading bot that interacts with Alpaca Markets to execute trades based on model predictions.
     """
 
-    def __init__(self, paper=True):
+    def __init__(self, paper=True, client=None, broker=None, journal=None):
         """
         Initializes the TradingBot with API keys from environment variables.
+        - client: an already-built `Broker` (e.g. `FakeBroker` for offline replay).
+        - broker: implementation to build when no client is given ("alpaca" or
+          "fake"; default $BROKER, else "alpaca"). Only "alpaca" needs API keys.
+        - journal: `OrderJournal` checked before every order; unresolved entries
+          from a previous run are reconciled against the broker here.
+        Clock, positions and buying power are read once here and cached in `state`.
         """
         self.api_key = os.getenv("ALPACA_API_KEY")
         self.secret_key = os.getenv("ALPACA_SECRET_KEY")
 
-        if not self.api_key or not self.secret_key:
-            raise ValueError(
-                "ALPACA_API_KEY and ALPACA_SECRET_KEY must be set in environment variables."
-            )
+        self.client = client if client is not None else make_broker(broker, paper=paper)
+        self.state = BrokerState(self.client)
+        self.state.load()
+        self.journal = journal
+        if journal is not None:
+            self.recover()
+        logging.info(f"TradingBot initialized successfully with {type(self.client).__name__}.")
 
-        self.client = TradingClient(self.api_key, self.secret_key, paper=paper)
-        logging.info("TradingBot initialized successfully with alpaca-py.")
+    def recover(self):
+        """Settles the orders a crashed run left in flight (see `OrderJournal.reconcile`)."""
+        positions = set(self.state.positions) if self.state.loaded else None
+        try:
+            settled = self.journal.reconcile(self.client, positions=positions)
+        except Exception as e:
+            logging.error(f"Could not reconcile the order journal: {e}")
+            return 0
+        if settled:
+            logging.info(f"Reconciled {settled} in-flight orders from a previous run.")
+        return settled
 
     def check_market_status(self, force_test=False):
         """
         Checks if the market is open. If not, logs a warning and stops unless in test mode.
+        Uses the cached clock; the broker is only asked again once it passes its next open/close.
         """
         try:
-            clock = self.client.get_clock()
-            if not clock.is_open:
+            if not self.state.market_open():
                 if force_test:
                     logging.warning("Market is closed, but proceeding in test mode.")
                     return True
@@ -64,105 +177,240 @@ class TradingBot:
             logging.error(f"Error checking market status: {e}")
             return False
 
-    def execute_trade(self, ticker, signal, confidence):
+    def execute_trade(self, ticker, signal, confidence, day=None):
         """
         Executes a trade based on the provided signal and confidence level.
         - signal: "BUY", "SELL", or "HOLD".
         - confidence: A float indicating the model's confidence in the signal.
+        - day: trading day of the order id (default: today in New York).
+        Returns the order result (see `RESULT_COLUMNS`); a single attempt, no retries.
         """
+        self.state.refresh_if_stale()
+        return self._execute(ticker, signal, confidence, day=day)
+
+    def execute_batch(
+        self,
+        signals,
+        max_workers=MAX_WORKERS,
+        timeout=ORDER_TIMEOUT,
+        retries=MAX_RETRIES,
+        rate_limiter=None,
+        day=None,
+    ):
+        """
+        Submits every qualifying order of a signal table (ticker, signal, confidence)
+        concurrently through a bounded thread pool.
+        - Every broker call takes a token from `rate_limiter` (Alpaca: 200 requests/min).
+        - Each attempt is abandoned after `timeout` seconds; timeouts, 429s, 5xx and
+          connection errors are retried up to `retries` times with exponential backoff.
+          A BUY's `client_order_id` is deterministic (day, ticker, signal), so the
+          broker rejects a duplicate if a timed-out attempt did go through.
+        Returns one row per signal (`RESULT_COLUMNS`); the aggregate is logged.
+        """
+        rows = list(signals.itertuples(index=False))
+        self.state.refresh_if_stale()
+        limiter = rate_limiter or TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+        start = time.perf_counter()
+
+        # Each blocking HTTP call runs on a daemon thread (`call_with_timeout`), so a
+        # hung request is abandoned on timeout without blocking its worker or the exit
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="order") as pool:
+            futures = [
+                pool.submit(
+                    self._execute,
+                    row.ticker,
+                    row.signal,
+                    row.confidence,
+                    retries=retries,
+                    timeout=timeout,
+                    limiter=limiter,
+                    day=day,
+                )
+                for row in rows
+            ]
+            results = [future.result() for future in futures]
+
+        report = pd.DataFrame(results, columns=RESULT_COLUMNS)
+        elapsed = time.perf_counter() - start
+        counts = report["status"].value_counts().to_dict()
+        logging.info(
+            f"Batch of {len(report)} signals finished in {elapsed:.2f}s: {counts}, "
+            f"{int((report['attempts'] - 1).clip(lower=0).sum())} retries."
+        )
+        return report
+
+    def _execute(self, ticker, signal, confidence, retries=0, timeout=None, limiter=None, day=None):
+        """Validates the signal and submits its order, retrying transient failures."""
+        result = {
+            "ticker": ticker,
+            "signal": signal,
+            "confidence": confidence,
+            "status": "skipped",
+            "order_id": None,
+            "attempts": 0,
+            "latency_s": 0.0,
+            "error": None,
+        }
         if signal == "HOLD":
             logging.info(f"Signal is HOLD for {ticker}. No action taken.")
-            return
+            return result
 
-        if confidence <= 0.75:
+        if confidence <= CONFIDENCE_THRESHOLD:
             logging.info(
-                f"Confidence for {ticker} ({confidence:.2f}) is below threshold (0.75). No action taken."
+                f"Confidence for {ticker} ({confidence:.2f}) is below threshold ({CONFIDENCE_THRESHOLD}). No action taken."
             )
-            return
+            return result
 
-        try:
-            if signal == "BUY":
-                logging.info(
-                    f"Executing BUY for {ticker} with confidence {confidence:.2f}."
-                )
-                order_data = MarketOrderRequest(
-                    symbol=ticker,
-                    notional=10000,  # $10,000 USD fixed allocation
-                    side=OrderSide.BUY,
-                    time_in_force=TimeInForce.DAY,
-                )
-                self.client.submit_order(order_data=order_data)
-                logging.info(f"Market BUY order for $10,000 of {ticker} submitted.")
+        key = client_order_id_for(day or trading_day(), ticker, signal)
+        previous = self.journal.last_status(key) if self.journal is not None else None
+        if previous == "submitted":
+            result.update(status="duplicate", error=f"{key} was already submitted")
+            logging.info(f"{signal} for {ticker} already submitted today ({key}). No action taken.")
+            return result
 
-            elif signal == "SELL":
-                logging.info(
-                    f"Executing SELL for {ticker} with confidence {confidence:.2f}."
-                )
-                # Sells the entire position for the given ticker
-                try:
-                    self.client.close_position(ticker)
-                    logging.info(
-                        f"Market SELL order to close entire position of {ticker} submitted."
-                    )
-                except APIError as e:
-                    if e.status_code == 404:
-                        logging.info(f"No active position for {ticker} to sell.")
+        # The cached state answers what would otherwise be a rejected request
+        reserved = signal == "BUY" and self.state.loaded
+        if reserved and not self.state.reserve(ORDER_NOTIONAL, key):
+            result.update(
+                status="insufficient_funds",
+                error=f"Buying power ${self.state.buying_power:,.2f} < ${ORDER_NOTIONAL:,}",
+            )
+            logging.warning(f"Not enough buying power to BUY {ticker}: {result['error']}.")
+            return result
+        if signal == "SELL" and self.state.loaded and not self.state.has_position(ticker):
+            result["status"] = "no_position"
+            logging.info(f"No active position for {ticker} to sell.")
+            return result
+
+        if signal == "BUY":
+            logging.info(f"Executing BUY for {ticker} with confidence {confidence:.2f}.")
+            order_data = MarketOrderRequest(
+                symbol=ticker,
+                notional=ORDER_NOTIONAL,  # $10,000 USD fixed allocation
+                side=OrderSide.BUY,
+                time_in_force=TimeInForce.DAY,
+                client_order_id=key,  # same id on every retry and after a restart
+            )
+            request = partial(self.client.submit_order, order_data=order_data)
+        elif signal == "SELL":
+            logging.info(f"Executing SELL for {ticker} with confidence {confidence:.2f}.")
+            # Sells the entire position for the given ticker
+            request = partial(self.client.close_position, ticker)
+        else:
+            result.update(status="failed", error=f"Unknown signal {signal!r}")
+            logging.error(f"Unknown signal {signal!r} for {ticker}.")
+            return result
+
+        if self.journal is not None:
+            self.journal.record(key, ticker, signal, "pending")
+        order = None
+        start = time.perf_counter()
+        for attempt in range(1, retries + 2):
+            result["attempts"] = attempt
+            try:
+                if limiter is not None:
+                    limiter.acquire()
+                if timeout is not None:
+                    order = call_with_timeout(request, timeout)
+                else:
+                    order = request()
+                result.update(status="submitted", order_id=str(getattr(order, "id", "")) or None)
+                if signal == "BUY":
+                    logging.info(f"Market BUY order for ${ORDER_NOTIONAL:,} of {ticker} submitted.")
+                else:
+                    logging.info(f"Market SELL order to close entire position of {ticker} submitted.")
+                break
+            except APIError as e:
+                if signal == "SELL" and e.status_code == 404:
+                    # Gone after an earlier attempt whose response was lost: this run closed it
+                    resent = attempt > 1 or previous in UNRESOLVED
+                    if resent:
+                        self.state.invalidate()  # its proceeds are only known to the broker
+                        logging.info(f"SELL for {ticker} was already executed by the broker ({key}).")
                     else:
-                        logging.error(f"Failed to close position for {ticker}: {e}")
+                        self.state.closed(ticker)
+                        logging.info(f"No active position for {ticker} to sell.")
+                    result.update(status="submitted" if resent else "no_position", error=None)
+                    break
+                if signal == "BUY" and e.status_code == 422 and "client_order_id" in str(e):
+                    # The broker already has this order: from an earlier attempt whose response
+                    # was lost (submitted), or from an earlier run without a journal (duplicate)
+                    resent = attempt > 1 or previous in UNRESOLVED
+                    result.update(status="submitted" if resent else "duplicate", error=None)
+                    logging.info(f"BUY for {ticker} was already accepted by the broker ({key}).")
+                    break
+                result.update(status="failed", error=str(e))
+                if e.status_code == 403:
+                    self.state.invalidate()  # the cached buying power was off
+                if not is_transient(e) or attempt > retries:
+                    logging.error(f"Failed to execute trade for {ticker}: {e}")
+                    break
+            except Exception as e:
+                timed_out = isinstance(e, FutureTimeout)
+                result.update(
+                    status="timeout" if timed_out else "failed",
+                    error=f"No response after {timeout}s" if timed_out else str(e),
+                )
+                if not is_transient(e) or attempt > retries:
+                    logging.error(f"Failed to execute trade for {ticker}: {result['error']}")
+                    break
+            delay = RETRY_BACKOFF * 2 ** (attempt - 1)
+            logging.warning(f"Transient error for {ticker} ({result['error']}), retrying in {delay:.2f}s.")
+            time.sleep(delay)
 
-        except Exception as e:
-            logging.error(f"Failed to execute trade for {ticker}: {e}")
+        result["latency_s"] = time.perf_counter() - start
+        if result["status"] == "submitted":
+            if signal == "BUY":
+                self.state.opened(ticker, getattr(order, "filled_qty", None))
+            else:
+                self.state.closed(ticker, order)
+        elif reserved and result["status"] in ("failed", "duplicate"):
+            # A timed-out BUY may still fill: its reservation stays until the next refresh
+            self.state.release(ORDER_NOTIONAL, key)
+        if self.journal is not None:
+            self.journal.record(key, ticker, signal, result["status"], result["order_id"], result["error"])
+        return result
 
 
-if __name__ == "__main__":
-    # This block is for demonstration and testing purposes.
-    # In a real scenario, you would load predictions from a file or another service.
+def build_prediction_service():
+    """
+    Prediction service for the scheduled run, reading models from the data-lake bucket
+    (`GCP_BUCKET_NAME`, as set by the manifests; `GCS_BUCKET_NAME` is still accepted).
+    """
+    bucket_name = os.getenv("GCP_BUCKET_NAME") or os.getenv("GCS_BUCKET_NAME")
+    bucket = storage.Client().bucket(bucket_name) if bucket_name else None
+    # Latest registered model versions (falls back to models/ when unregistered)
+    return PredictionService(bucket_name=bucket_name, registry=ModelRegistry(bucket=bucket))
+
 
+def main():
     # --- IMPORTANT ---
     # Make sure to set your Alpaca API keys as environment variables
     # Example for paper trading:
     # export ALPACA_API_KEY='YOUR_PAPER_API_KEY'
     # export ALPACA_SECRET_KEY='YOUR_PAPER_SECRET_KEY'
 
-    bot = TradingBot(paper=True)
+    # Orders sent by a run that crashed are settled before anything new goes out
+    bot = TradingBot(paper=True, journal=OrderJournal())
+    if isinstance(bot.client, TradingClient):
+        # Fills update the cached positions as they happen instead of polling
+        bot.state.start_stream(TradingStream(bot.api_key, bot.secret_key, paper=True))
 
     # Check market status, but force execution for testing if market is closed
     if bot.check_market_status(force_test=True):
-        # Simulated prediction for demonstration
-        simulated_prediction = {"ticker": "AAPL", "signal": "BUY", "confidence": 0.85}
+        # Score every ticker in one call (models and scalers are loaded once)
+        service = build_prediction_service()
+        signals = service.predict_all()
+        logging.info(f"Signals:\n{signals.to_string(index=False)}")
 
-        logging.info(f"Processing simulated prediction: {simulated_prediction}")
+        # All qualifying orders go out concurrently (rate-limited, with retries)
+        report = bot.execute_batch(signals)
+        logging.info(f"Orders:\n{report.to_string(index=False)}")
 
-        bot.execute_trade(
-            ticker=simulated_prediction["ticker"],
-            signal=simulated_prediction["signal"],
-            confidence=simulated_prediction["confidence"],
-        )
+        logging.info("Trading execution finished.")
+    bot.state.stop_stream()
+    return bot
 
-        # Example of a SELL signal
-        simulated_sell_prediction = {
-            "ticker": "MSFT",
-            "signal": "SELL",
-            "confidence": 0.92,
-        }
-        logging.info(f"Processing simulated prediction: {simulated_sell_prediction}")
-        bot.execute_trade(
-            ticker=simulated_sell_prediction["ticker"],
-            signal=simulated_sell_prediction["signal"],
-            confidence=simulated_sell_prediction["confidence"],
-        )
 
-        # Example of a HOLD signal
-        simulated_hold_prediction = {
-            "ticker": "GOOGL",
-            "signal": "HOLD",
-            "confidence": 0.60,
-        }
-        logging.info(f"Processing simulated prediction: {simulated_hold_prediction}")
-        bot.execute_trade(
-            ticker=simulated_hold_prediction["ticker"],
-            signal=simulated_hold_prediction["signal"],
-            confidence=simulated_hold_prediction["confidence"],
-        )
-
-        logging.info("Simulated trading execution finished.")
+if __name__ == "__main__":
+    main()
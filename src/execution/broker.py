@@ -0,0 +1,60 @@
+"""
+Broker interface used by the bot, and a factory for its implementations.
+
+`Broker` is the subset of `alpaca.trading.client.TradingClient` the execution path
+calls; `TradingClient` satisfies it as-is. Implementations:
+- "alpaca": the real client (paper or live), keys from the environment.
+- "fake": `FakeBroker`, an in-process stand-in with configurable latency and error
+  injection for offline tests, replays and throughput benchmarks.
+
+The `BROKER` environment variable selects the implementation the bot builds.
+"""
+
+import os
+from typing import Protocol, runtime_checkable
+
+BROKERS = ("alpaca", "fake")
+DEFAULT_BROKER = "alpaca"
+
+
+@runtime_checkable
+class Broker(Protocol):
+    def get_clock(self): ...
+
+    def get_account(self): ...
+
+    def get_all_positions(self): ...
+
+    def get_open_position(self, symbol_or_asset_id): ...
+
+    def get_order_by_client_id(self, client_id): ...
+
+    def submit_order(self, order_data): ...
+
+    def close_position(self, symbol_or_asset_id): ...
+
+
+def make_broker(kind=None, paper=True, api_key=None, secret_key=None, **kwargs) -> Broker:
+    """
+    Builds the broker named `kind` (default: $BROKER, else "alpaca").
+    - alpaca: `api_key` / `secret_key` default to ALPACA_API_KEY / ALPACA_SECRET_KEY.
+    - fake: `kwargs` go to `FakeBroker` (cash, prices, latency, error_rate, ...).
+    """
+    kind = (kind or os.getenv("BROKER") or DEFAULT_BROKER).lower()
+    if kind not in BROKERS:
+        raise ValueError(f"Unknown broker {kind!r}; expected one of {BROKERS}.")
+
+    if kind == "fake":
+        from src.execution.fake_broker import FakeBroker
+
+        return FakeBroker(**kwargs)
+
+    from alpaca.trading.client import TradingClient
+
+    api_key = api_key or os.getenv("ALPACA_API_KEY")
+    secret_key = secret_key or os.getenv("ALPACA_SECRET_KEY")
+    if not api_key or not secret_key:
+        raise ValueError(
+            "ALPACA_API_KEY and ALPACA_SECRET_KEY must be set in environment variables."
+        )
+    return TradingClient(api_key, secret_key, paper=paper)
@@ -0,0 +1,323 @@
+"""
+In-process stand-in for `alpaca.trading.client.TradingClient`.
+
+Implements the `Broker` interface (clock, account, positions, orders by client id,
+`submit_order`, `close_position`) against local state, so the execution path can be
+replayed and load-tested offline. Market orders fill immediately at the last price set with
+`set_prices`; every fill is recorded in `fills`.
+
+Network behaviour can be injected per call:
+- latency / jitter: seconds slept before each call (base + uniform jitter).
+- error_rate: fraction of calls rejected with `error_status` (503 by default)
+  before touching any state.
+- drop_rate: fraction of calls whose response is lost after the broker applied
+  them (raises a connection error), as when a request times out in flight.
+Like Alpaca, a reused `client_order_id` is rejected with a 422. It also stands in
+for `TradingStream`: handlers passed to `subscribe_trade_updates` get a `fill`
+update for every order.
+"""
+
+import asyncio
+import inspect
+import itertools
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import requests
+from alpaca.common.exceptions import APIError
+from alpaca.trading.enums import OrderSide
+
+START_CASH = 100_000.0
+DUPLICATE_ORDER_MESSAGE = "client_order_id must be unique"
+
+
+def api_error(status_code, message):
+    """An `APIError` carrying an HTTP status, as raised by the real client."""
+    response = requests.Response()
+    response.status_code = status_code
+    return APIError(
+        f'{{"code": {status_code}0000, "message": "{message}"}}',
+        requests.HTTPError(message, response=response),
+    )
+
+
+@dataclass
+class FakeClock:
+    timestamp: datetime
+    is_open: bool
+    next_open: datetime
+    next_close: datetime
+
+
+@dataclass
+class FakeAccount:
+    cash: float
+    buying_power: float
+    equity: float
+
+
+@dataclass
+class FakePosition:
+    symbol: str
+    qty: float
+    avg_entry_price: float
+    current_price: float
+
+    @property
+    def market_value(self):
+        return self.qty * self.current_price
+
+
+@dataclass
+class FakeOrder:
+    id: str
+    client_order_id: str
+    symbol: str
+    side: OrderSide
+    qty: float
+    notional: float
+    filled_qty: float
+    filled_avg_price: float
+    status: str = "filled"
+    submitted_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+@dataclass
+class FakeTradeUpdate:
+    event: str
+    order: FakeOrder
+    timestamp: datetime
+    position_qty: float
+    price: float
+    qty: float
+
+
+class FakeBroker:
+    """
+    Local broker state: cash, positions at average entry price, orders and fills.
+    Thread-safe, so concurrent submissions behave like independent HTTP calls.
+    """
+
+    def __init__(
+        self,
+        cash=START_CASH,
+        prices=None,
+        now=None,
+        is_open=True,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        error_status=503,
+        drop_rate=0.0,
+        seed=None,
+    ):
+        self.cash = float(cash)
+        self.prices = dict(prices or {})
+        self.now = now or datetime.now(timezone.utc)
+        self.is_open = is_open
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.drop_rate = drop_rate
+        self.positions = {}  # symbol -> FakePosition
+        self.orders = []
+        self.fills = []
+        self.requests = Counter()  # calls per method, including failed ones
+        self._client_ids = set()
+        self._handlers = []
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _network(self, method):
+        """Injected latency and failures before the call reaches the broker state."""
+        with self._rng_lock:
+            self.requests[method] += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter) if self.jitter else self.latency
+            fail = self.error_rate and self._rng.random() < self.error_rate
+            drop = self.drop_rate and self._rng.random() < self.drop_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise api_error(self.error_status, "injected error")
+        return drop
+
+    @staticmethod
+    def _dropped():
+        return requests.ConnectionError("connection reset by peer (injected)")
+
+    # --- Replay controls ---
+
+    def set_prices(self, prices, now=None):
+        """Marks positions to the latest prices (and optionally moves the clock)."""
+        with self._lock:
+            self.prices.update(prices)
+            for symbol, position in self.positions.items():
+                if symbol in self.prices:
+                    position.current_price = self.prices[symbol]
+            if now is not None:
+                self.now = now
+
+    # --- TradingClient surface ---
+
+    def get_clock(self):
+        if self._network("get_clock"):
+            raise self._dropped()
+        return FakeClock(
+            timestamp=self.now,
+            is_open=self.is_open,
+            next_open=self.now + timedelta(days=1),
+            next_close=self.now + timedelta(hours=6, minutes=30),
+        )
+
+    def get_account(self):
+        if self._network("get_account"):
+            raise self._dropped()
+        with self._lock:
+            equity = self.cash + sum(p.market_value for p in self.positions.values())
+            return FakeAccount(cash=self.cash, buying_power=self.cash, equity=equity)
+
+    def get_all_positions(self):
+        if self._network("get_all_positions"):
+            raise self._dropped()
+        with self._lock:
+            return list(self.positions.values())
+
+    def get_open_position(self, symbol):
+        if self._network("get_open_position"):
+            raise self._dropped()
+        with self._lock:
+            if symbol not in self.positions:
+                raise api_error(404, "position does not exist")
+            return self.positions[symbol]
+
+    def get_order_by_client_id(self, client_id):
+        if self._network("get_order_by_client_id"):
+            raise self._dropped()
+        with self._lock:
+            for order in self.orders:
+                if order.client_order_id == client_id:
+                    return order
+        raise api_error(404, "order not found")
+
+    def submit_order(self, order_data):
+        dropped = self._network("submit_order")
+        symbol, side = order_data.symbol, order_data.side
+        with self._lock:
+            if order_data.client_order_id in self._client_ids:
+                raise api_error(422, DUPLICATE_ORDER_MESSAGE)
+            price = self.prices.get(symbol)
+            if price is None:
+                raise api_error(422, f"no price for {symbol}")
+            if order_data.notional is not None:
+                qty = float(order_data.notional) / price
+            else:
+                qty = float(order_data.qty)
+            if side == OrderSide.BUY and qty * price > self.cash + 1e-9:
+                raise api_error(403, "insufficient buying power")
+            order = self._fill(symbol, side, qty, price, order_data.client_order_id)
+        self._publish(order)
+        if dropped:
+            raise self._dropped()
+        return order
+
+    def close_position(self, symbol_or_asset_id):
+        dropped = self._network("close_position")
+        with self._lock:
+            position = self.positions.get(symbol_or_asset_id)
+            if position is None:
+                raise api_error(404, "position does not exist")
+            price = self.prices.get(symbol_or_asset_id, position.current_price)
+            order = self._fill(symbol_or_asset_id, OrderSide.SELL, position.qty, price, None)
+        self._publish(order)
+        if dropped:
+            raise self._dropped()
+        return order
+
+    # --- TradingStream surface ---
+
+    def subscribe_trade_updates(self, handler):
+        self._handlers.append(handler)
+        self._stopped.clear()
+
+    def run(self):
+        """Blocks like `TradingStream.run`; updates are delivered from the submitting thread."""
+        self._stopped.wait()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _publish(self, order):
+        if not self._handlers:
+            return
+        with self._lock:
+            position = self.positions.get(order.symbol)
+            update = FakeTradeUpdate(
+                event="fill",
+                order=order,
+                timestamp=self.now,
+                position_qty=position.qty if position else 0.0,
+                price=order.filled_avg_price,
+                qty=order.filled_qty,
+            )
+        for handler in self._handlers:
+            if inspect.iscoroutinefunction(handler):
+                asyncio.run(handler(update))
+            else:
+                handler(update)
+
+    # --- Internals (caller holds the lock) ---
+
+    def _fill(self, symbol, side, qty, price, client_order_id):
+        signed = qty if side == OrderSide.BUY else -qty
+        position = self.positions.get(symbol)
+        if position is None:
+            position = FakePosition(symbol, 0.0, price, price)
+        if signed > 0:
+            cost = position.avg_entry_price * position.qty + price * signed
+            position.qty += signed
+            position.avg_entry_price = cost / position.qty
+        else:
+            position.qty += signed
+        position.current_price = price
+
+        if position.qty > 1e-9:
+            self.positions[symbol] = position
+        else:
+            self.positions.pop(symbol, None)
+        self.cash -= signed * price
+
+        if client_order_id is not None:
+            self._client_ids.add(client_order_id)
+        order = FakeOrder(
+            id=str(uuid.uuid4()),
+            client_order_id=client_order_id or f"fake-{next(self._ids)}",
+            symbol=symbol,
+            side=side,
+            qty=qty,
+            notional=qty * price,
+            filled_qty=qty,
+            filled_avg_price=price,
+            submitted_at=self.now,
+        )
+        self.orders.append(order)
+        self.fills.append(
+            {
+                "timestamp": self.now,
+                "symbol": symbol,
+                "side": side.value,
+                "qty": qty,
+                "price": price,
+                "notional": qty * price,
+                "client_order_id": order.client_order_id,
+            }
+        )
+        return order
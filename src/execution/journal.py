@@ -0,0 +1,149 @@
+"""
+Append-only order journal, so a restarted bot does not send the same order twice.
+
+Every order gets a deterministic `client_order_id`, `mso-YYYYMMDD-TICKER-SIGNAL`
+(one BUY and one SELL per ticker and trading day). Before each submission the bot:
+1. Looks up the id's latest journal entry and skips it if it was already submitted.
+2. Appends a `pending` entry (fsynced by SQLite before the order leaves the pod).
+3. Appends the outcome (`submitted`, `failed`, `timeout`, ...) when the call returns.
+
+On startup, `reconcile` resolves only the entries left `pending` / `timeout` by a
+crash, with one `get_order_by_client_id` per BUY (no order-history scan) and the
+position list for SELLs. Because the broker also rejects a reused `client_order_id`,
+a BUY re-sent after a lost journal is refused (422) rather than filled twice.
+
+Storage is SQLite in WAL mode: appends never rewrite earlier rows, readers do not
+block the writer, and a half-written transaction is discarded on recovery.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+from alpaca.common.exceptions import APIError
+
+JOURNAL_PATH = os.getenv("ORDER_JOURNAL_PATH", "data/journal/orders.db")
+ID_PREFIX = "mso"
+UNRESOLVED = ("pending", "timeout")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_order_id TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    signal TEXT NOT NULL,
+    status TEXT NOT NULL,
+    order_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_order_events_id ON order_events (client_order_id, seq);
+"""
+
+
+def client_order_id_for(day, ticker, signal):
+    """Deterministic id of the `signal` order for `ticker` on trading `day`."""
+    return f"{ID_PREFIX}-{pd.Timestamp(day):%Y%m%d}-{ticker}-{signal}"
+
+
+class OrderJournal:
+    """Thread-safe append-only journal of order events in a SQLite (WAL) file."""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: every append is on disk before the order it guards is sent
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+
+    def record(self, client_order_id, ticker, signal, status, order_id=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO order_events "
+                "(client_order_id, recorded_at, ticker, signal, status, order_id, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    client_order_id,
+                    datetime.now(timezone.utc).isoformat(),
+                    ticker,
+                    signal,
+                    status,
+                    order_id,
+                    error,
+                ),
+            )
+
+    def last_status(self, client_order_id):
+        """Latest status recorded for `client_order_id` (None if never seen)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM order_events WHERE client_order_id = ? ORDER BY seq DESC LIMIT 1",
+                (client_order_id,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def latest(self) -> pd.DataFrame:
+        """Latest event of every order."""
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT e.* FROM order_events e JOIN ("
+                "  SELECT client_order_id, MAX(seq) AS seq FROM order_events GROUP BY client_order_id"
+                ") last USING (client_order_id, seq) ORDER BY e.seq",
+                self._conn,
+            )
+
+    def history(self) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM order_events ORDER BY seq", self._conn)
+
+    def unresolved(self) -> pd.DataFrame:
+        """Orders whose outcome is unknown: in flight when the bot stopped, or timed out."""
+        latest = self.latest()
+        return latest[latest["status"].isin(UNRESOLVED)].reset_index(drop=True)
+
+    def reconcile(self, client, positions=None):
+        """
+        Settles unresolved orders against the broker and journals the outcome.
+        - BUY: `get_order_by_client_id`; found -> submitted, 404 -> failed (may be re-sent).
+        - SELL: closed if the position is gone (`positions`: held symbols; read from
+          the broker when not given), otherwise failed.
+        Returns the number of orders settled; errors leave the entry unresolved.
+        """
+        pending = self.unresolved()
+        if pending.empty:
+            return 0
+        if positions is None and (pending["signal"] == "SELL").any():
+            positions = {p.symbol for p in client.get_all_positions()}
+
+        settled = 0
+        for entry in pending.itertuples(index=False):
+            if entry.signal == "BUY":
+                try:
+                    order = client.get_order_by_client_id(entry.client_order_id)
+                except APIError as e:
+                    if e.status_code != 404:
+                        logging.warning(f"Could not reconcile {entry.client_order_id}: {e}")
+                        continue
+                    status, order_id, error = "failed", None, "not found at broker"
+                else:
+                    status, order_id, error = "submitted", str(order.id), None
+            else:
+                if entry.ticker in positions:
+                    status, order_id, error = "failed", None, "position still open"
+                else:
+                    status, order_id, error = "submitted", None, None
+            self.record(entry.client_order_id, entry.ticker, entry.signal, status, order_id, error)
+            settled += 1
+            logging.info(f"Reconciled {entry.client_order_id} ({entry.status}) as {status}.")
+        return settled
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
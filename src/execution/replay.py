@@ -0,0 +1,377 @@
+"""
+Event-driven replay of the live trading loop against a local fake broker.
+
+Historical daily bars (Gold master datasets) and scored news (processed
+embeddings) are merged into one time-ordered event stream and replayed at a
+configurable speed, or as fast as possible. News events update each ticker's
+session sentiment as they arrive; at every session close the same path as the
+live bot runs for all tickers at once:
+
+    features   -> last `seq_length` rows per ticker, sentiment from news seen so far
+    prediction -> PredictionService.predict_all(data=...)
+    execution  -> TradingBot.execute_trade(...) per signal, against FakeBroker
+
+Per-stage latencies (plus per-order and end-to-end decision latency) are kept as
+samples and summarized as percentiles and log-spaced histograms; fills come from
+the fake broker. Results can be written to Parquet for offline comparison.
+
+Usage:
+    python -m src.execution.replay --tickers AAPL MSFT --start 2024-01-01 --speed 0
+"""
+
+import argparse
+import logging
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data.parquet_io import read_parquet, read_parquet_blob
+from src.execution.broker import make_broker
+from src.features.merge_data import SENTIMENT_COLUMNS, SENTIMENT_LABEL_MAP
+from src.features.trading_calendar import get_nyse_calendar
+
+GOLD_PATH = "data/gold/master_dataset_{ticker}.parquet"
+NEWS_PATH = "data/processed/embeddings/{ticker}_sentiment.parquet"
+REPORT_DIR = "data/replay"
+SEQ_LENGTH = 10
+
+STAGES = ("features", "prediction", "execution", "order", "decision")
+# Histogram bucket edges in milliseconds: 10 per decade from 10 µs to 100 s
+LATENCY_BUCKETS_MS = np.logspace(-2, 5, 71)
+
+# Fallback bar time for sessions missing from the calendar: 16:00 New York (EST)
+DEFAULT_CLOSE_OFFSET = np.timedelta64(21, "h")
+
+NEWS, BAR = 0, 1  # event kinds; news sorts before a bar with the same timestamp
+
+
+class LatencyRecorder:
+    """Latency samples per stage, summarized as percentiles and histograms."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def record(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - t0)
+
+    def summary(self) -> pd.DataFrame:
+        rows = []
+        for stage in sorted(self.samples, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            ms = np.asarray(self.samples[stage]) * 1e3
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            rows.append(
+                {
+                    "stage": stage,
+                    "count": len(ms),
+                    "mean_ms": ms.mean(),
+                    "p50_ms": p50,
+                    "p90_ms": p90,
+                    "p99_ms": p99,
+                    "max_ms": ms.max(),
+                }
+            )
+        return pd.DataFrame(rows)
+
+    def histograms(self, buckets_ms=LATENCY_BUCKETS_MS) -> pd.DataFrame:
+        """Counts per bucket (long format: stage, upper edge in ms, count)."""
+        frames = []
+        edges = np.concatenate([[0.0], buckets_ms, [np.inf]])
+        for stage, samples in self.samples.items():
+            counts, _ = np.histogram(np.asarray(samples) * 1e3, bins=edges)
+            frames.append(pd.DataFrame({"stage": stage, "le_ms": edges[1:], "count": counts}))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+@dataclass
+class ReplayReport:
+    latency: pd.DataFrame
+    histograms: pd.DataFrame
+    fills: pd.DataFrame
+    signals: pd.DataFrame
+    sessions: int
+    events: int
+    wall_s: float
+
+    def save(self, out_dir=REPORT_DIR):
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name in ("latency", "histograms", "fills", "signals"):
+            getattr(self, name).to_parquet(out_dir / f"{name}.parquet", index=False)
+        return out_dir
+
+
+# --- Lake loaders ---
+
+
+def load_bars(tickers, gold_path=GOLD_PATH, bucket=None, start=None, end=None) -> dict:
+    """{ticker: Gold master dataset} for the replay window (missing tickers are skipped)."""
+    bars = {}
+    for ticker in tickers:
+        path = gold_path.format(ticker=ticker)
+        if bucket is not None:
+            df = read_parquet_blob(bucket, path, start=start, end=end)
+        elif Path(path).exists():
+            df = read_parquet(path, start=start, end=end)
+        else:
+            df = None
+        if df is None or df.empty:
+            logging.warning(f"No bars for {ticker}, skipping.")
+            continue
+        if "Date" in df.columns:
+            df = df.set_index(pd.to_datetime(df["Date"]))
+        bars[ticker] = df.sort_index()
+    return bars
+
+
+def load_news(tickers, news_path=NEWS_PATH, bucket=None) -> pd.DataFrame:
+    """Scored news for all tickers: ticker, timestamp (UTC ns), session day and weighted score."""
+    frames = []
+    for ticker in tickers:
+        path = news_path.format(ticker=ticker)
+        if bucket is not None:
+            df = read_parquet_blob(bucket, path, columns=SENTIMENT_COLUMNS)
+        elif Path(path).exists():
+            df = read_parquet(path, columns=SENTIMENT_COLUMNS)
+        else:
+            df = None
+        if df is None or df.empty or "sentiment_label" not in df.columns:
+            continue
+        date_col = "date" if "date" in df.columns else "publishedAt"
+        utc_ns = pd.to_datetime(df[date_col], utc=True).to_numpy(dtype="datetime64[ns]").view(np.int64)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "ticker": ticker,
+                    "timestamp": utc_ns,
+                    "session": get_nyse_calendar().session_days(utc_ns),
+                    "score": df["sentiment_label"].map(SENTIMENT_LABEL_MAP).to_numpy(dtype=float)
+                    * df["sentiment_score"].to_numpy(dtype=float),
+                }
+            )
+        )
+    columns = ["ticker", "timestamp", "session", "score"]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def session_close_ns(dates) -> np.ndarray:
+    """Close time (UTC ns) of each bar's session, from the NYSE calendar."""
+    days = pd.DatetimeIndex(dates).normalize().to_numpy(dtype="datetime64[D]").astype(np.int64)
+    calendar = get_nyse_calendar()
+    idx = np.minimum(np.searchsorted(calendar.sessions, days), len(calendar.sessions) - 1)
+    fallback = (pd.DatetimeIndex(dates).normalize() + DEFAULT_CLOSE_OFFSET).to_numpy(dtype="datetime64[ns]")
+    return np.where(calendar.sessions[idx] == days, calendar.closes[idx], fallback.view(np.int64))
+
+
+def relevant_news(news: pd.DataFrame, bars: dict) -> pd.DataFrame:
+    """News for the replayed tickers that lands in a session from the first bar onwards."""
+    if news is None or news.empty or not bars:
+        return pd.DataFrame(columns=["ticker", "timestamp", "session", "score"])
+    first_day = min(
+        pd.DatetimeIndex(df.index[:1]).normalize().to_numpy(dtype="datetime64[D]").astype(np.int64)[0]
+        for df in bars.values()
+    )
+    keep = news["ticker"].isin(list(bars)) & (news["session"] >= first_day)
+    return news[keep].reset_index(drop=True)
+
+
+def build_events(bars: dict, news: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Single time-ordered event stream: timestamp, kind (NEWS/BAR), ticker, row (position
+    in the ticker's bars or in `news`) and session day.
+    """
+    frames = []
+    for ticker, df in bars.items():
+        days = pd.DatetimeIndex(df.index).normalize().to_numpy(dtype="datetime64[D]").astype(np.int64)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "timestamp": session_close_ns(df.index),
+                    "kind": BAR,
+                    "ticker": ticker,
+                    "row": np.arange(len(df)),
+                    "session": days,
+                }
+            )
+        )
+    if frames and news is not None and len(news):
+        frames.append(news.assign(kind=NEWS, row=np.arange(len(news)))[list(frames[0].columns)])
+    events = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return events.sort_values(["timestamp", "kind"], kind="stable", ignore_index=True)
+
+
+# --- Simulator ---
+
+
+class ReplaySimulator:
+    """
+    Replays `bars` (+ `news`) through `service` and `bot`. The bot must be built
+    with a `FakeBroker` client (`TradingBot(client=FakeBroker())`).
+    - speed: market seconds per wall-clock second; None or 0 = as fast as possible.
+    """
+
+    def __init__(
+        self,
+        bot,
+        service,
+        bars: dict,
+        news: pd.DataFrame = None,
+        speed=None,
+        seq_length=SEQ_LENGTH,
+        sleep=time.sleep,
+    ):
+        self.bot = bot
+        self.broker = bot.client
+        # Replayed time runs ahead of the wall-clock poll: fills keep the bot's cache current
+        bot.state.start_stream(self.broker)
+        self.service = service
+        self.bars = bars
+        self.news = relevant_news(news, bars)
+        self.speed = speed
+        self.seq_length = seq_length
+        self.sleep = sleep
+        self.latency = LatencyRecorder()
+        self.signals = []
+        # (ticker, session day) -> [sum of weighted scores, count] of news seen so far
+        self._sentiment = defaultdict(lambda: [0.0, 0])
+
+    def _pace(self, start_wall, start_ts, timestamp):
+        if not self.speed:
+            return
+        target = start_wall + (timestamp - start_ts) / 1e9 / self.speed
+        delay = target - time.perf_counter()
+        if delay > 0:
+            self.sleep(delay)
+
+    def _features(self, ticker, row, session):
+        """Window ending at `row` with the session's sentiment from news replayed so far."""
+        df = self.bars[ticker]
+        window = df.iloc[max(0, row - self.seq_length + 1) : row + 1].copy()
+        total, count = self._sentiment.get((ticker, session), (0.0, 0))
+        if "daily_sentiment" in window.columns:
+            window.iloc[-1, window.columns.get_loc("daily_sentiment")] = total / count if count else 0.0
+        if "news_volume" in window.columns:
+            window.iloc[-1, window.columns.get_loc("news_volume")] = count
+        return window
+
+    def _session_close(self, batch, timestamp, arrived):
+        """Runs features -> prediction -> execution for every bar closing at `timestamp`."""
+        with self.latency.time("features"):
+            frames = {ticker: None for ticker in self.service.tickers}
+            prices = {}
+            for ticker, row, session in batch:
+                frames[ticker] = self._features(ticker, row, session)
+                prices[ticker] = float(frames[ticker]["Close"].iloc[-1])
+
+        with self.latency.time("prediction"):
+            signals = self.service.predict_all(data=frames)
+
+        now = pd.Timestamp(timestamp, tz="UTC").to_pydatetime()
+        self.broker.set_prices(prices, now=now)
+        with self.latency.time("execution"):
+            for signal in signals.itertuples(index=False):
+                if signal.ticker not in prices:
+                    continue
+                with self.latency.time("order"):
+                    self.bot.execute_trade(signal.ticker, signal.signal, signal.confidence, day=now)
+        self.latency.record("decision", time.perf_counter() - arrived)
+
+        signals = signals[signals["ticker"].isin(prices.keys())]
+        self.signals.append(signals.assign(timestamp=now))
+
+    def run(self, max_sessions=None) -> ReplayReport:
+        events = build_events(self.bars, self.news)
+        if events.empty:
+            raise ValueError("Nothing to replay: no bars for the requested tickers.")
+
+        kinds = events["kind"].to_numpy()
+        timestamps = events["timestamp"].to_numpy()
+        tickers = events["ticker"].to_numpy()
+        rows = events["row"].to_numpy()
+        sessions = events["session"].to_numpy()
+        scores = self.news["score"].to_numpy(dtype=float)
+
+        start_wall, start_ts = time.perf_counter(), timestamps[0]
+        n_sessions, i, n = 0, 0, len(events)
+        while i < n:
+            self._pace(start_wall, start_ts, timestamps[i])
+            if kinds[i] == NEWS:
+                state = self._sentiment[(tickers[i], sessions[i])]
+                state[0] += scores[rows[i]]
+                state[1] += 1
+                i += 1
+                continue
+
+            # All bars closing at the same time form one burst of signals
+            arrived = time.perf_counter()
+            j = i
+            while j < n and timestamps[j] == timestamps[i] and kinds[j] == BAR:
+                j += 1
+            batch = list(zip(tickers[i:j], rows[i:j], sessions[i:j]))
+            self._session_close(batch, timestamps[i], arrived)
+            n_sessions, i = n_sessions + 1, j
+            if max_sessions and n_sessions >= max_sessions:
+                break
+
+        signals = pd.concat(self.signals, ignore_index=True) if self.signals else pd.DataFrame()
+        return ReplayReport(
+            latency=self.latency.summary(),
+            histograms=self.latency.histograms(),
+            fills=pd.DataFrame(self.broker.fills),
+            signals=signals,
+            sessions=n_sessions,
+            events=i,
+            wall_s=time.perf_counter() - start_wall,
+        )
+
+
+def main(argv=None):
+    from src.execution.bot import TradingBot
+    from src.models.prediction_service import TICKERS, PredictionService
+
+    parser = argparse.ArgumentParser(description="Replay the live trading loop offline")
+    parser.add_argument("--tickers", nargs="+", default=TICKERS)
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--speed", type=float, default=0.0, help="market seconds per second (0 = max)")
+    parser.add_argument("--model-type", choices=("lstm", "svm"), default="lstm")
+    parser.add_argument("--cash", type=float, default=1_000_000.0)
+    parser.add_argument("--max-sessions", type=int, default=None)
+    parser.add_argument("--output", default=REPORT_DIR)
+    args = parser.parse_args([] if argv is None else argv)
+
+    bars = load_bars(args.tickers, start=args.start, end=args.end)
+    news = load_news(bars.keys())
+    logging.info(f"Replaying {len(bars)} tickers with {len(news)} news items.")
+
+    bot = TradingBot(client=make_broker("fake", cash=args.cash))
+    service = PredictionService(tickers=list(bars), model_type=args.model_type)
+    # Order logging would dominate the measured latencies
+    logging.getLogger().setLevel(logging.WARNING)
+    report = ReplaySimulator(bot, service, bars, news, speed=args.speed).run(args.max_sessions)
+    logging.getLogger().setLevel(logging.INFO)
+
+    logging.info(
+        f"Replayed {report.sessions} sessions ({report.events} events) in {report.wall_s:.2f}s, "
+        f"{len(report.fills)} fills."
+    )
+    print(report.latency.round(3).to_string(index=False))
+    logging.info(f"Report saved to {report.save(args.output)}")
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
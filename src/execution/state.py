@@ -0,0 +1,207 @@
+"""
+Local cache of the broker state the bot decides on: market clock, open positions and
+buying power.
+
+Loaded once at startup (`get_clock`, `get_account`, `get_all_positions`) and then kept
+current without a round-trip per signal:
+- Orders the bot submits update it right away (buying power reserved on BUY,
+  position opened on BUY / closed on SELL, with its proceeds once filled).
+- Fills from the trade-updates stream (`start_stream`) set each position to the
+  broker's `position_qty`, credit sell proceeds and debit BUYs the bot did not
+  reserve for (dashboard, manual or previous-run orders).
+Cash from each order is applied once, whichever of the two reports its fill first.
+- Without a stream, or after it drops, account and positions are re-read at most
+  every `poll_interval` seconds (`refresh_if_stale`).
+- The clock is only re-read once it passes its `next_open` / `next_close`.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+POLL_INTERVAL = 60.0  # seconds between account/position reads without a stream
+FILL_EVENTS = ("fill", "partial_fill")
+
+
+def _value(enum_or_str):
+    return getattr(enum_or_str, "value", enum_or_str)
+
+
+class BrokerState:
+    """Thread-safe cache of clock, positions (symbol -> qty) and buying power."""
+
+    def __init__(self, client, poll_interval=POLL_INTERVAL, now=None):
+        self.client = client
+        self.poll_interval = poll_interval
+        self.now = now or (lambda: datetime.now(timezone.utc))
+        self.clock = None
+        self.positions = {}
+        self.buying_power = 0.0
+        self.loaded = False
+        self.streaming = False
+        self.refreshed_at = None  # time.monotonic() of the last account/position read
+        self._reserved = set()  # client_order_ids whose notional was reserved up front
+        self._settled = {}  # order id -> filled notional already applied to buying power
+        self._lock = threading.RLock()
+        self._stream = None
+
+    # --- Broker reads ---
+
+    def load(self):
+        """Reads clock, account and positions. Returns False if the broker is unreachable."""
+        try:
+            self._load_clock()
+            self._load_account()
+        except Exception as e:
+            logging.warning(f"Could not load broker state ({e}); deciding without the cache.")
+            return False
+        logging.info(
+            f"Broker state loaded: market {'open' if self.clock.is_open else 'closed'}, "
+            f"{len(self.positions)} positions, buying power ${self.buying_power:,.2f}."
+        )
+        return True
+
+    def _load_clock(self):
+        clock = self.client.get_clock()
+        with self._lock:
+            self.clock = clock
+
+    def _load_account(self):
+        account = self.client.get_account()
+        positions = self.client.get_all_positions()
+        with self._lock:
+            self.buying_power = float(account.buying_power)
+            self.positions = {p.symbol: float(p.qty) for p in positions if float(p.qty) != 0}
+            self.refreshed_at = time.monotonic()
+            self.loaded = True
+
+    def refresh_if_stale(self):
+        """Polling fallback: re-reads account and positions when no stream keeps them current."""
+        with self._lock:
+            fresh = self.refreshed_at is not None and (
+                self.streaming or time.monotonic() - self.refreshed_at < self.poll_interval
+            )
+        if fresh:
+            return False
+        try:
+            self._load_account()
+        except Exception as e:
+            logging.warning(f"Could not refresh broker state ({e}); using the cached one.")
+            return False
+        return True
+
+    def invalidate(self):
+        """Forces a re-read on the next `refresh_if_stale` (e.g. after the broker disagreed)."""
+        with self._lock:
+            self.refreshed_at = None
+
+    def market_open(self):
+        """Whether the market is open, from the cached clock (re-read past its next open/close)."""
+        with self._lock:
+            clock = self.clock
+        if clock is None or self.now() >= (clock.next_close if clock.is_open else clock.next_open):
+            self._load_clock()
+        return self.clock.is_open
+
+    # --- Local updates ---
+
+    def has_position(self, symbol):
+        with self._lock:
+            return symbol in self.positions
+
+    def reserve(self, notional, client_order_id=None):
+        """Takes `notional` from the buying power; False (nothing taken) if it does not cover it."""
+        with self._lock:
+            if self.buying_power + 1e-9 < notional:
+                return False
+            self.buying_power -= notional
+            if client_order_id is not None:
+                self._reserved.add(client_order_id)
+            return True
+
+    def release(self, notional, client_order_id=None):
+        with self._lock:
+            self.buying_power += notional
+            self._reserved.discard(client_order_id)
+
+    def opened(self, symbol, qty=0.0):
+        """A BUY was accepted; its fill (stream or next poll) sets the exact quantity."""
+        with self._lock:
+            self.positions.setdefault(symbol, float(qty or 0.0))
+
+    def closed(self, symbol, order=None):
+        """
+        The position is gone. For a close the bot sent (`order`), credits its proceeds
+        if already filled; otherwise, without a stream to report the fill, the next
+        `refresh_if_stale` re-reads the account.
+        """
+        with self._lock:
+            self.positions.pop(symbol, None)
+            if order is not None and not self._settle(order, +1) and not self.streaming:
+                self.refreshed_at = None
+
+    def _settle(self, order, sign):
+        """Applies the not-yet-applied part of `order`'s filled notional (caller holds the lock)."""
+        filled = float(getattr(order, "filled_qty", None) or 0) * float(
+            getattr(order, "filled_avg_price", None) or 0
+        )
+        if not filled:
+            return False
+        key = str(order.id)
+        self.buying_power += sign * (filled - self._settled.get(key, 0.0))
+        self._settled[key] = filled
+        return True
+
+    def on_trade_update(self, update):
+        """Applies a fill from the trade-updates stream (`alpaca.trading.models.TradeUpdate`)."""
+        if _value(update.event) not in FILL_EVENTS:
+            return
+        order = update.order
+        with self._lock:
+            if update.position_qty is not None:
+                qty = float(update.position_qty)
+                if qty:
+                    self.positions[order.symbol] = qty
+                else:
+                    self.positions.pop(order.symbol, None)
+            if _value(order.side) == "sell":
+                self._settle(order, +1)
+            elif order.client_order_id not in self._reserved:
+                self._settle(order, -1)
+
+    # --- Trade-updates stream ---
+
+    async def _handle_trade_update(self, update):
+        self.on_trade_update(update)
+
+    def start_stream(self, stream):
+        """
+        Follows fills from `stream` (`alpaca.trading.stream.TradingStream`, or a
+        `FakeBroker`) in a daemon thread. While it runs, polling is off; if it stops,
+        the next `refresh_if_stale` re-reads the broker.
+        """
+        stream.subscribe_trade_updates(self._handle_trade_update)
+        with self._lock:
+            self.streaming = True
+            self._stream = stream
+
+        def run():
+            try:
+                stream.run()
+            except Exception as e:
+                logging.warning(f"Trade-updates stream stopped ({e}); falling back to polling.")
+            finally:
+                with self._lock:
+                    self.streaming = False
+                    self.refreshed_at = None  # fills may have been missed
+
+        thread = threading.Thread(target=run, name="trade-updates", daemon=True)
+        thread.start()
+        return thread
+
+    def stop_stream(self):
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
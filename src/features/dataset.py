@@ -0,0 +1,111 @@
+"""
+Preparación única de features y target a partir del Dataset Maestro (capa Gold).
+
+Trainers (SVM / LSTM), backtesting y serving (dashboard, bot) arman sus matrices
+con este módulo, de modo que todos ven exactamente las mismas features:
+
+- `feature_columns(columns, feature_set)`: columnas predictoras de un conjunto.
+- `prepare_dataset(df, ...)`: `Dataset` con X (n, F) float32 C-contiguo, y float32
+  y los nombres de features. Se escribe X columna a columna en un único buffer
+  (sin `copy()` / `iloc` / `dropna` intermedios) y las filas inválidas del inicio
+  o del final se descartan con un slice, que es una vista.
+- `feature_matrix(df, feature_names, tail)`: mismas features sin target, para
+  inferencia sobre las últimas filas.
+
+Target: 1 si el Close del día siguiente es mayor que el de hoy. La última fila no
+tiene "mañana" y queda fuera del entrenamiento.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+TARGET_PRICE_COL = "Close"
+
+# Columnas que nunca son features (identificadores, fechas, target)
+NON_FEATURE_COLS = ("Target", "date_only", "Ticker", "Date")
+PRICE_COLS = ("Open", "High", "Low", "Close", "Volume")
+
+# Columnas excluidas por conjunto de features: el LSTM usa precios + indicadores,
+# el SVM solo indicadores y sentimiento (precios crudos no son estacionarios)
+FEATURE_SETS = {
+    "lstm": NON_FEATURE_COLS,
+    "svm": NON_FEATURE_COLS + PRICE_COLS,
+}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    X: np.ndarray  # (n, F) float32, C-contiguo
+    y: np.ndarray  # (n,) float32 (1.0 si sube mañana); None en inferencia
+    feature_names: tuple
+    index: pd.Index
+
+    def __len__(self):
+        return len(self.X)
+
+    def frame(self) -> pd.DataFrame:
+        """X como DataFrame (vista sobre el mismo buffer, sin copiar)."""
+        return pd.DataFrame(self.X, index=self.index, columns=list(self.feature_names), copy=False)
+
+
+def feature_columns(columns, feature_set="lstm") -> list:
+    """Columnas predictoras de `columns` para el conjunto `feature_set`, en orden."""
+    if feature_set not in FEATURE_SETS:
+        raise ValueError(f"feature_set debe ser uno de {tuple(FEATURE_SETS)}, no '{feature_set}'")
+    excluded = FEATURE_SETS[feature_set]
+    return [c for c in columns if c not in excluded]
+
+
+def _fill_matrix(df, feature_names, rows=slice(None)) -> np.ndarray:
+    """Copia directa columna a columna a un buffer float32 C-contiguo (una sola pasada)."""
+    n = len(df.index[rows])
+    X = np.empty((n, len(feature_names)), dtype=np.float32)
+    for j, col in enumerate(feature_names):
+        X[:, j] = df[col].to_numpy()[rows]
+    return X
+
+
+def _select_rows(X, y, index, valid):
+    """Filtra filas válidas: slice (vista) si forman un bloque contiguo, máscara si no."""
+    if valid.all():
+        return X, y, index
+    positions = np.flatnonzero(valid)
+    if len(positions) == 0:
+        return X[:0], y[:0], index[:0]
+    first, last = positions[0], positions[-1] + 1
+    if len(positions) == last - first:
+        return X[first:last], y[first:last], index[first:last]
+    return X[valid], y[valid], index[valid]
+
+
+def prepare_dataset(df, feature_set="lstm", feature_names=None) -> Dataset:
+    """
+    Features + target de entrenamiento.
+    - `feature_names`: fija columnas y orden (p. ej. las de un modelo ya entrenado);
+      por defecto `feature_columns(df.columns, feature_set)`.
+    Se descartan la última fila (sin target) y las filas con NaN/inf en alguna feature.
+    """
+    feature_names = list(feature_names or feature_columns(df.columns, feature_set))
+    X = _fill_matrix(df, feature_names)
+
+    close = df[TARGET_PRICE_COL].to_numpy(dtype=np.float64)
+    y = np.zeros(len(close), dtype=np.float32)
+    y[:-1] = close[1:] > close[:-1]
+
+    valid = np.isfinite(X).all(axis=1)
+    valid[:-1] &= np.isfinite(close[1:]) & np.isfinite(close[:-1])
+    valid[-1:] = False  # sin precio de mañana
+
+    X, y, index = _select_rows(X, y, df.index, valid)
+    return Dataset(X=X, y=y, feature_names=tuple(feature_names), index=index)
+
+
+def feature_matrix(df, feature_names, tail=None) -> np.ndarray:
+    """
+    Features de inferencia (sin target) como float32 C-contiguo. Con `tail` solo se
+    copian las últimas `tail` filas.
+    """
+    rows = slice(-tail, None) if tail else slice(None)
+    return _fill_matrix(df, list(feature_names), rows)
@@ -2,12 +2,37 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from google.cloud import storage
-import io
 import os
 import glob
+import hashlib
+import argparse
+import sys
 
 # Importamos tu nuevo módulo de indicadores
+from src.data.parquet_io import read_parquet_blob, write_parquet
 from src.features.technical_indicators import add_technical_features
+from src.features.trading_calendar import get_nyse_calendar
+
+GOLD_DIR = "data/gold"
+
+# Historia previa que se recalcula en modo incremental para "calentar" los indicadores.
+# El EWM más lento (RSI, alpha=1/14) decae como (13/14)^n: con 600 filas la semilla
+# aporta < 1e-19 y el resultado coincide con el rebuild completo.
+INCREMENTAL_WARMUP_ROWS = 600
+
+# Decimales usados por dataset_checksum para comparar builds
+CHECKSUM_DECIMALS = 6
+
+# Mapeo de etiquetas FinBERT a valores numéricos
+SENTIMENT_LABEL_MAP = {"positive": 1, "negative": -1, "neutral": 0}
+
+# Columnas de noticias que usa la agregación (se omiten title/content/url al leer)
+SENTIMENT_COLUMNS = ["date", "publishedAt", "sentiment_label", "sentiment_score"]
+
+
+def _sentiment_date_col(df_sentiment: pd.DataFrame) -> str:
+    """Columna temporal de las noticias: 'date' si existe, si no 'publishedAt' (NewsAPI)."""
+    return "date" if "date" in df_sentiment.columns else "publishedAt"
 
 
 class DataMerger:
@@ -17,157 +42,305 @@ class DataMerger:
         self.storage_client = storage.Client()
         self.bucket = self.storage_client.bucket(bucket_name)
 
-    def load_parquet_from_gcs(self, blob_name: str) -> pd.DataFrame:
-        """Descarga un parquet de GCS directamente a DataFrame."""
-        blob = self.bucket.blob(blob_name)
-        if not blob.exists():
+    def load_parquet_from_gcs(
+        self, blob_name: str, columns=None, start=None, end=None
+    ) -> pd.DataFrame:
+        """Descarga un parquet de GCS directamente a DataFrame (columnas y fechas opcionales)."""
+        df = read_parquet_blob(
+            self.bucket, blob_name, columns=columns, start=start, end=end
+        )
+        if df is None:
             print(f"⚠️ Alerta: No se encontró {blob_name}")
             return pd.DataFrame()
-
-        data = blob.download_as_bytes()
-        return pd.read_parquet(io.BytesIO(data))
+        return df
 
     def process_sentiment_aggregation(self, df_sentiment: pd.DataFrame) -> pd.DataFrame:
         """
-        Convierte el stream de noticias intradía en una señal diaria unificada.
+        Convierte el stream de noticias intradía de UN ticker en una señal diaria unificada.
         Estrategia: Promedio ponderado por confianza (Score).
+        Retorna columnas: date_only, daily_sentiment, news_volume.
         """
-        if df_sentiment.empty:
-            return pd.DataFrame()
-
-        # 1. Mapeo de etiquetas a valores numéricos
-        # Positive = 1, Negative = -1, Neutral = 0
-        label_map = {"positive": 1, "negative": -1, "neutral": 0}
+        return self.aggregate_daily_sentiment(df_sentiment, ticker_col=None)
 
+    def aggregate_daily_sentiment(
+        self, df_sentiment: pd.DataFrame, ticker_col="ticker"
+    ) -> pd.DataFrame:
+        """
+        Agregación vectorizada multi-ticker: un solo groupby([ticker, día de trading])
+        sobre el frame concatenado de noticias de todos los tickers.
+        - No modifica el DataFrame de entrada (trabaja sobre arrays NumPy).
+        - Cada noticia se asigna a su sesión NYSE efectiva con un único searchsorted
+          sobre el calendario precalculado (epoch ns), sin tz_convert por fila.
+        Con `ticker_col=None` agrupa solo por día (caso de un único ticker).
+        """
         # Validar que las columnas existan (defensa contra esquemas rotos)
-        if "sentiment_label" not in df_sentiment.columns:
+        if df_sentiment.empty or "sentiment_label" not in df_sentiment.columns:
             return pd.DataFrame()
 
-        df_sentiment["numeric_label"] = df_sentiment["sentiment_label"].map(label_map)
-
-        # 2. Sentimiento Ponderado = Valor (-1 a 1) * Confianza (0 a 1)
+        # 1. Sentimiento Ponderado = Valor (-1 a 1) * Confianza (0 a 1)
         # Una noticia muy negativa con alta confianza pesará cerca de -1.
-        df_sentiment["weighted_score"] = (
-            df_sentiment["numeric_label"] * df_sentiment["sentiment_score"]
+        numeric_label = (
+            df_sentiment["sentiment_label"].map(SENTIMENT_LABEL_MAP).to_numpy(dtype=float)
+        )
+        weighted_score = numeric_label * df_sentiment["sentiment_score"].to_numpy(
+            dtype=float
         )
 
-        # 3. Asegurar fechas y Ajuste Temporal (Trading Day Alignment)
-        # News occurring after Market Close (16:00 NY Time) should be attributed to the NEXT day
-        # to avoid look-ahead bias when training on Daily Close data.
-        
-        # Determine the column to use
-        date_col = "date" if "date" in df_sentiment.columns else "publishedAt"
-        
-        # Convert to datetime and timezone aware (assuming UTC if tz-naive)
-        # NewsAPI returns UTC (Z).
-        timestamps = pd.to_datetime(df_sentiment[date_col], utc=True)
-        
-        # Convert to NY Time (Eastern)
-        timestamps_ny = timestamps.dt.tz_convert("America/New_York")
-        
-        # Logic: If hour >= 16, it belongs to the next day.
-        # Create a 'shift' vector: 1 day if hour >= 16, else 0.
-        # We generally close at 16:00.
-        shift_days = (timestamps_ny.dt.hour >= 16).astype(int)
-        
-        # Apply shift
-        adjusted_dates = timestamps_ny + pd.to_timedelta(shift_days, unit="D")
-        
-        # Normalize to date (remove time)
-        df_sentiment["date_only"] = adjusted_dates.dt.normalize().dt.tz_localize(None)
-
-        # 4. Agregación: GroupBy fecha alineada
-        # Calculamos:
-        # - mean_sentiment: El sentimiento promedio del día (Weighted Score)
-        # - news_count: Volumen de noticias (Total absolute weight or count)
+        # 2. Trading Session Alignment
+        # News occurring after Market Close (16:00 NY, or early close) belongs to the NEXT
+        # session to avoid look-ahead bias when training on Daily Close data. Weekends and
+        # holidays roll forward to the next trading session instead of a non-trading day
+        # (which the left join in run_pipeline would silently drop).
+        # NewsAPI returns UTC (Z); tz-naive timestamps are assumed UTC.
+        timestamps = pd.to_datetime(
+            df_sentiment[_sentiment_date_col(df_sentiment)], utc=True
+        )
+        utc_ns = timestamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        trading_day = get_nyse_calendar().session_days(utc_ns)
+        valid = ~np.isnat(utc_ns.view("datetime64[ns]")) & (trading_day >= 0)
+        if (~valid).any():
+            print(f"⚠️ {int((~valid).sum())} noticias sin fecha válida o fuera del calendario NYSE.")
+
+        grouped = {"date_only": trading_day[valid], "weighted_score": weighted_score[valid]}
+        keys = ["date_only"]
+        if ticker_col is not None:
+            grouped = {ticker_col: df_sentiment[ticker_col].to_numpy()[valid], **grouped}
+            keys = [ticker_col, "date_only"]
+
+        # 3. Agregación: GroupBy (ticker, fecha alineada)
+        # - daily_sentiment: El sentimiento promedio del día (Weighted Score)
+        # - news_volume: Volumen de noticias
         daily_sentiment = (
-            df_sentiment.groupby("date_only")
+            pd.DataFrame(grouped)
+            .groupby(keys)
             .agg(
                 daily_sentiment=("weighted_score", "mean"),
                 news_volume=("weighted_score", "count"),
             )
             .reset_index()
         )
-
+        # Días desde epoch -> fecha (se convierte después de agregar: menos filas)
+        daily_sentiment["date_only"] = (
+            daily_sentiment["date_only"].to_numpy().astype("datetime64[D]").astype("datetime64[ns]")
+        )
         return daily_sentiment
 
-    def run_pipeline(self):
-        print(f"🚀 Iniciando fusión de datos para: {self.tickers}")
-
-        for ticker in self.tickers:
-            print(f"\n--- Procesando {ticker} ---")
+    def load_price_data(self, ticker: str) -> pd.DataFrame:
+        """Carga el parquet de precios (Raw) más reciente del ticker con índice de fechas."""
+        # Busca archivos que coincidan con el patrón del ticker
+        price_files = glob.glob(f"data/raw/{ticker}_*.parquet")
+
+        if not price_files:
+            print(f"❌ No hay archivos de precios para {ticker}, saltando.")
+            return None
+
+        # Selecciona el archivo más reciente por fecha de modificación
+        latest_price_file = max(price_files, key=os.path.getmtime)
+        print(f"   📂 Cargando precios desde: {latest_price_file}")
+        df_price = pd.read_parquet(latest_price_file)
+
+        # Asegurar que 'Date' sea una columna, no un índice
+        if "Date" not in df_price.columns:
+            df_price.reset_index(inplace=True)
+            if "index" in df_price.columns:
+                df_price.rename(columns={"index": "Date"}, inplace=True)
+
+        # Limpieza básica de precios
+        df_price["Date"] = pd.to_datetime(df_price["Date"]).dt.normalize()
+        df_price.set_index("Date", inplace=True)
+        df_price.sort_index(inplace=True)
+        return df_price
+
+    def build_master_dataset(
+        self, df_price: pd.DataFrame, daily_sentiment: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Indicadores técnicos + sentimiento diario alineado -> Feature Matrix (Gold).
+        `daily_sentiment` es la salida agregada (date_only, daily_sentiment, news_volume).
+        """
+        # 1. Calcular Indicadores Técnicos (Usando tu módulo)
+        print("   📊 Calculando RSI, MACD, Bollinger...")
+        df_price = add_technical_features(df_price, price_col="Close")
+
+        if not daily_sentiment.empty:
+            # 2. MERGE (Left Join usando el índice de precios)
+            master_df = df_price.join(
+                daily_sentiment.set_index("date_only")[["daily_sentiment", "news_volume"]],
+                how="left",
+            )
 
-            # 1. Cargar Precios (Raw) - Búsqueda dinámica local
-            # Busca archivos que coincidan con el patrón del ticker
-            price_files = glob.glob(f"data/raw/{ticker}_*.parquet")
+            # 3. Manejo de NaNs en Sentimiento
+            master_df["daily_sentiment"] = master_df["daily_sentiment"].fillna(0)
+            master_df["news_volume"] = master_df["news_volume"].fillna(0)
+
+        else:
+            print("⚠️ No se encontraron noticias procesadas. Llenando con ceros.")
+            master_df = df_price
+            master_df["daily_sentiment"] = 0
+            master_df["news_volume"] = 0
+
+        # 4. Los primeros N registros quedan en NaN por las ventanas de los indicadores
+        master_df.dropna(inplace=True)
+        return master_df
+
+    def update_master_dataset(
+        self,
+        df_price: pd.DataFrame,
+        daily_sentiment: pd.DataFrame,
+        df_gold: pd.DataFrame,
+        warmup_rows: int = INCREMENTAL_WARMUP_ROWS,
+    ) -> pd.DataFrame:
+        """
+        Modo incremental: procesa solo las fechas posteriores al último registro Gold.
+        Recalcula indicadores sobre las nuevas fechas más `warmup_rows` de historia
+        previa (suficiente para que EWM/ventanas converjan al valor del rebuild completo)
+        y las anexa al Gold existente.
+        """
+        last_date = df_gold.index.max()
+        new_dates = df_price.index > last_date
 
-            if not price_files:
-                print(f"❌ No hay archivos de precios para {ticker}, saltando.")
-                continue
+        if not new_dates.any():
+            print(f"   ✅ Gold al día (última fecha: {last_date.date()}). Nada que anexar.")
+            return df_gold
 
-            # Selecciona el archivo más reciente por fecha de modificación
-            latest_price_file = max(price_files, key=os.path.getmtime)
-            print(f"   📂 Cargando precios desde: {latest_price_file}")
-            df_price = pd.read_parquet(latest_price_file)
+        first_new = int(np.argmax(new_dates))
+        window_start = max(0, first_new - warmup_rows)
+        df_window = df_price.iloc[window_start:]
 
-            # Asegurar que 'Date' sea una columna, no un índice
-            if "Date" not in df_price.columns:
-                df_price.reset_index(inplace=True)
-                if "index" in df_price.columns:
-                    df_price.rename(columns={"index": "Date"}, inplace=True)
+        print(
+            f"   ➕ Incremental: {int(new_dates.sum())} fechas nuevas "
+            f"(+{first_new - window_start} de calentamiento)"
+        )
+        df_new = self.build_master_dataset(df_window, daily_sentiment)
+        df_new = df_new[df_new.index > last_date]
 
-            # Limpieza básica de precios
-            df_price["Date"] = pd.to_datetime(df_price["Date"]).dt.normalize()
-            df_price.set_index("Date", inplace=True)
-            df_price.sort_index(inplace=True)
+        return pd.concat([df_gold, df_new])
 
-            # 2. Calcular Indicadores Técnicos (Usando tu módulo)
-            print("   📊 Calculando RSI, MACD, Bollinger...")
-            df_price = add_technical_features(df_price, price_col="Close")
+    def run_pipeline(self, incremental: bool = False):
+        """
+        Genera `master_dataset_{ticker}.parquet` por ticker.
+        - incremental=False: Rebuild completo desde todo el histórico de precios.
+        - incremental=True: Anexa solo fechas nuevas al Gold existente
+          (si aún no existe Gold para el ticker, hace el rebuild completo).
+        El sentimiento de todos los tickers se agrega en una sola pasada vectorizada.
+        """
+        print(f"🚀 Iniciando fusión de datos para: {self.tickers}")
 
-            # 3. Cargar Sentimiento (Processed)
-            # Mantenemos GCS para el sentimiento, podría ser local también
-            sentiment_blob = f"data/processed/embeddings/{ticker}_sentiment.parquet"
-            df_sentiment = self.load_parquet_from_gcs(sentiment_blob)
+        output_dir = GOLD_DIR
+        os.makedirs(output_dir, exist_ok=True)
 
-            if not df_sentiment.empty:
-                print("   🧠 Agregando señales de sentimiento...")
-                daily_sentiment = self.process_sentiment_aggregation(df_sentiment)
+        # 1. Cargar Precios (Raw), Gold previo y Sentimiento (Processed) por ticker
+        pending = {}
+        news_by_ticker = {}
+        for ticker in self.tickers:
+            print(f"\n--- Cargando {ticker} ---")
 
-                # 4. MERGE (Left Join usando el índice de precios)
-                daily_sentiment.set_index("date_only", inplace=True)
-                master_df = df_price.join(daily_sentiment, how="left")
+            # Búsqueda dinámica local de precios
+            df_price = self.load_price_data(ticker)
+            if df_price is None:
+                continue
 
-                # 5. Manejo de NaNs en Sentimiento
-                master_df["daily_sentiment"] = master_df["daily_sentiment"].fillna(0)
-                master_df["news_volume"] = master_df["news_volume"].fillna(0)
+            output_path = f"{output_dir}/master_dataset_{ticker}.parquet"
+            df_gold = None
+            if incremental and os.path.exists(output_path):
+                df_gold = pd.read_parquet(output_path)
 
-            else:
-                print("⚠️ No se encontraron noticias procesadas. Llenando con ceros.")
-                master_df = df_price
-                master_df["daily_sentiment"] = 0
-                master_df["news_volume"] = 0
+            # Mantenemos GCS para el sentimiento, podría ser local también
+            sentiment_blob = f"data/processed/embeddings/{ticker}_sentiment.parquet"
+            df_sentiment = self.load_parquet_from_gcs(
+                sentiment_blob, columns=SENTIMENT_COLUMNS
+            )
+            if df_gold is not None:
+                # Solo noticias que pueden caer en sesiones nuevas
+                df_sentiment = _news_since(df_sentiment, df_gold.index.max())
+
+            pending[ticker] = (df_price, df_gold, output_path)
+            news_by_ticker[ticker] = df_sentiment
+
+        # 2. Agregación de sentimiento de todos los tickers en un solo groupby
+        print("\n🧠 Agregando señales de sentimiento...")
+        daily_all = self.aggregate_daily_sentiment(_stack_news(news_by_ticker))
+        daily_by_ticker = (
+            {t: g.drop(columns="ticker") for t, g in daily_all.groupby("ticker")}
+            if not daily_all.empty
+            else {}
+        )
 
-            # 6. Guardar Dataset Maestro (Feature Matrix)
-            master_df.dropna(inplace=True)
+        # 3. Construir (o extender) y guardar el Dataset Maestro (Feature Matrix)
+        for ticker, (df_price, df_gold, output_path) in pending.items():
+            print(f"\n--- Procesando {ticker} ---")
+            daily_sentiment = daily_by_ticker.get(ticker, pd.DataFrame())
 
-            output_dir = "data/gold"
-            os.makedirs(output_dir, exist_ok=True)
-            output_path = f"{output_dir}/master_dataset_{ticker}.parquet"
+            if df_gold is not None:
+                master_df = self.update_master_dataset(df_price, daily_sentiment, df_gold)
+            else:
+                master_df = self.build_master_dataset(df_price, daily_sentiment)
 
-            master_df.to_parquet(output_path)
+            write_parquet(master_df, output_path)
             print(f"✅ Dataset Maestro guardado en: {output_path}")
             print(f"   Shape final: {master_df.shape}")
 
 
-def main():
+def _news_since(df_sentiment: pd.DataFrame, last_date: pd.Timestamp) -> pd.DataFrame:
+    """Filtra noticias publicadas desde `last_date` (las únicas que pueden caer en fechas nuevas)."""
+    if df_sentiment.empty or "sentiment_label" not in df_sentiment.columns:
+        return df_sentiment
+    timestamps = pd.to_datetime(df_sentiment[_sentiment_date_col(df_sentiment)], utc=True)
+    return df_sentiment[timestamps >= last_date.tz_localize("UTC")]
+
+
+def _stack_news(news_by_ticker: dict) -> pd.DataFrame:
+    """
+    Concatena las noticias de todos los tickers en un frame mínimo
+    (ticker, date, sentiment_label, sentiment_score) sin tocar los originales.
+    """
+    frames = [
+        pd.DataFrame(
+            {
+                "ticker": ticker,
+                "date": pd.to_datetime(df[_sentiment_date_col(df)], utc=True).to_numpy(),
+                "sentiment_label": df["sentiment_label"].to_numpy(),
+                "sentiment_score": df["sentiment_score"].to_numpy(),
+            }
+        )
+        for ticker, df in news_by_ticker.items()
+        if not df.empty and "sentiment_label" in df.columns
+    ]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def dataset_checksum(df: pd.DataFrame, decimals: int = CHECKSUM_DECIMALS) -> str:
+    """
+    Huella SHA-256 del contenido de un Dataset Maestro (índice, columnas y valores).
+    Los floats se redondean a `decimals` para que dos builds equivalentes
+    (rebuild completo vs incremental) den la misma huella aunque difieran en
+    el último bit por el orden de acumulación de las ventanas móviles.
+    """
+    normalized = df.sort_index().round(decimals)
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, normalized.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(normalized, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fusión de precios + sentimiento (Gold)")
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Reconstruye el Gold desde cero en lugar de anexar solo fechas nuevas.",
+    )
+    args = parser.parse_args([] if argv is None else argv)
+
     # Configuración
     BUCKET_NAME = "market-oracle-tesis-data-lake"  # Ajusta a tu nombre real
     TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"]
 
     merger = DataMerger(BUCKET_NAME, TICKERS)
-    merger.run_pipeline()
+    merger.run_pipeline(incremental=not args.full_rebuild)
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
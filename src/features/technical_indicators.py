@@ -1,5 +1,25 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Horizontes (en días de trading) para los retornos multi-horizonte
+RETURN_HORIZONS = (5, 10, 21)
+
+# Columnas que agrega add_technical_features(..., extended=True)
+EXTENDED_FEATURE_COLUMNS = [
+    "atr_14",
+    "obv",
+    "stoch_k",
+    "stoch_d",
+    "adx_14",
+    "plus_di_14",
+    "minus_di_14",
+    "zscore_close_20",
+    "zscore_volume_20",
+    "vwap_20",
+    "vwap_distance",
+    "volume_ratio_20",
+] + [f"ret_{h}d" for h in RETURN_HORIZONS]
 
 
 def calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
@@ -87,9 +107,254 @@ def calculate_volatility(series: pd.Series, window: int = 21) -> pd.Series:
     return log_ret.rolling(window=window).std()
 
 
-def add_technical_features(df: pd.DataFrame, price_col: str = "Close") -> pd.DataFrame:
+# --- Kernels vectorizados (NumPy) ---
+# Todos operan sobre arrays 1D float64 y devuelven arrays del mismo largo,
+# con NaN en el periodo de calentamiento. No hay loops de Python por fila:
+# las ventanas móviles usan sliding_window_view (vistas sin copia) y los
+# suavizados recursivos (Wilder) delegan en el EWM compilado de pandas,
+# igual que calculate_rsi.
+
+
+def _to_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Desplaza el array hacia adelante `periods` posiciones rellenando con NaN."""
+    out = np.full_like(x, np.nan)
+    if periods < len(x):
+        out[periods:] = x[: len(x) - periods]
+    return out
+
+
+def _rolling_reduce(x: np.ndarray, window: int, reducer) -> np.ndarray:
+    """Aplica `reducer` sobre ventanas móviles de tamaño `window` (alineadas a la derecha)."""
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1 :] = reducer(sliding_window_view(x, window), axis=-1)
+    return out
+
+
+def _rolling_mean_std(x: np.ndarray, window: int):
+    """
+    Media y desviación estándar muestral (ddof=1) móviles.
+    Se centra la serie antes de acumular cuadrados para no perder precisión
+    con niveles de precio/volumen altos.
+    """
+    offset = np.nanmean(x) if np.isfinite(x).any() else 0.0
+    centered = x - offset
+    sums = _rolling_reduce(centered, window, np.sum)
+    sq_sums = _rolling_reduce(centered * centered, window, np.sum)
+    mean = sums / window
+    var = (sq_sums - sums * mean) / (window - 1)
+    # Errores de redondeo pueden dar varianzas negativas minúsculas
+    std = np.sqrt(np.maximum(var, 0.0))
+    return mean + offset, std
+
+
+def _wilder_smooth(x: np.ndarray, period: int) -> np.ndarray:
+    """Suavizado de Wilder (EMA con alpha = 1/period), igual que en calculate_rsi."""
+    return (
+        pd.Series(x)
+        .ewm(alpha=1 / period, min_periods=period, adjust=False)
+        .mean()
+        .to_numpy()
+    )
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = _shift(close)
+    # fmax ignora el NaN del primer registro (sin cierre previo) -> TR = High - Low
+    return np.fmax(
+        high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+
+
+def _atr_kernel(high, low, close, period):
+    return _wilder_smooth(_true_range(high, low, close), period)
+
+
+def _obv_kernel(close, volume):
+    direction = np.sign(np.diff(close, prepend=np.nan))
+    flow = np.nan_to_num(direction * volume)
+    return np.cumsum(flow)
+
+
+def _stochastic_kernel(high, low, close, k_period, d_period):
+    lowest = _rolling_reduce(low, k_period, np.min)
+    highest = _rolling_reduce(high, k_period, np.max)
+    price_range = highest - lowest
+    # Rango plano -> oscilador neutro (50) en lugar de división por cero
+    stoch_k = np.where(
+        price_range > 0,
+        100 * (close - lowest) / np.where(price_range > 0, price_range, 1.0),
+        50.0,
+    )
+    stoch_k[np.isnan(price_range)] = np.nan
+    stoch_d = _rolling_reduce(stoch_k, d_period, np.mean)
+    return stoch_k, stoch_d
+
+
+def _adx_kernel(high, low, close, period):
+    up_move = high - _shift(high)
+    down_move = _shift(low) - low
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+    atr = _atr_kernel(high, low, close, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100 * _wilder_smooth(plus_dm, period) / atr
+        minus_di = 100 * _wilder_smooth(minus_dm, period) / atr
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    dx[np.isnan(di_sum)] = np.nan
+
+    adx = _wilder_smooth(dx, period)
+    return adx, plus_di, minus_di
+
+
+def _zscore_kernel(x, window):
+    mean, std = _rolling_mean_std(x, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zscore = np.where(std > 0, (x - mean) / std, 0.0)
+    zscore[np.isnan(std)] = np.nan
+    return zscore
+
+
+def _vwap_kernel(high, low, close, volume, window):
+    typical_price = (high + low + close) / 3
+    volume_sum = _rolling_reduce(volume, window, np.sum)
+    pv_sum = _rolling_reduce(typical_price * volume, window, np.sum)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Sin volumen en la ventana -> el VWAP degenera al cierre
+        vwap = np.where(volume_sum > 0, pv_sum / volume_sum, close)
+        vwap_distance = close / vwap - 1
+        mean_volume = volume_sum / window
+        volume_ratio = np.where(mean_volume > 0, volume / mean_volume, 1.0)
+    for arr in (vwap, vwap_distance, volume_ratio):
+        arr[np.isnan(volume_sum)] = np.nan
+    return vwap, vwap_distance, volume_ratio
+
+
+def _multi_horizon_returns_kernel(x, horizons):
+    log_x = np.log(x)
+    return {h: log_x - _shift(log_x, h) for h in horizons}
+
+
+def calculate_atr(
+    high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14
+) -> pd.Series:
+    """
+    Average True Range (ATR): volatilidad absoluta en unidades de precio.
+    True Range = max(High - Low, |High - Close previo|, |Low - Close previo|),
+    suavizado con Wilder.
+    """
+    atr = _atr_kernel(_to_array(high), _to_array(low), _to_array(close), period)
+    return pd.Series(atr, index=close.index)
+
+
+def calculate_obv(close: pd.Series, volume: pd.Series) -> pd.Series:
+    """
+    On-Balance Volume (OBV): volumen acumulado con el signo del cambio de precio.
+    Sube cuando el volumen acompaña subidas (acumulación) y baja en distribución.
+    """
+    obv = _obv_kernel(_to_array(close), _to_array(volume))
+    return pd.Series(obv, index=close.index)
+
+
+def calculate_stochastic(
+    high: pd.Series,
+    low: pd.Series,
+    close: pd.Series,
+    k_period: int = 14,
+    d_period: int = 3,
+):
+    """
+    Oscilador Estocástico.
+    Retorna:
+    - %K: Posición del cierre dentro del rango High/Low de `k_period` días (0-100).
+    - %D: Media móvil de %K (`d_period` días), línea de señal.
+    """
+    stoch_k, stoch_d = _stochastic_kernel(
+        _to_array(high), _to_array(low), _to_array(close), k_period, d_period
+    )
+    return pd.Series(stoch_k, index=close.index), pd.Series(stoch_d, index=close.index)
+
+
+def calculate_adx(
+    high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14
+):
+    """
+    Average Directional Index (ADX) de Wilder.
+    Retorna:
+    - ADX: Fuerza de la tendencia (0-100), sin importar la dirección.
+    - +DI / -DI: Indicadores direccionales positivo y negativo.
+    """
+    adx, plus_di, minus_di = _adx_kernel(
+        _to_array(high), _to_array(low), _to_array(close), period
+    )
+    index = close.index
+    return (
+        pd.Series(adx, index=index),
+        pd.Series(plus_di, index=index),
+        pd.Series(minus_di, index=index),
+    )
+
+
+def calculate_rolling_zscore(series: pd.Series, window: int = 20) -> pd.Series:
+    """
+    Z-Score móvil: (x - media) / desviación estándar sobre `window` días.
+    Una ventana sin dispersión devuelve 0.
+    """
+    return pd.Series(_zscore_kernel(_to_array(series), window), index=series.index)
+
+
+def calculate_vwap_features(
+    high: pd.Series,
+    low: pd.Series,
+    close: pd.Series,
+    volume: pd.Series,
+    window: int = 20,
+):
+    """
+    Features de volumen estilo VWAP sobre barras diarias.
+    Retorna:
+    - VWAP móvil: Precio típico ponderado por volumen en `window` días.
+    - Distancia al VWAP: Close / VWAP - 1.
+    - Ratio de volumen: Volumen del día / volumen medio de la ventana.
+    """
+    vwap, distance, ratio = _vwap_kernel(
+        _to_array(high), _to_array(low), _to_array(close), _to_array(volume), window
+    )
+    index = close.index
+    return (
+        pd.Series(vwap, index=index),
+        pd.Series(distance, index=index),
+        pd.Series(ratio, index=index),
+    )
+
+
+def calculate_multi_horizon_returns(
+    series: pd.Series, horizons=RETURN_HORIZONS
+) -> pd.DataFrame:
+    """
+    Retornos logarítmicos acumulados a varios horizontes: log(Pt) - log(Pt-h).
+    Retorna un DataFrame con una columna `ret_{h}d` por horizonte.
+    """
+    returns = _multi_horizon_returns_kernel(_to_array(series), horizons)
+    return pd.DataFrame(
+        {f"ret_{h}d": values for h, values in returns.items()}, index=series.index
+    )
+
+
+def add_technical_features(
+    df: pd.DataFrame, price_col: str = "Close", extended: bool = False
+) -> pd.DataFrame:
     """
     Función maestra que inyecta todas las features técnicas al DataFrame.
+    Con `extended=True` agrega además la librería ampliada (ATR, OBV, Estocástico,
+    ADX, Z-Scores, VWAP y retornos multi-horizonte), que requiere las columnas
+    OHLCV que guarda la ingesta (High, Low, Volume).
     """
     df = df.copy()
 
@@ -120,6 +385,32 @@ def add_technical_features(df: pd.DataFrame, price_col: str = "Close") -> pd.Dat
     # en calculate_volatility()
     df["volatility_21d"] = df["log_returns"].rolling(window=21).std()
 
+    # 6. Librería ampliada (opcional)
+    if extended:
+        missing = [c for c in ("High", "Low", "Volume") if c not in df.columns]
+        if missing:
+            raise ValueError(
+                f"Las features extendidas requieren las columnas {missing}."
+            )
+
+        high, low, volume = df["High"], df["Low"], df["Volume"]
+        close = df[price_col]
+
+        df["atr_14"] = calculate_atr(high, low, close)
+        df["obv"] = calculate_obv(close, volume)
+        df["stoch_k"], df["stoch_d"] = calculate_stochastic(high, low, close)
+        df["adx_14"], df["plus_di_14"], df["minus_di_14"] = calculate_adx(
+            high, low, close
+        )
+        df["zscore_close_20"] = calculate_rolling_zscore(close)
+        df["zscore_volume_20"] = calculate_rolling_zscore(volume)
+        df["vwap_20"], df["vwap_distance"], df["volume_ratio_20"] = (
+            calculate_vwap_features(high, low, close, volume)
+        )
+        returns = calculate_multi_horizon_returns(close)
+        for col in returns.columns:
+            df[col] = returns[col]
+
     # Limpieza inicial (los primeros N registros serán NaN por los windows)
     # No hacemos dropna() aquí para dejar que el usuario decida cómo manejarlo
 
@@ -0,0 +1,109 @@
+"""
+Calendario de sesiones NYSE precalculado (offline).
+
+Las sesiones se distribuyen con el código en `nyse_sessions.npz` como arrays int64
+ordenados (epoch UTC en ns para apertura/cierre y días desde epoch para la fecha de
+sesión), de modo que mapear millones de noticias a su sesión efectiva es un único
+`np.searchsorted` vectorizado, sin dependencias externas ni aritmética de fechas.
+
+Para regenerar el archivo (requiere `exchange_calendars`, solo en desarrollo):
+    python -m src.features.trading_calendar --rebuild --start 2000-01-01 --end 2035-12-31
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CALENDAR_PATH = Path(__file__).with_name("nyse_sessions.npz")
+
+_nyse_calendar = None
+
+
+class TradingCalendar:
+    """Sesiones de un mercado como arrays int64 ordenados (sessions, opens, closes)."""
+
+    def __init__(self, sessions: np.ndarray, opens: np.ndarray, closes: np.ndarray):
+        self.sessions = np.asarray(sessions, dtype=np.int64)  # días desde epoch
+        self.opens = np.asarray(opens, dtype=np.int64)  # ns UTC
+        self.closes = np.asarray(closes, dtype=np.int64)  # ns UTC
+
+    @classmethod
+    def load(cls, path=CALENDAR_PATH) -> "TradingCalendar":
+        with np.load(path) as data:
+            return cls(data["sessions"], data["opens"], data["closes"])
+
+    def save(self, path=CALENDAR_PATH):
+        np.savez_compressed(
+            path, sessions=self.sessions, opens=self.opens, closes=self.closes
+        )
+
+    @property
+    def session_dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.sessions.astype("datetime64[D]").astype("datetime64[ns]"))
+
+    def session_index(self, utc_ns: np.ndarray) -> np.ndarray:
+        """
+        Índice de la sesión efectiva de cada timestamp: la primera sesión cuyo cierre
+        es posterior al timestamp. Noticias tras el cierre (incluidos cierres
+        anticipados), fines de semana y feriados caen en la siguiente sesión.
+        Devuelve -1 fuera del calendario: después del último cierre o antes de la
+        primera apertura (el cierre previo a la primera sesión no se conoce, así que
+        noticias más antiguas no se atribuyen a ella).
+        """
+        utc_ns = np.asarray(utc_ns, dtype=np.int64)
+        idx = np.searchsorted(self.closes, utc_ns, side="right")
+        outside = (idx >= len(self.sessions)) | (utc_ns < self.opens[0])
+        return np.where(outside, -1, idx)
+
+    def session_days(self, utc_ns: np.ndarray) -> np.ndarray:
+        """Sesión efectiva (días desde epoch) por timestamp; -1 si queda fuera del calendario."""
+        idx = self.session_index(utc_ns)
+        return np.where(idx >= 0, self.sessions[np.maximum(idx, 0)], -1)
+
+
+def get_nyse_calendar() -> TradingCalendar:
+    """Calendario NYSE cargado una sola vez por proceso."""
+    global _nyse_calendar
+    if _nyse_calendar is None:
+        _nyse_calendar = TradingCalendar.load()
+    return _nyse_calendar
+
+
+def build_nyse_calendar(start: str, end: str) -> TradingCalendar:
+    """Genera el calendario NYSE (feriados y cierres anticipados) con exchange_calendars."""
+    try:
+        import exchange_calendars as xcals
+    except ImportError as e:
+        raise ImportError(
+            "Regenerar el calendario requiere 'exchange_calendars' (pip install exchange_calendars)."
+        ) from e
+
+    schedule = xcals.get_calendar("XNYS", start=start, end=end).schedule
+    return TradingCalendar(
+        sessions=schedule.index.values.astype("datetime64[D]").astype(np.int64),
+        opens=schedule["open"].values.astype("datetime64[ns]").view(np.int64),
+        closes=schedule["close"].values.astype("datetime64[ns]").view(np.int64),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calendario de sesiones NYSE")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--start", default="2000-01-01")
+    parser.add_argument("--end", default="2035-12-31")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        calendar = build_nyse_calendar(args.start, args.end)
+        calendar.save()
+        print(f"✅ Calendario guardado en {CALENDAR_PATH} ({len(calendar.sessions)} sesiones)")
+    else:
+        calendar = get_nyse_calendar()
+        dates = calendar.session_dates
+        print(f"📅 {len(dates)} sesiones NYSE: {dates[0].date()} -> {dates[-1].date()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Servicio de predicción multi-ticker.
+
+Carga una sola vez los modelos y scalers de todos los tickers (caché en proceso),
+arma las ventanas de features de cada ticker desde la capa Gold y devuelve en una
+sola llamada la tabla de señales (ticker, signal, confidence) que consume el bot.
+
+Orden de preferencia para `model_type="lstm"`:
+1. Modelo pooled (`lstm_pooled.keras`): todos sus tickers se puntúan en UN batch.
+2. Export TFLite por ticker (`lstm_{ticker}.tflite`).
+3. Modelo Keras por ticker (`lstm_{ticker}.keras`).
+Con `model_type="svm"` se usa `svm_{ticker}.pkl` + `scaler_{ticker}.pkl`.
+
+Con un `ModelRegistry`, cada modelo se toma de su última versión registrada (si la
+tiene) en vez de `models_dir`; `refresh()` incorpora versiones nuevas sin recargar
+los modelos que no cambiaron.
+"""
+
+import math
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from google.cloud import storage
+
+from src.data.parquet_io import read_parquet_blob, read_parquet_tail
+from src.features.dataset import feature_columns, feature_matrix
+from src.models.inference import TFLitePredictor
+
+TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"]
+MODELS_DIR = "models"
+GOLD_DIR = "data/gold"
+SEQ_LENGTH = 10
+MODEL_TYPES = ("lstm", "svm")
+
+POOLED_MODEL_FILE = "lstm_pooled.keras"
+POOLED_META_FILE = "lstm_pooled_meta.pkl"
+
+SIGNAL_COLUMNS = ["ticker", "signal", "confidence", "probability", "model"]
+
+
+def signal_from_probability(prob: float, hold_band: float = 0.0) -> tuple:
+    """
+    (señal, confianza) a partir de P(sube). La confianza escala |p - 0.5| a [0, 1]
+    como en el dashboard; dentro de `hold_band` alrededor de 0.5 la señal es HOLD.
+    """
+    confidence = abs(prob - 0.5) * 2
+    if abs(prob - 0.5) <= hold_band:
+        return "HOLD", confidence
+    return ("BUY" if prob > 0.5 else "SELL"), confidence
+
+
+def _load_keras(path):
+    # TensorFlow completo solo si hace falta un modelo Keras
+    import tensorflow as tf
+
+    return tf.keras.models.load_model(path)
+
+
+class PredictionService:
+    def __init__(
+        self,
+        tickers=TICKERS,
+        model_type="lstm",
+        models_dir=MODELS_DIR,
+        gold_dir=GOLD_DIR,
+        bucket_name=None,
+        seq_length=SEQ_LENGTH,
+        hold_band=0.0,
+        registry=None,
+    ):
+        if model_type not in MODEL_TYPES:
+            raise ValueError(f"model_type debe ser uno de {MODEL_TYPES}, no '{model_type}'")
+
+        self.tickers = list(tickers)
+        self.model_type = model_type
+        self.models_dir = Path(models_dir)
+        self.gold_dir = Path(gold_dir)
+        self.bucket = storage.Client().bucket(bucket_name) if bucket_name else None
+        self.seq_length = seq_length
+        self.hold_band = hold_band
+        self.registry = registry
+        self._cache = {}  # ruta -> modelo / scaler / metadatos ya cargados
+
+    # --- Carga de artefactos (una vez por proceso) ---
+
+    def _load(self, path, loader):
+        key = str(path)
+        if key not in self._cache:
+            self._cache[key] = loader(key)
+        return self._cache[key]
+
+    def clear_cache(self):
+        """Olvida los modelos cargados (p. ej. tras reentrenar)."""
+        self._cache.clear()
+
+    def refresh(self) -> list:
+        """Relee los manifiestos del registro; retorna los modelos con versión nueva."""
+        return self.registry.refresh() if self.registry is not None else []
+
+    def _registered(self, name) -> bool:
+        return self.registry is not None and self.registry.has(name)
+
+    def _pooled(self):
+        """(modelo, metadatos) del LSTM pooled, o None si no existe."""
+        if self.model_type != "lstm":
+            return None
+        if self._registered("lstm_pooled"):
+            return (
+                self.registry.load("lstm_pooled", "model"),
+                self.registry.load("lstm_pooled", "meta"),
+            )
+
+        model_path = self.models_dir / POOLED_MODEL_FILE
+        meta_path = self.models_dir / POOLED_META_FILE
+        if not (model_path.exists() and meta_path.exists()):
+            return None
+        return self._load(model_path, _load_keras), self._load(meta_path, joblib.load)
+
+    def _ticker_model(self, ticker):
+        """(nombre, modelo, scaler) del modelo propio del ticker, o None."""
+        name = f"{self.model_type}_{ticker}"
+        if self._registered(name):
+            scaler = self.registry.load(name, "scaler")
+            if self.model_type == "svm":
+                return "svm", self.registry.load(name, "model"), scaler
+            if "tflite" in self.registry.entry(name)["artifacts"]:
+                return "lstm_tflite", self.registry.load(name, "tflite"), scaler
+            return "lstm_keras", self.registry.load(name, "model"), scaler
+
+        if self.model_type == "svm":
+            model_path = self.models_dir / f"svm_{ticker}.pkl"
+            scaler_path = self.models_dir / f"scaler_{ticker}.pkl"
+            if not (model_path.exists() and scaler_path.exists()):
+                return None
+            return "svm", self._load(model_path, joblib.load), self._load(scaler_path, joblib.load)
+
+        scaler_path = self.models_dir / f"scaler_lstm_{ticker}.pkl"
+        if not scaler_path.exists():
+            return None
+        scaler = self._load(scaler_path, joblib.load)
+
+        tflite_path = self.models_dir / f"lstm_{ticker}.tflite"
+        if tflite_path.exists():
+            return "lstm_tflite", self._load(tflite_path, TFLitePredictor), scaler
+        keras_path = self.models_dir / f"lstm_{ticker}.keras"
+        if keras_path.exists():
+            return "lstm_keras", self._load(keras_path, _load_keras), scaler
+        return None
+
+    def load_models(self) -> dict:
+        """Precarga todos los artefactos; retorna {ticker: nombre del modelo que lo sirve}."""
+        pooled = self._pooled()
+        pooled_tickers = set(pooled[1]["tickers"]) if pooled else set()
+        served = {}
+        for ticker in self.tickers:
+            if ticker in pooled_tickers:
+                served[ticker] = "lstm_pooled"
+            else:
+                found = self._ticker_model(ticker)
+                served[ticker] = found[0] if found else None
+        return served
+
+    # --- Datos ---
+
+    def load_recent(self, ticker) -> pd.DataFrame:
+        """Últimas filas del Dataset Maestro del ticker (solo los row groups finales)."""
+        n_rows = self.seq_length if self.model_type == "lstm" else 1
+        blob_path = f"data/gold/master_dataset_{ticker}.parquet"
+        if self.bucket is not None:
+            return read_parquet_blob(self.bucket, blob_path, tail_rows=n_rows)
+        local_path = self.gold_dir / f"master_dataset_{ticker}.parquet"
+        if not local_path.exists():
+            return None
+        return read_parquet_tail(local_path, n_rows)
+
+    # --- Predicción ---
+
+    def _row(self, ticker, prob, model_name):
+        if prob is None:
+            return {
+                "ticker": ticker,
+                "signal": "HOLD",
+                "confidence": 0.0,
+                "probability": np.nan,
+                "model": model_name,
+            }
+        signal, confidence = signal_from_probability(prob, self.hold_band)
+        return {
+            "ticker": ticker,
+            "signal": signal,
+            "confidence": confidence,
+            "probability": prob,
+            "model": model_name,
+        }
+
+    def _window(self, df, scaler, feature_cols):
+        if df is None or len(df) < self.seq_length:
+            return None
+        return scaler.transform(feature_matrix(df, feature_cols, tail=self.seq_length))
+
+    def predict_all(self, data=None) -> pd.DataFrame:
+        """
+        Tabla de señales para todos los tickers en una llamada.
+        - `data`: {ticker: DataFrame} opcional; si falta, se lee de la capa Gold.
+        - Tickers sin modelo o sin historia suficiente salen como HOLD con confianza 0.
+        """
+        data = data or {}
+        frames = {t: data[t] if t in data else self.load_recent(t) for t in self.tickers}
+        probs, names = {}, {}
+
+        # 1. Tickers del modelo pooled: un único predict en batch
+        pooled = self._pooled()
+        if pooled is not None:
+            model, meta = pooled
+            windows, ids, batch_tickers = [], [], []
+            for ticker in self.tickers:
+                if ticker not in meta["tickers"]:
+                    continue
+                names[ticker] = "lstm_pooled"
+                window = self._window(frames[ticker], meta["scalers"][ticker], meta["feature_cols"])
+                if window is not None:
+                    windows.append(window)
+                    ids.append(meta["tickers"].index(ticker))
+                    batch_tickers.append(ticker)
+            if windows:
+                out = model.predict(
+                    {
+                        "window": np.stack(windows).astype(np.float32),
+                        "ticker": np.asarray(ids, dtype=np.int64),
+                    },
+                    verbose=0,
+                )
+                probs.update(zip(batch_tickers, np.asarray(out, dtype=float).ravel()))
+
+        # 2. Resto: modelo propio de cada ticker (pesos distintos, no se pueden agrupar)
+        for ticker in self.tickers:
+            if ticker in names:
+                continue
+            found = self._ticker_model(ticker)
+            names[ticker] = found[0] if found else None
+            df = frames[ticker]
+            if found is None or df is None or df.empty:
+                continue
+
+            name, model, scaler = found
+            if name == "svm":
+                x = scaler.transform(feature_matrix(df, feature_columns(df.columns, "svm"), tail=1))
+                # SVC no expone probabilidades: margen -> pseudo-probabilidad logística
+                margin = float(model.decision_function(x)[0])
+                probs[ticker] = 1.0 / (1.0 + math.exp(-margin))
+            else:
+                window = self._window(df, scaler, feature_columns(df.columns, "lstm"))
+                if window is not None:
+                    probs[ticker] = float(model.predict(window[None, ...], verbose=0)[0][0])
+
+        rows = [self._row(t, probs.get(t), names.get(t)) for t in self.tickers]
+        return pd.DataFrame(rows, columns=SIGNAL_COLUMNS)
@@ -0,0 +1,263 @@
+"""
+Registro de artefactos de modelos versionados.
+
+Cada modelo (`svm_AAPL`, `lstm_AAPL`, `lstm_pooled`, ...) tiene un manifiesto JSON
+con sus versiones: huella de los datos de entrenamiento, features, métricas,
+hiperparámetros y, por artefacto (modelo, scaler, tflite, ...), nombre de archivo,
+SHA-256 y tamaño. Los archivos viven en `models/registry/{nombre}/{versión}/` y,
+si se configura un bucket, también en GCS bajo el mismo layout.
+
+La carga es perezosa (un artefacto se lee recién al pedirlo), los `.pkl` se abren
+con `joblib.load(mmap_mode="r")` para que los arrays numpy se mapeen desde disco
+en vez de copiarse, y el resultado se cachea por (nombre, versión, rol). Al
+aparecer una versión nueva, el consumidor la carga sin tocar el resto de modelos
+y la versión anterior sale del caché (hot-swap).
+
+Cada versión guarda además la huella de entrenamiento (datos + features +
+hiperparámetros + código); los trainers la usan para no reentrenar un ticker cuyo
+Dataset Maestro no cambió desde la última corrida.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+REGISTRY_DIR = "models/registry"
+REGISTRY_PREFIX = "models/registry"  # prefijo de los blobs en GCS
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path, chunk_size=1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Huella estable de un DataFrame (valores, índice y nombres de columnas)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def code_version(*paths) -> str:
+    """Hash del código fuente que define el entrenamiento (archivos .py)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def training_fingerprint(data_hash, features, params, code) -> str:
+    """
+    Huella de un entrenamiento: si coincide con la de una versión registrada, volver
+    a entrenar produciría el mismo modelo.
+    """
+    payload = {
+        "data": data_hash,
+        "features": [str(f) for f in features],
+        "params": params,
+        "code": code,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def load_artifact(path):
+    """Carga un artefacto según su extensión."""
+    suffix = Path(path).suffix
+    if suffix == ".pkl":
+        # Los arrays numpy (vectores de soporte, parámetros de scalers) se mapean desde disco
+        return joblib.load(path, mmap_mode="r")
+    if suffix == ".tflite":
+        from src.models.inference import TFLitePredictor
+
+        return TFLitePredictor(path)
+    if suffix == ".keras":
+        import tensorflow as tf
+
+        return tf.keras.models.load_model(path)
+    raise ValueError(f"Tipo de artefacto no soportado: {path}")
+
+
+class ModelRegistry:
+    def __init__(self, root=REGISTRY_DIR, bucket=None, prefix=REGISTRY_PREFIX):
+        """
+        - `root`: directorio local del registro (también caché de descargas desde GCS).
+        - `bucket`: bucket de GCS opcional; si se indica, es la fuente de verdad.
+        """
+        self.root = Path(root)
+        self.bucket = bucket
+        self.prefix = prefix.rstrip("/")
+        self._manifests = {}  # nombre -> manifiesto leído
+        self._cache = {}  # (nombre, versión, rol) -> artefacto cargado
+
+    # --- Manifiestos ---
+
+    def _manifest_path(self, name) -> Path:
+        return self.root / name / MANIFEST_FILE
+
+    def _blob_name(self, *parts) -> str:
+        return "/".join((self.prefix,) + parts)
+
+    def _read_manifest(self, name) -> dict:
+        if self.bucket is not None:
+            blob = self.bucket.blob(self._blob_name(name, MANIFEST_FILE))
+            if not blob.exists():
+                return {"name": name, "latest": None, "versions": []}
+            return json.loads(blob.download_as_text())
+        path = self._manifest_path(name)
+        if not path.exists():
+            return {"name": name, "latest": None, "versions": []}
+        return json.loads(path.read_text())
+
+    def _write_manifest(self, name, manifest):
+        path = self._manifest_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, default=str))
+        os.replace(tmp, path)  # atómico: un lector nunca ve un manifiesto a medias
+        if self.bucket is not None:
+            self.bucket.blob(self._blob_name(name, MANIFEST_FILE)).upload_from_filename(str(path))
+        self._manifests[name] = manifest
+
+    def manifest(self, name) -> dict:
+        if name not in self._manifests:
+            self._manifests[name] = self._read_manifest(name)
+        return self._manifests[name]
+
+    def refresh(self, names=None) -> list:
+        """
+        Relee los manifiestos (todos los ya vistos o `names`). Retorna los nombres
+        cuya última versión cambió; sus artefactos se cargarán en el próximo `load`.
+        """
+        changed = []
+        for name in list(self._manifests) if names is None else names:
+            previous = self._manifests.get(name, {}).get("latest")
+            self._manifests[name] = self._read_manifest(name)
+            if self._manifests[name]["latest"] != previous:
+                changed.append(name)
+        return changed
+
+    def versions(self, name) -> list:
+        return [v["version"] for v in self.manifest(name)["versions"]]
+
+    def latest_version(self, name):
+        return self.manifest(name)["latest"]
+
+    def entry(self, name, version=None) -> dict:
+        """Metadatos de una versión (la última por defecto)."""
+        version = version or self.latest_version(name)
+        for v in self.manifest(name)["versions"]:
+            if v["version"] == version:
+                return v
+        raise KeyError(f"'{name}' no tiene la versión {version}")
+
+    # --- Registro ---
+
+    def register(
+        self,
+        name,
+        artifacts: dict,
+        data_fingerprint=None,
+        features=None,
+        metrics=None,
+        params=None,
+        fingerprint=None,
+    ) -> str:
+        """
+        Registra una versión nueva a partir de archivos ya guardados.
+        - `artifacts`: {rol: ruta local}, p. ej. {"model": "models/svm_AAPL.pkl", "scaler": ...}
+        - `fingerprint`: huella de entrenamiento (ver `training_fingerprint`)
+        Retorna la versión asignada (`v0001`, `v0002`, ...).
+        """
+        manifest = self._read_manifest(name)
+        version = f"v{len(manifest['versions']) + 1:04d}"
+        version_dir = self.root / name / version
+        version_dir.mkdir(parents=True, exist_ok=True)
+
+        files = {}
+        for role, src in artifacts.items():
+            src = Path(src)
+            dest = version_dir / src.name
+            shutil.copy2(src, dest)
+            files[role] = {
+                "file": src.name,
+                "sha256": file_sha256(dest),
+                "bytes": dest.stat().st_size,
+            }
+            if self.bucket is not None:
+                self.bucket.blob(self._blob_name(name, version, src.name)).upload_from_filename(
+                    str(dest)
+                )
+
+        manifest["versions"].append(
+            {
+                "version": version,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "data_fingerprint": data_fingerprint,
+                "fingerprint": fingerprint,
+                "features": list(features) if features is not None else None,
+                "metrics": metrics or {},
+                "params": params or {},
+                "artifacts": files,
+            }
+        )
+        manifest["latest"] = version
+        self._write_manifest(name, manifest)
+        print(f"   🗂️ Registrado {name} {version}")
+        return version
+
+    def find(self, name, fingerprint):
+        """Versión más reciente registrada con esa huella de entrenamiento, o None."""
+        if fingerprint is None:
+            return None
+        for v in reversed(self.manifest(name)["versions"]):
+            if v.get("fingerprint") == fingerprint:
+                return v["version"]
+        return None
+
+    # --- Carga ---
+
+    def artifact_path(self, name, role, version=None) -> Path:
+        """Ruta local verificada del artefacto (se descarga de GCS si hace falta)."""
+        meta = self.entry(name, version)
+        info = meta["artifacts"][role]
+        path = self.root / name / meta["version"] / info["file"]
+        if not path.exists():
+            if self.bucket is None:
+                raise FileNotFoundError(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.bucket.blob(
+                self._blob_name(name, meta["version"], info["file"])
+            ).download_to_filename(str(path))
+        if file_sha256(path) != info["sha256"]:
+            raise ValueError(f"Checksum inválido para {path}")
+        return path
+
+    def load(self, name, role="model", version=None):
+        """
+        Artefacto `role` de `name` (última versión por defecto), cargado una sola vez
+        por versión. Cargar una versión nueva libera las anteriores del mismo modelo.
+        """
+        version = version or self.latest_version(name)
+        if version is None:
+            raise KeyError(f"'{name}' no tiene versiones registradas")
+        key = (name, version, role)
+        if key not in self._cache:
+            artifact = load_artifact(self.artifact_path(name, role, version))
+            for old in [k for k in self._cache if k[0] == name and k[2] == role]:
+                del self._cache[old]
+            self._cache[key] = artifact
+        return self._cache[key]
+
+    def has(self, name) -> bool:
+        return self.latest_version(name) is not None
@@ -1,69 +1,331 @@
 import pandas as pd
 import numpy as np
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
+import tensorflow as tf
+from tensorflow.keras.models import Model, Sequential
+from tensorflow.keras.layers import LSTM, Concatenate, Dense, Dropout, Embedding, Input
 from tensorflow.keras.callbacks import EarlyStopping
 from sklearn.preprocessing import MinMaxScaler
 from google.cloud import storage
 from numpy.lib.stride_tricks import sliding_window_view
-import io
+import argparse
+import hashlib
+import inspect
 import os
+import sys
+from pathlib import Path
 import joblib
 
+from src.data.parquet_io import read_parquet_blob
+from src.features.dataset import prepare_dataset
+from src.models.registry import (
+    ModelRegistry,
+    code_version,
+    data_fingerprint,
+    training_fingerprint,
+)
+from src.models.walk_forward import WINDOW_MODES, WalkForwardEngine
+
 # Configuración
 BUCKET_NAME = "market-oracle-tesis-data-lake"
 TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"]
+# Código que define el modelo entrenado (entra en la huella de entrenamiento)
+CODE_FILES = (__file__, inspect.getfile(prepare_dataset))
 SEQ_LENGTH = 10  # Ventana de tiempo: El modelo mirará los últimos 10 días para predecir
+EPOCHS = 20  # Pocas épocas para prueba rápida
+WARM_START_EPOCHS = 5  # Épocas de ajuste fino cuando se parte de los pesos del fold anterior
+
+# Modelo pooled (un único LSTM para todos los tickers)
+POOLED_MODEL_PATH = "models/lstm_pooled.keras"
+POOLED_META_PATH = "models/lstm_pooled_meta.pkl"  # tickers, features y scalers por ticker
+TICKER_EMBEDDING_DIM = 4
+
+
+def make_sequences(X, y, time_steps=SEQ_LENGTH):
+    """Transforma datos 2D en secuencias 3D para LSTM [Samples, Time Steps, Features]"""
+    if len(X) <= time_steps:
+        return np.array([]), np.array([])
+
+    # Optimization: Use sliding_window_view to avoid slow python loop and unnecessary copying
+    # X is (N, Features)
+    # sliding_window_view(X, time_steps, axis=0) -> (N-T+1, Features, TimeSteps)
+    X_windows = sliding_window_view(X, time_steps, axis=0)
+
+    # We need (Samples, TimeSteps, Features) -> transpose(0, 2, 1)
+    # And we need to drop the last window because there is no target y for it (y is shifted)
+    X_seq = X_windows[:-1].transpose(0, 2, 1)
+
+    # Targets start from time_steps index
+    y_seq = y[time_steps:]
+
+    return X_seq, y_seq
+
+
+def build_lstm_model(input_shape):
+    """Arquitectura LSTM compilada para clasificación binaria (sube / baja)."""
+    model = Sequential(
+        [
+            # Capa 1: LSTM con retorno de secuencias (si apiláramos más LSTMs)
+            # Aquí false porque pasamos directo a Dense
+            LSTM(50, return_sequences=False, input_shape=input_shape),
+            Dropout(0.2),  # Regularización para evitar overfitting
+            Dense(25, activation="relu"),
+            Dense(1, activation="sigmoid"),  # Salida binaria (0 o 1)
+        ]
+    )
+    model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"])
+    return model
+
+
+def build_pooled_lstm_model(seq_length, n_features, n_tickers, embedding_dim=TICKER_EMBEDDING_DIM):
+    """
+    LSTM compartido por todos los tickers: la ventana pasa por el LSTM y el id del
+    ticker por un embedding, que se concatenan antes de la cabeza densa.
+    Entradas: {"window": (seq_length, n_features), "ticker": id entero}.
+    """
+    window_in = Input(shape=(seq_length, n_features), name="window")
+    ticker_in = Input(shape=(), dtype="int64", name="ticker")
+
+    h = LSTM(50, return_sequences=False)(window_in)
+    h = Dropout(0.2)(h)
+    ticker_vec = Embedding(n_tickers, embedding_dim, name="ticker_embedding")(ticker_in)
+    h = Concatenate()([h, ticker_vec])
+    h = Dense(25, activation="relu")(h)
+    out = Dense(1, activation="sigmoid")(h)
+
+    model = Model(inputs={"window": window_in, "ticker": ticker_in}, outputs=out)
+    model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"])
+    return model
+
+
+def make_window_dataset(
+    data,
+    target,
+    starts_by_ticker,
+    seq_length=SEQ_LENGTH,
+    batch_size=64,
+    shuffle_buffer=None,
+    seed=42,
+    with_ticker=True,
+):
+    """
+    Pipeline tf.data de ventanas multi-ticker sobre el array 2D concatenado.
+    - `starts_by_ticker`: {ticker_id: posiciones (en `data`) donde empieza cada ventana}.
+    - interleave alterna los tickers, shuffle/batch operan sobre índices (escalares) y
+      las ventanas se arman por lotes con tf.gather: nunca se materializa el tensor 3D
+      completo. La ventana [s, s + seq_length) se etiqueta con target[s + seq_length].
+    - with_ticker=False entrega solo la ventana (modelo Sequential por ticker).
+    """
+    data = tf.constant(data, dtype=tf.float32)
+    target = tf.constant(target, dtype=tf.float32)
+    ticker_ids = tf.constant(list(starts_by_ticker.keys()), dtype=tf.int64)
+    starts = tf.RaggedTensor.from_row_lengths(
+        np.concatenate([np.asarray(v, dtype=np.int64) for v in starts_by_ticker.values()]),
+        [len(v) for v in starts_by_ticker.values()],
+    )
+
+    # (inicio, ticker) por elemento sin map por elemento: el id se replica con tf.fill
+    ds = tf.data.Dataset.range(len(starts_by_ticker)).interleave(
+        lambda i: tf.data.Dataset.from_tensor_slices(
+            (starts[i], tf.fill(tf.shape(starts[i]), ticker_ids[i]))
+        ),
+        cycle_length=len(starts_by_ticker),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=True,
+    )
+    if shuffle_buffer:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+
+    offsets = tf.range(seq_length, dtype=tf.int64)
+
+    def gather_windows(batch_starts, batch_tickers):
+        windows = tf.gather(data, batch_starts[:, None] + offsets)
+        labels = tf.gather(target, batch_starts + seq_length)
+        if not with_ticker:
+            return windows, labels
+        return {"window": windows, "ticker": batch_tickers}, labels
+
+    return (
+        ds.batch(batch_size)
+        .map(gather_windows, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+
+def make_series_dataset(data, target, seq_length=SEQ_LENGTH, batch_size=16, shuffle=False, seed=42):
+    """
+    Ventanas perezosas de una sola serie 2D: mismas parejas (X, y) que `make_sequences`
+    pero armadas por lote, con memoria pico de un batch en lugar de N x seq_length x F.
+    Retorna None si no hay filas suficientes para una ventana.
+    """
+    n_windows = len(data) - seq_length
+    if n_windows <= 0:
+        return None
+    return make_window_dataset(
+        data,
+        target,
+        {0: np.arange(n_windows)},
+        seq_length=seq_length,
+        batch_size=batch_size,
+        shuffle_buffer=n_windows if shuffle else None,
+        seed=seed,
+        with_ticker=False,
+    )
+
+
+def export_tflite(model, path, seq_length=SEQ_LENGTH, n_features=None):
+    """
+    Exporta el modelo a TFLite para inferencia ligera (ver `src.models.inference`).
+    Se congela una función con batch estático 1 (el caso de servir una ventana):
+    así el LSTM se convierte solo con ops builtin, sin Select TF ops ni TensorFlow
+    completo en el runtime.
+    """
+    n_features = n_features or model.input_shape[-1]
+    serve = tf.function(lambda x: model(x, training=False)).get_concrete_function(
+        tf.TensorSpec([1, seq_length, n_features], tf.float32)
+    )
+    tflite_model = tf.lite.TFLiteConverter.from_concrete_functions([serve]).convert()
+    Path(path).write_bytes(tflite_model)
+    return path
+
+
+class LSTMFoldModel:
+    """
+    Adaptador walk-forward del LSTM. El scaler se reajusta en cada fold (los precios
+    tienen tendencia y MinMax quedaría fuera de rango), pero en warm start los pesos
+    parten del fold anterior y solo se afinan `warm_epochs` épocas.
+    """
+
+    supports_warm_start = True
+
+    def __init__(
+        self,
+        seq_length=SEQ_LENGTH,
+        epochs=20,
+        warm_epochs=WARM_START_EPOCHS,
+        batch_size=16,
+        lazy_windows=False,
+    ):
+        self.seq_length = seq_length
+        self.context_rows = seq_length
+        self.epochs = epochs
+        self.warm_epochs = warm_epochs
+        self.batch_size = batch_size
+        self.lazy_windows = lazy_windows
+
+    def fit(self, X, y, previous=None):
+        self.scaler = MinMaxScaler(feature_range=(0, 1)).fit(X)
+        X_scaled = self.scaler.transform(X)
+
+        self.model = build_lstm_model((self.seq_length, X.shape[1]))
+        epochs = self.epochs
+        if previous is not None:
+            self.model.set_weights(previous.model.get_weights())
+            epochs = self.warm_epochs
+
+        if self.lazy_windows:
+            train_ds = make_series_dataset(
+                X_scaled, y, self.seq_length, self.batch_size, shuffle=True
+            )
+            self.model.fit(train_ds, epochs=epochs, verbose=0)
+        else:
+            X_seq, y_seq = make_sequences(X_scaled, y, self.seq_length)
+            self.model.fit(X_seq, y_seq, epochs=epochs, batch_size=self.batch_size, verbose=0)
+        return self
+
+    def predict(self, X):
+        # X trae `seq_length` filas de contexto antes del bloque a predecir
+        X_scaled = self.scaler.transform(X)
+        if self.lazy_windows:
+            windows = make_series_dataset(X_scaled, np.zeros(len(X)), self.seq_length, self.batch_size)
+            windows = windows.map(lambda x, _: x)
+        else:
+            windows, _ = make_sequences(X_scaled, np.zeros(len(X)), self.seq_length)
+        return (self.model.predict(windows, verbose=0).ravel() > 0.5).astype(int)
 
 
 class LSTMTrainer:
-    def __init__(self, bucket_name):
+    def __init__(
+        self,
+        bucket_name,
+        start_date=None,
+        end_date=None,
+        seq_length=SEQ_LENGTH,
+        lazy_windows=False,
+        export_tflite=True,
+        registry=None,
+        force=False,
+    ):
         self.bucket = storage.Client().bucket(bucket_name)
+        # Ventana de entrenamiento opcional (se empuja a los row groups del Parquet)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.seq_length = seq_length
+        # lazy_windows: ventanas armadas por lote con tf.data (sin tensor 3D en memoria)
+        self.lazy_windows = lazy_windows
+        # Exportar también a TFLite junto al .keras (inferencia en dashboard / bot)
+        self.export_tflite = export_tflite
+        # Registro de artefactos versionados (opcional; ver src/models/registry.py)
+        self.registry = registry
+        # force=True reentrena aunque exista una versión con la misma huella
+        self.force = force
 
-    def load_data(self, ticker):
-        blob = self.bucket.blob(f"data/gold/master_dataset_{ticker}.parquet")
-        if not blob.exists():
-            return None
-        return pd.read_parquet(io.BytesIO(blob.download_as_bytes()))
-
-    def create_sequences(self, X, y, time_steps=SEQ_LENGTH):
-        """Transforma datos 2D en secuencias 3D para LSTM [Samples, Time Steps, Features]"""
-        if len(X) <= time_steps:
-            return np.array([]), np.array([])
+    def load_data(self, ticker, columns=None, start=None, end=None):
+        return read_parquet_blob(
+            self.bucket,
+            f"data/gold/master_dataset_{ticker}.parquet",
+            columns=columns,
+            start=start,
+            end=end,
+        )
 
-        # Optimization: Use sliding_window_view to avoid slow python loop and unnecessary copying
-        # X is (N, Features)
-        # sliding_window_view(X, time_steps, axis=0) -> (N-T+1, Features, TimeSteps)
-        X_windows = sliding_window_view(X, time_steps, axis=0)
+    def training_params(self, **extra) -> dict:
+        """Hiperparámetros que definen el modelo entrenado (parte de la huella)."""
+        return {
+            "seq_length": self.seq_length,
+            "lazy_windows": self.lazy_windows,
+            "export_tflite": self.export_tflite,
+            **extra,
+        }
 
-        # We need (Samples, TimeSteps, Features) -> transpose(0, 2, 1)
-        # And we need to drop the last window because there is no target y for it (y is shifted)
-        X_seq = X_windows[:-1].transpose(0, 2, 1)
+    def is_up_to_date(self, name, fingerprint) -> bool:
+        """True si ya hay una versión registrada con esta huella (y no se fuerza)."""
+        if self.registry is None or self.force:
+            return False
+        version = self.registry.find(name, fingerprint)
+        if version is None:
+            return False
+        print(f"   ⏭️ {name} sin cambios desde {version}, se omite el entrenamiento.")
+        return True
 
-        # Targets start from time_steps index
-        y_seq = y[time_steps:]
+    def create_sequences(self, X, y, time_steps=SEQ_LENGTH):
+        """Transforma datos 2D en secuencias 3D para LSTM [Samples, Time Steps, Features]"""
+        return make_sequences(X, y, time_steps)
 
-        return X_seq, y_seq
+    def prepare_data(self, df, feature_names=None):
+        """Retorna (features 2D float32, target, índice de fechas, nombres de features) a partir del Dataset Maestro."""
+        # Target: 1 si Close sube mañana, 0 si baja (la última fila no tiene mañana)
+        dataset = prepare_dataset(df, feature_set="lstm", feature_names=feature_names)
+        return dataset.X, dataset.y, dataset.index, list(dataset.feature_names)
 
     def train(self, ticker):
         print(f"\n🧠 Entrenando LSTM para {ticker}...")
 
-        df = self.load_data(ticker)
+        df = self.load_data(ticker, start=self.start_date, end=self.end_date)
         if df is None:
             return
 
         # 1. Preparación de Datos
-        # Target: 1 si Close sube mañana, 0 si baja
-        # Optimization: Explicitly drop last row as we don't have tomorrow's price
-        df = df.iloc[:-1].copy()
-        df["Target"] = (df["Close"].shift(-1) > df["Close"]).astype(int)
-        df.dropna(inplace=True)
-
-        feature_cols = [
-            c for c in df.columns if c not in ["Target", "date_only", "Ticker"]
-        ]
-        data = df[feature_cols].values
-        target = df["Target"].values
+        data, target, _, feature_cols = self.prepare_data(df)
+
+        data_hash = data_fingerprint(df)
+        fingerprint = training_fingerprint(
+            data_hash,
+            feature_cols,
+            self.training_params(epochs=EPOCHS),
+            code_version(*CODE_FILES),
+        )
+        if self.is_up_to_date(f"lstm_{ticker}", fingerprint):
+            return
 
         # 2. Split (80/20) - Sin aleatoriedad por ser series de tiempo
         train_size = int(len(data) * 0.8)
@@ -78,53 +340,58 @@ class LSTMTrainer:
         y_test = target[train_size:]
 
         # 4. Crear Secuencias (Ventanas deslizantes)
-        # Importante: Esto reduce el tamaño del dataset en SEQ_LENGTH filas
-        X_train_seq, y_train_seq = self.create_sequences(data_train, y_train)
-        X_test_seq, y_test_seq = self.create_sequences(data_test, y_test)
+        # Importante: Esto reduce el tamaño del dataset en seq_length filas
+        if self.lazy_windows:
+            # Ventanas armadas por lote sobre el array 2D (memoria pico: un batch)
+            train_set = make_series_dataset(
+                data_train, y_train, self.seq_length, batch_size=16, shuffle=True
+            )
+            test_set = make_series_dataset(data_test, y_test, self.seq_length, batch_size=16)
+            has_windows = train_set is not None and test_set is not None
+        else:
+            X_train_seq, y_train_seq = self.create_sequences(
+                data_train, y_train, time_steps=self.seq_length
+            )
+            X_test_seq, y_test_seq = self.create_sequences(
+                data_test, y_test, time_steps=self.seq_length
+            )
+            has_windows = len(X_train_seq) > 0 and len(X_test_seq) > 0
 
-        if len(X_train_seq) == 0 or len(X_test_seq) == 0:
+        if not has_windows:
             print(
                 "⚠️ Datos insuficientes para generar secuencias. Necesitas más historial."
             )
             return
 
         # 5. Arquitectura del Modelo
-        model = Sequential(
-            [
-                # Capa 1: LSTM con retorno de secuencias (si apiláramos más LSTMs)
-                # Aquí false porque pasamos directo a Dense
-                LSTM(
-                    50,
-                    return_sequences=False,
-                    input_shape=(X_train_seq.shape[1], X_train_seq.shape[2]),
-                ),
-                Dropout(0.2),  # Regularización para evitar overfitting
-                Dense(25, activation="relu"),
-                Dense(1, activation="sigmoid"),  # Salida binaria (0 o 1)
-            ]
-        )
-
-        model.compile(
-            optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"]
-        )
+        model = build_lstm_model((self.seq_length, data.shape[1]))
 
         # 6. Entrenamiento con Early Stopping
         early_stop = EarlyStopping(
             monitor="val_loss", patience=5, restore_best_weights=True
         )
 
-        model.fit(
-            X_train_seq,
-            y_train_seq,
-            epochs=20,  # Pocas épocas para prueba rápida
-            batch_size=16,
-            validation_data=(X_test_seq, y_test_seq),
+        fit_kwargs = dict(
+            epochs=EPOCHS,
             callbacks=[early_stop],
             verbose=0,  # Silencioso para no ensuciar la consola
         )
+        if self.lazy_windows:
+            model.fit(train_set, validation_data=test_set, **fit_kwargs)
+        else:
+            model.fit(
+                X_train_seq,
+                y_train_seq,
+                batch_size=16,
+                validation_data=(X_test_seq, y_test_seq),
+                **fit_kwargs,
+            )
 
         # 7. Evaluación
-        loss, acc = model.evaluate(X_test_seq, y_test_seq, verbose=0)
+        if self.lazy_windows:
+            loss, acc = model.evaluate(test_set, verbose=0)
+        else:
+            loss, acc = model.evaluate(X_test_seq, y_test_seq, verbose=0)
         print(f"   🤖 LSTM Accuracy: {acc:.2%}")
 
         # Guardar modelo
@@ -133,12 +400,227 @@ class LSTMTrainer:
         joblib.dump(scaler, f"models/scaler_lstm_{ticker}.pkl")
         print(f"   💾 Modelo guardado en models/lstm_{ticker}.keras")
 
+        artifacts = {
+            "model": f"models/lstm_{ticker}.keras",
+            "scaler": f"models/scaler_lstm_{ticker}.pkl",
+        }
+        if self.export_tflite:
+            # El .keras ya está guardado: un fallo del export no invalida el entrenamiento
+            try:
+                export_tflite(model, f"models/lstm_{ticker}.tflite", self.seq_length, data.shape[1])
+                artifacts["tflite"] = f"models/lstm_{ticker}.tflite"
+                print(f"   📦 Exportado a TFLite: models/lstm_{ticker}.tflite")
+            except Exception as e:
+                print(f"   ⚠️ No se pudo exportar a TFLite: {e}")
+
+        if self.registry is not None:
+            self.registry.register(
+                f"lstm_{ticker}",
+                artifacts,
+                data_fingerprint=data_hash,
+                features=feature_cols,
+                metrics={"accuracy": float(acc), "loss": float(loss)},
+                params=self.training_params(epochs=EPOCHS),
+                fingerprint=fingerprint,
+            )
+
+    def train_pooled(self, tickers=TICKERS, epochs=20, batch_size=64, shuffle_buffer=10_000):
+        """
+        Entrena un único LSTM para todos los tickers (embedding de ticker) a partir de
+        un solo pipeline tf.data. Split 80/20 temporal y MinMaxScaler por ticker.
+        Retorna la tabla de métricas de test por ticker.
+        """
+        print(f"\n🧠 Entrenando LSTM pooled para {list(tickers)}...")
+
+        blocks, targets = [], []
+        train_starts, test_starts = {}, {}
+        scalers, used = {}, []
+        feature_cols = None
+        offset = 0
+        fingerprints = {}
+        for ticker in tickers:
+            df = self.load_data(ticker, start=self.start_date, end=self.end_date)
+            if df is None:
+                print(f"   ⚠️ Sin datos para {ticker}, se omite.")
+                continue
+            fingerprints[ticker] = data_fingerprint(df)
+
+            data, target, _, cols = self.prepare_data(df)
+            if feature_cols is None:
+                feature_cols = cols
+            elif set(cols) != set(feature_cols):
+                print(f"   ⚠️ Features de {ticker} no coinciden con el resto, se omite.")
+                continue
+            elif cols != feature_cols:
+                # Mismas features en otro orden: alinear columnas
+                data, target, _, _ = self.prepare_data(df, feature_cols)
+
+            train_size = int(len(data) * 0.8)
+            if train_size <= self.seq_length or len(data) - train_size <= self.seq_length:
+                print(f"   ⚠️ Datos insuficientes para {ticker}, se omite.")
+                continue
+
+            # Escalamiento por ticker, ajustado solo con su tramo de entrenamiento
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            scaler.fit(data[:train_size])
+
+            ticker_id = len(used)
+            train_starts[ticker_id] = offset + np.arange(0, train_size - self.seq_length)
+            test_starts[ticker_id] = offset + np.arange(train_size, len(data) - self.seq_length)
+            blocks.append(scaler.transform(data).astype(np.float32))
+            targets.append(target.astype(np.float32))
+            scalers[ticker] = scaler
+            used.append(ticker)
+            offset += len(data)
+
+        if not used:
+            print("⚠️ Ningún ticker con datos suficientes para el modelo pooled.")
+            return None
+
+        # Huella conjunta de los tickers efectivamente usados
+        data_hash = hashlib.sha256("".join(fingerprints[t] for t in used).encode()).hexdigest()
+        params = self.training_params(
+            tickers=used, epochs=epochs, batch_size=batch_size, shuffle_buffer=shuffle_buffer
+        )
+        fingerprint = training_fingerprint(
+            data_hash, feature_cols, params, code_version(*CODE_FILES)
+        )
+        if self.is_up_to_date("lstm_pooled", fingerprint):
+            return None
 
+        data_all = np.concatenate(blocks)
+        target_all = np.concatenate(targets)
+        n_train = sum(len(v) for v in train_starts.values())
+
+        train_ds = make_window_dataset(
+            data_all,
+            target_all,
+            train_starts,
+            seq_length=self.seq_length,
+            batch_size=batch_size,
+            shuffle_buffer=min(shuffle_buffer, n_train),
+        )
+        test_ds = make_window_dataset(
+            data_all, target_all, test_starts, seq_length=self.seq_length, batch_size=batch_size
+        )
+
+        model = build_pooled_lstm_model(self.seq_length, data_all.shape[1], len(used))
+        early_stop = EarlyStopping(monitor="val_loss", patience=5, restore_best_weights=True)
+        model.fit(train_ds, epochs=epochs, validation_data=test_ds, callbacks=[early_stop], verbose=0)
+
+        # Métricas de test por ticker (mismo modelo, datasets filtrados por ticker)
+        rows = []
+        for ticker_id, ticker in enumerate(used):
+            ticker_ds = make_window_dataset(
+                data_all,
+                target_all,
+                {ticker_id: test_starts[ticker_id]},
+                seq_length=self.seq_length,
+                batch_size=batch_size,
+            )
+            loss, acc = model.evaluate(ticker_ds, verbose=0)
+            rows.append(
+                {
+                    "ticker": ticker,
+                    "n_train": len(train_starts[ticker_id]),
+                    "n_test": len(test_starts[ticker_id]),
+                    "loss": loss,
+                    "accuracy": acc,
+                }
+            )
+        metrics = pd.DataFrame(rows).set_index("ticker")
+        print("   📊 Accuracy de test por ticker:")
+        print(metrics.round(4).to_string())
+
+        # Un solo artefacto: modelo + metadatos (orden de tickers, features y scalers)
+        os.makedirs("models", exist_ok=True)
+        model.save(POOLED_MODEL_PATH)
+        joblib.dump(
+            {"tickers": used, "feature_cols": feature_cols, "scalers": scalers},
+            POOLED_META_PATH,
+        )
+        print(f"   💾 Modelo pooled guardado en {POOLED_MODEL_PATH}")
+
+        if self.registry is not None:
+            self.registry.register(
+                "lstm_pooled",
+                {"model": POOLED_MODEL_PATH, "meta": POOLED_META_PATH},
+                data_fingerprint=data_hash,
+                features=feature_cols,
+                metrics=metrics["accuracy"].to_dict(),
+                params=params,
+                fingerprint=fingerprint,
+            )
+        return metrics
+
+    def walk_forward(self, ticker, n_folds=5, mode="expanding", warm_start=True, **engine_kwargs):
+        """
+        Evaluación walk-forward del LSTM: cada fold afina los pesos del anterior
+        (warm start) en lugar de entrenar desde cero. Retorna la tabla de métricas por fold.
+        """
+        print(f"\n🔁 Walk-forward LSTM para {ticker} ({mode}, {n_folds} folds)...")
+        df = self.load_data(ticker, start=self.start_date, end=self.end_date)
+        if df is None:
+            return None
+
+        data, target, index, _ = self.prepare_data(df)
+        engine = WalkForwardEngine(
+            LSTMFoldModel(seq_length=self.seq_length, lazy_windows=self.lazy_windows),
+            n_folds=n_folds,
+            mode=mode,
+            warm_start=warm_start,
+            **engine_kwargs,
+        )
+        folds = engine.run(data, target, index=index)
+        print(folds.round(4).to_string())
+        return folds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entrenamiento LSTM por ticker")
+    parser.add_argument("--walk-forward", action="store_true")
+    parser.add_argument(
+        "--pooled", action="store_true", help="Un único modelo para todos los tickers"
+    )
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--mode", choices=WINDOW_MODES, default="expanding")
+    parser.add_argument("--no-warm-start", action="store_true")
+    parser.add_argument("--seq-length", type=int, default=SEQ_LENGTH)
+    parser.add_argument("--no-tflite", action="store_true", help="No exportar a TFLite")
+    parser.add_argument(
+        "--no-registry", action="store_true", help="No registrar versiones de los modelos"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reentrena aunque los datos, features, hiperparámetros y código no hayan cambiado",
+    )
+    parser.add_argument(
+        "--lazy-windows",
+        action="store_true",
+        help="Arma las ventanas por lote con tf.data en vez de materializar el tensor 3D",
+    )
+    args = parser.parse_args([] if argv is None else argv)
+
+    trainer = LSTMTrainer(
+        BUCKET_NAME,
+        seq_length=args.seq_length,
+        lazy_windows=args.lazy_windows,
+        export_tflite=not args.no_tflite,
+        force=args.force,
+    )
+    if not args.no_registry:
+        trainer.registry = ModelRegistry(bucket=trainer.bucket)
+    if args.pooled:
+        return trainer.train_pooled(TICKERS)
 
-def main():
-    trainer = LSTMTrainer(BUCKET_NAME)
     for ticker in TICKERS:
-        trainer.train(ticker)
+        if args.walk_forward:
+            trainer.walk_forward(
+                ticker, n_folds=args.folds, mode=args.mode, warm_start=not args.no_warm_start
+            )
+        else:
+            trainer.train(ticker)
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
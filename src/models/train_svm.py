@@ -1,103 +1,260 @@
 import pandas as pd
 import numpy as np
 from sklearn.svm import SVC
-from sklearn.model_selection import train_test_split, GridSearchCV, TimeSeriesSplit
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    train_test_split,
+    GridSearchCV,
+    HalvingGridSearchCV,
+    RandomizedSearchCV,
+    TimeSeriesSplit,
+)
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 import joblib
-import io
 from google.cloud import storage
+import argparse
+import inspect
+import itertools
 import os
+import sys
+import time
+
+from src.data.parquet_io import read_parquet_blob
+from src.features.dataset import prepare_dataset
+from src.models.registry import (
+    ModelRegistry,
+    code_version,
+    data_fingerprint,
+    training_fingerprint,
+)
+from src.models.walk_forward import (
+    WINDOW_MODES,
+    SGDFoldModel,
+    SVCFoldModel,
+    WalkForwardEngine,
+)
 
 # Configuración
 BUCKET_NAME = "market-oracle-tesis-data-lake"  # Ajusta si es necesario
 TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"]
+# Código que define el modelo entrenado (entra en la huella de entrenamiento)
+CODE_FILES = (__file__, inspect.getfile(prepare_dataset))
+
+# Espacio de búsqueda: C (penalización) y gamma (influencia), kernel radial y sigmoide
+PARAM_GRID = {
+    "C": [0.1, 1, 10, 100],
+    "gamma": [1, 0.1, 0.01, 0.001],
+    "kernel": ["rbf", "sigmoid"],
+}
+
+# grid: búsqueda exhaustiva | halving: successive halving sobre la grilla (descarta
+# configuraciones malas con pocas muestras) | random: n_iter combinaciones al azar
+SEARCH_MODES = ("grid", "halving", "random")
+
+# svc: SVC exacto (O(n²)-O(n³) en muestras) | nystroem / rff: aproximación del kernel
+# RBF (Nyström o Random Fourier Features) + SVM lineal entrenado por SGD (hinge),
+# lineal en muestras y con partial_fit para entrenamiento en streaming
+ESTIMATORS = ("svc", "nystroem", "rff")
+N_COMPONENTS = 300
+
+# Espacio de búsqueda del camino aproximado: gamma del kernel y regularización
+# (alpha ~ 1 / (C * n_muestras) en términos de SVC)
+APPROX_PARAM_GRID = {
+    "features__gamma": [1, 0.1, 0.01, 0.001],
+    "clf__alpha": [1e-5, 1e-4, 1e-3, 1e-2],
+}
+JOBLIB_BACKENDS = ("loky", "threading", "multiprocessing")
 
 
 class SVMTrainer:
-    def __init__(self, bucket_name):
+    def __init__(
+        self,
+        bucket_name,
+        start_date=None,
+        end_date=None,
+        search="grid",
+        estimator="svc",
+        n_components=N_COMPONENTS,
+        n_jobs=None,
+        backend="loky",
+        n_iter=10,
+        random_state=42,
+        registry=None,
+        force=False,
+    ):
+        if search not in SEARCH_MODES:
+            raise ValueError(f"search debe ser uno de {SEARCH_MODES}, no '{search}'")
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"estimator debe ser uno de {ESTIMATORS}, no '{estimator}'")
+        if backend not in JOBLIB_BACKENDS:
+            raise ValueError(f"backend debe ser uno de {JOBLIB_BACKENDS}, no '{backend}'")
+
         self.bucket_name = bucket_name
         self.storage_client = storage.Client()
         self.bucket = self.storage_client.bucket(bucket_name)
+        # Ventana de entrenamiento opcional (se empuja a los row groups del Parquet)
+        self.start_date = start_date
+        self.end_date = end_date
+        # Búsqueda de hiperparámetros (n_jobs=-1 usa todos los núcleos)
+        self.search = search
+        self.estimator = estimator
+        self.n_components = n_components
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.n_iter = n_iter
+        self.random_state = random_state
+        # Registro de artefactos versionados (opcional; ver src/models/registry.py)
+        self.registry = registry
+        # force=True reentrena aunque exista una versión con la misma huella
+        self.force = force
 
-    def load_data(self, ticker):
-        """Descarga el Dataset Maestro de la capa Gold."""
+    def load_data(self, ticker, columns=None, start=None, end=None):
+        """Descarga el Dataset Maestro de la capa Gold (columnas y fechas opcionales)."""
         blob_path = f"data/gold/master_dataset_{ticker}.parquet"
-        blob = self.bucket.blob(blob_path)
-
-        if not blob.exists():
+        df = read_parquet_blob(
+            self.bucket, blob_path, columns=columns, start=start, end=end
+        )
+        if df is None:
             print(f"⚠️ No se encontró datos para {ticker}")
-            return None
-
-        data = blob.download_as_bytes()
-        df = pd.read_parquet(io.BytesIO(data))
         return df
 
     def prepare_features(self, df):
-        """Genera X (Features) e Y (Target)."""
-        df = df.copy()
-
-        # 1. Crear Target: ¿El precio subirá MAÑANA?
-        # Shift(-1) mira al futuro (solo para entrenar, prohibido en inferencia)
-        # Eliminamos la última fila primero porque no tenemos el precio de mañana
-        df = df.iloc[:-1].copy()
-        df["Target"] = (df["Close"].shift(-1) > df["Close"]).astype(int)
-
-        # Eliminamos filas con NaNs si las hay (aunque con el fix anterior no debería haber en Target)
-        df.dropna(inplace=True)
-
-        # 2. Seleccionar Features
-        # Excluimos columnas que no son predictoras (fechas, el target mismo)
-        drop_cols = [
-            "Target",
-            "Open",
-            "High",
-            "Low",
-            "Close",
-            "Volume",
-            "Ticker",
-            "date_only",
-        ]
-        features = [c for c in df.columns if c not in drop_cols]
-
-        X = df[features]
-        y = df["Target"]
-
+        """Genera X (Features) e Y (Target) con el conjunto de features del SVM."""
+        # Target (¿sube el Close MAÑANA?) y features definidos en src/features/dataset.py;
+        # X es una vista DataFrame sobre el buffer float32, sin copias intermedias
+        dataset = prepare_dataset(df, feature_set="svm")
+        X = dataset.frame()
+        y = pd.Series(dataset.y.astype(int), index=dataset.index, name="Target")
         return X, y
 
-    def train(self, ticker):
-        print(f"\n🚀 Entrenando SVM para {ticker}...")
+    def kernel_features(self, estimator=None, gamma=0.1):
+        """Transformación que aproxima el kernel RBF (Nyström o Random Fourier Features)."""
+        estimator = estimator or self.estimator
+        if estimator == "nystroem":
+            return Nystroem(
+                kernel="rbf",
+                gamma=gamma,
+                n_components=self.n_components,
+                random_state=self.random_state,
+            )
+        if estimator == "rff":
+            return RBFSampler(
+                gamma=gamma, n_components=self.n_components, random_state=self.random_state
+            )
+        raise ValueError(f"'{estimator}' no es un estimador de kernel aproximado")
 
-        df = self.load_data(ticker)
-        if df is None:
-            return
+    def build_estimator(self, estimator=None):
+        """Retorna (estimador base, espacio de búsqueda) para `estimator` (por defecto el de la instancia)."""
+        estimator = estimator or self.estimator
+        if estimator == "svc":
+            return SVC(), PARAM_GRID
+        pipeline = Pipeline(
+            [
+                ("features", self.kernel_features(estimator)),
+                (
+                    "clf",
+                    SGDClassifier(loss="hinge", random_state=self.random_state),
+                ),
+            ]
+        )
+        return pipeline, APPROX_PARAM_GRID
 
-        X, y = self.prepare_features(df)
+    def build_search(self, cv, estimator=None):
+        """Construye el buscador de hiperparámetros según `self.search`."""
+        base, param_grid = self.build_estimator(estimator)
+        common = dict(refit=True, verbose=0, cv=cv, n_jobs=self.n_jobs)
+        if self.search == "halving":
+            return HalvingGridSearchCV(
+                base, param_grid, factor=3, random_state=self.random_state, **common
+            )
+        if self.search == "random":
+            return RandomizedSearchCV(
+                base,
+                param_grid,
+                n_iter=self.n_iter,
+                random_state=self.random_state,
+                **common,
+            )
+        return GridSearchCV(base, param_grid, **common)
+
+    def training_params(self) -> dict:
+        """Hiperparámetros que definen el modelo entrenado (parte de la huella)."""
+        return {
+            "search": self.search,
+            "estimator": self.estimator,
+            "n_components": self.n_components,
+            "n_iter": self.n_iter,
+            "random_state": self.random_state,
+            "param_grid": PARAM_GRID if self.estimator == "svc" else APPROX_PARAM_GRID,
+        }
 
-        # 3. Split respetando el tiempo (Sin aleatoriedad)
+    def split_and_scale(self, X, y):
+        """Split temporal 80/20 y escalado ajustado solo con el tramo de entrenamiento."""
+        # Split respetando el tiempo (Sin aleatoriedad)
         # Los primeros 80% días para entrenar, el 20% final para probar
         train_size = int(len(X) * 0.8)
         X_train, X_test = X.iloc[:train_size], X.iloc[train_size:]
         y_train, y_test = y.iloc[:train_size], y.iloc[train_size:]
 
-        # 4. Escalamiento (CRÍTICO para SVM)
+        # Escalamiento (CRÍTICO para SVM)
         scaler = StandardScaler()
         X_train_scaled = scaler.fit_transform(X_train)
         X_test_scaled = scaler.transform(X_test)
+        return X_train_scaled, X_test_scaled, y_train, y_test, scaler
 
-        # 5. Optimización de Hiperparámetros (GridSearch)
-        # Buscamos la mejor combinación de C (penalización) y gamma (influencia)
-        param_grid = {
-            "C": [0.1, 1, 10, 100],
-            "gamma": [1, 0.1, 0.01, 0.001],
-            "kernel": ["rbf", "sigmoid"],  # Probamos radial y sigmoide
-        }
-
+    def fit_search(self, X_train, y_train, estimator=None):
+        """Optimización de hiperparámetros con validación cruzada temporal."""
         # TimeSeriesSplit para validación cruzada sin mirar al futuro
         tscv = TimeSeriesSplit(n_splits=3)
+        grid = self.build_search(tscv, estimator)
+        with joblib.parallel_config(backend=self.backend):
+            grid.fit(X_train, y_train)
+        return grid
+
+    def train(self, ticker):
+        """Entrena el SVM de un ticker. Retorna los tiempos por etapa (o None sin datos)."""
+        print(f"\n🚀 Entrenando SVM para {ticker}...")
+        t_start = time.perf_counter()
+
+        df = self.load_data(ticker, start=self.start_date, end=self.end_date)
+        if df is None:
+            return None
+        t_loaded = time.perf_counter()
+
+        X, y = self.prepare_features(df)
+
+        data_hash = data_fingerprint(df)
+        fingerprint = training_fingerprint(
+            data_hash, X.columns, self.training_params(), code_version(*CODE_FILES)
+        )
+        if self.registry is not None and not self.force:
+            version = self.registry.find(f"svm_{ticker}", fingerprint)
+            if version is not None:
+                print(f"   ⏭️ Sin cambios desde {version}, se omite el entrenamiento.")
+                return {
+                    "ticker": ticker,
+                    "search": self.search,
+                    "estimator": self.estimator,
+                    "load_s": t_loaded - t_start,
+                    "search_s": 0.0,
+                    "total_s": time.perf_counter() - t_start,
+                    "accuracy": self.registry.entry(f"svm_{ticker}", version)["metrics"].get(
+                        "accuracy"
+                    ),
+                    "version": version,
+                    "skipped": True,
+                }
 
-        grid = GridSearchCV(SVC(), param_grid, refit=True, verbose=0, cv=tscv)
-        grid.fit(X_train_scaled, y_train)
+        # 3-4. Split temporal + escalamiento
+        X_train_scaled, X_test_scaled, y_train, y_test, scaler = self.split_and_scale(X, y)
+
+        # 5. Optimización de Hiperparámetros (grid / halving / random)
+        grid = self.fit_search(X_train_scaled, y_train)
+        t_searched = time.perf_counter()
 
         # 6. Evaluación
         print(f"   🏆 Mejores parámetros: {grid.best_params_}")
@@ -115,14 +272,185 @@ class SVMTrainer:
         joblib.dump(scaler, f"models/scaler_{ticker}.pkl")
         print(f"   💾 Modelo guardado en models/svm_{ticker}.pkl")
 
+        version = None
+        if self.registry is not None:
+            version = self.registry.register(
+                f"svm_{ticker}",
+                {"model": f"models/svm_{ticker}.pkl", "scaler": f"models/scaler_{ticker}.pkl"},
+                data_fingerprint=data_hash,
+                features=list(X.columns),
+                metrics={"accuracy": acc},
+                params={**self.training_params(), "best_params": grid.best_params_},
+                fingerprint=fingerprint,
+            )
+
+        t_end = time.perf_counter()
+        return {
+            "ticker": ticker,
+            "search": self.search,
+            "estimator": self.estimator,
+            "load_s": t_loaded - t_start,
+            "search_s": t_searched - t_loaded,
+            "total_s": t_end - t_start,
+            "accuracy": acc,
+            "version": version,
+            "skipped": False,
+        }
+
+    def compare_estimators(self, ticker, estimators=ESTIMATORS):
+        """
+        Entrena cada estimador sobre el mismo split temporal (sin guardar modelos) y
+        retorna accuracy en test y tiempo de ajuste, lado a lado.
+        """
+        print(f"\n⚖️ Comparando estimadores SVM para {ticker}: {list(estimators)}")
+        df = self.load_data(ticker, start=self.start_date, end=self.end_date)
+        if df is None:
+            return None
+
+        X, y = self.prepare_features(df)
+        X_train, X_test, y_train, y_test, _ = self.split_and_scale(X, y)
+
+        rows = []
+        for estimator in estimators:
+            t0 = time.perf_counter()
+            grid = self.fit_search(X_train, y_train, estimator)
+            fit_s = time.perf_counter() - t0
+            rows.append(
+                {
+                    "estimator": estimator,
+                    "accuracy": accuracy_score(y_test, grid.predict(X_test)),
+                    "fit_s": fit_s,
+                    "n_train": len(X_train),
+                }
+            )
+
+        comparison = pd.DataFrame(rows).set_index("estimator")
+        print(comparison.round(4).to_string())
+        return comparison
+
+    def walk_forward(self, ticker, n_folds=5, mode="expanding", warm_start=True):
+        """
+        Evaluación walk-forward (expanding / rolling). Con el camino aproximado cada
+        fold parte de los coeficientes SGD del anterior; el SVC exacto no admite warm
+        start y sus folds se entrenan en paralelo (`n_jobs`). Retorna la tabla por fold.
+        """
+        print(f"\n🔁 Walk-forward SVM ({self.estimator}) para {ticker} ({mode}, {n_folds} folds)...")
+        df = self.load_data(ticker, start=self.start_date, end=self.end_date)
+        if df is None:
+            return None
+
+        X, y = self.prepare_features(df)
+        if self.estimator == "svc":
+            model = SVCFoldModel()
+        else:
+            model = SGDFoldModel(
+                kernel=self.estimator,
+                n_components=self.n_components,
+                random_state=self.random_state,
+            )
+
+        engine = WalkForwardEngine(
+            model,
+            n_folds=n_folds,
+            mode=mode,
+            warm_start=warm_start,
+            n_jobs=self.n_jobs,
+            backend=self.backend,
+        )
+        folds = engine.run(X.values, y.values, index=X.index)
+        print(folds.round(4).to_string())
+        return folds
+
+    def fit_stream(self, batches, gamma=0.1, alpha=1e-4, scaler=None, classes=(0, 1)):
+        """
+        Entrenamiento en streaming (datos que no caben en memoria) con el camino
+        aproximado: `batches` es un iterable de (X, y) en orden temporal.
+        - El scaler (si no se pasa uno ya ajustado) y los landmarks de Nyström se
+          ajustan con el primer batch, que debe ser representativo.
+        - Cada batch se transforma y se pasa a SGDClassifier.partial_fit.
+        Retorna (scaler, modelo) con la misma interfaz que `train` guarda en disco.
+        """
+        if self.estimator == "svc":
+            raise ValueError("SVC exacto no admite partial_fit; usa estimator='nystroem' o 'rff'")
+
+        batches = iter(batches)
+        X_first, y_first = next(batches)
+        if scaler is None:
+            scaler = StandardScaler().fit(X_first)
+        features = self.kernel_features(gamma=gamma).fit(scaler.transform(X_first))
+        clf = SGDClassifier(loss="hinge", alpha=alpha, random_state=self.random_state)
 
+        for X_batch, y_batch in itertools.chain([(X_first, y_first)], batches):
+            clf.partial_fit(
+                features.transform(scaler.transform(X_batch)), y_batch, classes=classes
+            )
 
-def main():
-    trainer = SVMTrainer(BUCKET_NAME)
+        return scaler, Pipeline([("features", features), ("clf", clf)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entrenamiento SVM por ticker")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="grid")
+    parser.add_argument("--estimator", choices=ESTIMATORS, default="svc")
+    parser.add_argument("--n-components", type=int, default=N_COMPONENTS)
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Compara svc / nystroem / rff (accuracy y tiempo) sin guardar modelos",
+    )
+    parser.add_argument("--walk-forward", action="store_true")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--mode", choices=WINDOW_MODES, default="expanding")
+    parser.add_argument("--no-warm-start", action="store_true")
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--backend", choices=JOBLIB_BACKENDS, default="loky")
+    parser.add_argument("--n-iter", type=int, default=10)
+    parser.add_argument(
+        "--no-registry", action="store_true", help="No registrar versiones de los modelos"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reentrena aunque los datos, features, hiperparámetros y código no hayan cambiado",
+    )
+    args = parser.parse_args([] if argv is None else argv)
+
+    trainer = SVMTrainer(
+        BUCKET_NAME,
+        search=args.search,
+        estimator=args.estimator,
+        n_components=args.n_components,
+        n_jobs=args.n_jobs,
+        backend=args.backend,
+        n_iter=args.n_iter,
+        force=args.force,
+    )
+    if not args.no_registry:
+        trainer.registry = ModelRegistry(bucket=trainer.bucket)
+
+    if args.compare:
+        return {ticker: trainer.compare_estimators(ticker) for ticker in TICKERS}
+    if args.walk_forward:
+        return {
+            ticker: trainer.walk_forward(
+                ticker, n_folds=args.folds, mode=args.mode, warm_start=not args.no_warm_start
+            )
+            for ticker in TICKERS
+        }
 
     # Entrenar para todos los tickers
+    timings = []
     for ticker in TICKERS:
-        trainer.train(ticker)
+        result = trainer.train(ticker)
+        if isinstance(result, dict):
+            timings.append(result)
+
+    # Reporte de tiempos por ticker
+    if timings:
+        report = pd.DataFrame(timings).set_index("ticker")
+        print("\n⏱️ Tiempos de entrenamiento SVM (s):")
+        print(report.round(3).to_string())
+    return timings
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
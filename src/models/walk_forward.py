@@ -0,0 +1,225 @@
+"""
+Motor de reentrenamiento walk-forward (ventanas expanding o rolling).
+
+Cada fold entrena con el pasado y evalúa en el bloque siguiente. Con `warm_start`
+el modelo de cada fold parte del anterior (coeficientes SGD, pesos LSTM) en lugar de
+reinicializarse; como eso encadena los folds, se ejecutan en serie. Sin warm start
+los folds son independientes y se reparten con joblib.
+
+Los modelos se pasan como adaptadores con la interfaz:
+    fit(X, y, previous=None) -> self     # previous: adaptador del fold anterior
+    predict(X) -> etiquetas 0/1          # X incluye `context_rows` filas previas
+    supports_warm_start: bool
+    context_rows: int                    # historia previa que necesita predict (LSTM)
+"""
+
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+WINDOW_MODES = ("expanding", "rolling")
+
+
+def walk_forward_splits(
+    n_samples: int, n_folds: int = 5, mode: str = "expanding", train_size=None, test_size=None
+) -> list:
+    """
+    Retorna [(train_slice, test_slice), ...] en orden temporal.
+    - test_size por defecto: n_samples // (n_folds + 1), de modo que el primer fold
+      entrena con el mismo tamaño que cada bloque de test.
+    - expanding: train = [0, test_start) | rolling: train = últimas `train_size` filas.
+    """
+    if mode not in WINDOW_MODES:
+        raise ValueError(f"mode debe ser uno de {WINDOW_MODES}, no '{mode}'")
+
+    test_size = test_size or n_samples // (n_folds + 1)
+    first_test = n_samples - n_folds * test_size
+    if test_size <= 0 or first_test <= 0:
+        raise ValueError(
+            f"Datos insuficientes: {n_samples} filas para {n_folds} folds de {test_size}"
+        )
+
+    window = train_size or first_test
+    splits = []
+    for k in range(n_folds):
+        test_start = first_test + k * test_size
+        train_start = 0 if mode == "expanding" else max(0, test_start - window)
+        splits.append((slice(train_start, test_start), slice(test_start, test_start + test_size)))
+    return splits
+
+
+class SGDFoldModel:
+    """
+    SVM lineal por SGD (hinge), opcionalmente sobre features de kernel aproximado.
+    En warm start hereda scaler y mapa de features del fold anterior para que sus
+    coeficientes sigan siendo válidos, y los usa como coef_init/intercept_init.
+    """
+
+    supports_warm_start = True
+    context_rows = 0
+
+    def __init__(self, kernel="rff", gamma=0.1, n_components=300, alpha=1e-4, random_state=42):
+        if kernel not in (None, "rff", "nystroem"):
+            raise ValueError(f"kernel debe ser None, 'rff' o 'nystroem', no '{kernel}'")
+        self.kernel = kernel
+        self.gamma = gamma
+        self.n_components = n_components
+        self.alpha = alpha
+        self.random_state = random_state
+
+    def _make_features(self):
+        if self.kernel == "nystroem":
+            return Nystroem(
+                gamma=self.gamma, n_components=self.n_components, random_state=self.random_state
+            )
+        return RBFSampler(
+            gamma=self.gamma, n_components=self.n_components, random_state=self.random_state
+        )
+
+    def _transform(self, X):
+        Z = self.scaler.transform(X)
+        return self.features.transform(Z) if self.features is not None else Z
+
+    def fit(self, X, y, previous=None):
+        if previous is None:
+            self.scaler = StandardScaler().fit(X)
+            self.features = (
+                self._make_features().fit(self.scaler.transform(X)) if self.kernel else None
+            )
+        else:
+            self.scaler, self.features = previous.scaler, previous.features
+
+        self.clf = SGDClassifier(loss="hinge", alpha=self.alpha, random_state=self.random_state)
+        if previous is None:
+            self.clf.fit(self._transform(X), y)
+        else:
+            self.clf.fit(
+                self._transform(X),
+                y,
+                coef_init=previous.clf.coef_,
+                intercept_init=previous.clf.intercept_,
+            )
+        return self
+
+    def predict(self, X):
+        return self.clf.predict(self._transform(X))
+
+
+class SVCFoldModel:
+    """SVC exacto (sin warm start: cada fold se entrena desde cero, en paralelo)."""
+
+    supports_warm_start = False
+    context_rows = 0
+
+    def __init__(self, C=1.0, gamma="scale", kernel="rbf"):
+        self.C = C
+        self.gamma = gamma
+        self.kernel = kernel
+
+    def fit(self, X, y, previous=None):
+        self.scaler = StandardScaler().fit(X)
+        self.clf = SVC(C=self.C, gamma=self.gamma, kernel=self.kernel)
+        self.clf.fit(self.scaler.transform(X), y)
+        return self
+
+    def predict(self, X):
+        return self.clf.predict(self.scaler.transform(X))
+
+
+def _label(index, position):
+    return index[position] if index is not None else position
+
+
+def _run_fold(prototype, X, y, index, fold, train, test, previous):
+    """Entrena y evalúa un fold. Retorna (fila de métricas, modelo ajustado)."""
+    model = copy.deepcopy(prototype)
+    t0 = time.perf_counter()
+    model.fit(X[train], y[train], previous=previous)
+    fit_s = time.perf_counter() - t0
+
+    context_start = test.start - model.context_rows
+    y_pred = model.predict(X[context_start : test.stop])
+    y_true = y[test]
+
+    row = {
+        "fold": fold,
+        "train_start": _label(index, train.start),
+        "train_end": _label(index, train.stop - 1),
+        "test_start": _label(index, test.start),
+        "test_end": _label(index, test.stop - 1),
+        "n_train": train.stop - train.start,
+        "n_test": test.stop - test.start,
+        "warm_start": previous is not None,
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred, zero_division=0),
+        "fit_s": fit_s,
+    }
+    return row, model
+
+
+class WalkForwardEngine:
+    """
+    Evalúa un adaptador de modelo fold a fold y retorna la tabla de métricas por fold.
+    El modelo del último fold queda en `last_model_` (listo para servir).
+    """
+
+    def __init__(
+        self,
+        model,
+        n_folds=5,
+        mode="expanding",
+        train_size=None,
+        test_size=None,
+        warm_start=True,
+        n_jobs=None,
+        backend="loky",
+    ):
+        if mode not in WINDOW_MODES:
+            raise ValueError(f"mode debe ser uno de {WINDOW_MODES}, no '{mode}'")
+        self.model = model
+        self.n_folds = n_folds
+        self.mode = mode
+        self.train_size = train_size
+        self.test_size = test_size
+        self.warm_start = warm_start
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.last_model_ = None
+
+    def run(self, X, y, index=None) -> pd.DataFrame:
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y)
+        splits = walk_forward_splits(
+            len(X), self.n_folds, self.mode, self.train_size, self.test_size
+        )
+        if splits[0][1].start < self.model.context_rows:
+            raise ValueError("El primer fold no tiene historia suficiente para el modelo")
+
+        if self.warm_start and self.model.supports_warm_start:
+            # Folds encadenados: cada uno parte del modelo anterior
+            rows, previous = [], None
+            for fold, (train, test) in enumerate(splits):
+                row, previous = _run_fold(self.model, X, y, index, fold, train, test, previous)
+                rows.append(row)
+            self.last_model_ = previous
+        else:
+            # Folds independientes: en paralelo
+            results = Parallel(n_jobs=self.n_jobs, backend=self.backend)(
+                delayed(_run_fold)(self.model, X, y, index, fold, train, test, None)
+                for fold, (train, test) in enumerate(splits)
+            )
+            rows = [row for row, _ in results]
+            self.last_model_ = results[-1][1]
+
+        folds = pd.DataFrame(rows).set_index("fold")
+        folds.insert(0, "mode", self.mode)
+        return folds
@@ -0,0 +1,137 @@
+import contextlib
+import io
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.analytics import (
+    TRADING_DAYS,
+    backtrader_metrics,
+    compact_table,
+    portfolio_metrics,
+    rolling_metrics,
+    summarize,
+    trade_returns,
+    vectorized_metrics,
+)
+from src.backtesting.portfolio import run_portfolio
+from src.backtesting.strategy import EquityRecorder, MLStrategy
+from src.backtesting.vectorized import (
+    COMMISSION,
+    START_CASH,
+    momentum_signals,
+    positions_from_signals,
+    run_vectorized,
+)
+
+
+def _prices(n=250, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    return open_, close
+
+
+def test_summarize_equity_metrics():
+    value = np.array([100.0, 110.0, 99.0, 120.0])
+    metrics = summarize(value)
+    assert metrics["total_return"] == pytest.approx(0.2)
+    assert metrics["max_drawdown"] == pytest.approx(0.1)
+    assert metrics["sharpe"] > 0 and metrics["sortino"] > metrics["sharpe"]
+
+    returns = np.array([0.1, -0.1, 120 / 99 - 1])
+    expected = returns.mean() / returns.std(ddof=1) * np.sqrt(TRADING_DAYS)
+    assert metrics["sharpe"] == pytest.approx(expected)
+    # Sin datos de trades ni exposición
+    assert metrics["n_round_trips"] == 0 and np.isnan(metrics["hit_rate"])
+
+
+def test_summarize_columns_are_independent_runs():
+    flat = np.full(5, 100.0)
+    rising = np.array([100.0, 101.0, 103.0, 104.0, 107.0])
+    metrics = summarize(np.column_stack([flat, rising]))
+    np.testing.assert_allclose(metrics["total_return"], [0.0, 0.07])
+    assert metrics["sharpe"][0] == 0.0 and metrics["sharpe"][1] > 0  # sin volatilidad: 0
+    np.testing.assert_allclose(metrics["max_drawdown"], [0.0, 0.0])
+
+
+def test_trade_returns_closed_round_trips_only():
+    open_ = np.array([10.0, 11.0, 12.0, 10.0, 9.0, 10.0, 11.0])
+    position = np.array([[0, 0], [1, 1], [1, 0], [0, 0], [1, 1], [1, 1], [0, 1]])
+    rets, cols = trade_returns(open_, position, commission=0.0)
+    # Columna 0: 11->10 y 9->11; columna 1: 11->12 y un trade abierto al final
+    assert cols.tolist() == [0, 0, 1]
+    np.testing.assert_allclose(rets, [10 / 11 - 1, 11 / 9 - 1, 12 / 11 - 1])
+
+
+def test_vectorized_metrics_match_backtrader():
+    open_, close = _prices()
+    df = pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + 0.5,
+            "low": np.minimum(open_, close) - 0.5,
+            "close": close,
+            "volume": 1000,
+        },
+        index=pd.bdate_range("2020-01-01", periods=len(close)),
+    )
+    cerebro = bt.Cerebro()
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.addstrategy(MLStrategy)
+    cerebro.addanalyzer(EquityRecorder, _name="equity")
+    cerebro.broker.setcash(START_CASH)
+    cerebro.broker.setcommission(commission=COMMISSION)
+    with contextlib.redirect_stdout(io.StringIO()):
+        strategy = cerebro.run()[0]
+    expected = backtrader_metrics(strategy)
+
+    entries, exits = momentum_signals(close)
+    result = run_vectorized(open_, close, positions_from_signals(entries, exits))
+    metrics = vectorized_metrics(result, open_, close)
+
+    assert expected["n_round_trips"] > 10
+    for key, value in expected.items():
+        assert metrics[key][0] == pytest.approx(value), key
+
+
+def test_portfolio_metrics():
+    rng = np.random.default_rng(2)
+    open_ = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (100, 3)), axis=0))
+    close = open_ * (1 + rng.normal(0, 0.003, open_.shape))
+    weights = np.full(open_.shape, 1 / 3)
+    weights[50:, 2] = 0.0  # el tercer activo sale del portafolio a mitad del período
+
+    metrics = portfolio_metrics(run_portfolio(open_, close, weights), open_)
+    assert metrics["n_round_trips"] == 1
+    assert metrics["exposure"] == pytest.approx((50 + 49 * 2 / 3) / 100)
+    assert metrics["turnover"] > 0
+
+
+def test_rolling_metrics_matches_pandas():
+    _, close = _prices(n=120)
+    value = pd.Series(START_CASH + close, index=pd.bdate_range("2020-01-01", periods=120))
+    rolling = rolling_metrics(value, window=20)
+
+    returns = value.pct_change().fillna(0.0)
+    expected_vol = returns.rolling(20).std() * np.sqrt(TRADING_DAYS)
+    np.testing.assert_allclose(rolling["rolling_volatility"], expected_vol, rtol=1e-8)
+    np.testing.assert_allclose(rolling["rolling_return"], value.pct_change(20), rtol=1e-10)
+    assert rolling.index.equals(value.index)
+    assert (rolling["drawdown"] >= 0).all()
+
+
+def test_compact_table_keeps_keys_exact():
+    table = pd.DataFrame(
+        {
+            "threshold": [0.1, 0.2, 0.1, 0.2],
+            "sharpe": [1.0, 2.0, 3.0, 4.0],
+            "status": ["ok", "ok", "ok", "error"],
+        }
+    )
+    compact = compact_table(table, keep=("threshold",))
+    assert compact["threshold"].dtype == np.float64
+    assert compact["sharpe"].dtype == np.float32
+    assert isinstance(compact["status"].dtype, pd.CategoricalDtype)
@@ -248,6 +248,14 @@ def test_run_backtest_function(mock_exists, mock_read_parquet, mock_cerebro):
     mock_instance = MagicMock()
     mock_cerebro.return_value = mock_instance
     mock_instance.broker.getvalue.return_value = 10000.0
+    strategy = MagicMock()
+    strategy.analyzers.equity.get_analysis.return_value = {
+        "value": [10000.0],
+        "exposure": [0.0],
+        "turnover": [0.0],
+        "trade_returns": [],
+    }
+    mock_instance.run.return_value = [strategy]
     
     run_backtest()
     
@@ -255,3 +263,96 @@ def test_run_backtest_function(mock_exists, mock_read_parquet, mock_cerebro):
     assert mock_instance.addstrategy.called
     assert mock_instance.adddata.called
 
+
+
+# --- Feed con features del Dataset Maestro y probabilidades precalculadas ---
+
+
+def _master_dataset(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + 0.5,
+            "Low": np.minimum(open_, close) - 0.5,
+            "Close": close,
+            "Volume": rng.integers(1_000, 5_000, n),
+            "rsi_14": rng.uniform(30, 70, n),
+            "macd_line": rng.normal(0, 1, n),
+            "daily_sentiment": rng.uniform(-1, 1, n),
+            "Ticker": "TEST",
+        },
+        index=pd.bdate_range("2023-01-02", periods=n, name="Date"),
+    )
+
+
+def _identity_scaler():
+    scaler = MagicMock()
+    scaler.transform.side_effect = lambda X: X
+    return scaler
+
+
+def test_precompute_probabilities_single_batched_predict():
+    from src.backtesting.strategy import precompute_probabilities
+
+    df = _master_dataset()
+    model = MagicMock()
+    model.predict.side_effect = lambda X, verbose=0: (X[:, -1, 5:6] > 50).astype(float)
+
+    probs = precompute_probabilities(model, _identity_scaler(), df, "LSTM", seq_len=10)
+
+    model.predict.assert_called_once()
+    windows = model.predict.call_args[0][0]
+    assert windows.shape == (111, 10, 8) and windows.dtype == np.float32
+    assert np.isnan(probs[:9]).all()
+    # La ventana que termina en la barra t puntúa la barra t
+    np.testing.assert_array_equal(probs[9:], (df["rsi_14"].to_numpy()[9:] > 50).astype(float))
+
+
+def test_feed_carries_features_and_prob_lines():
+    from src.backtesting.strategy import make_feed_class
+    from src.features.dataset import feature_columns
+
+    df = _master_dataset(n=30).assign(prob=0.9)
+    seen = []
+
+    class Recorder(MLStrategy):
+        def next(self):
+            seen.append((self.get_features(), self.prob[0]))
+
+    cerebro = bt.Cerebro()
+    cerebro.adddata(make_feed_class(feature_columns(df.columns))(dataname=df))
+    cerebro.addstrategy(Recorder)
+    cerebro.run()
+
+    features, prob = seen[-1]
+    np.testing.assert_allclose(features, df[["rsi_14", "macd_line", "daily_sentiment"]].iloc[-1])
+    assert prob == pytest.approx(0.9)
+
+
+def test_run_backtest_with_model_matches_vectorized(tmp_path, monkeypatch):
+    """El backtest con prob precalculada coincide con el motor vectorizado."""
+    from src.backtesting import strategy
+    from src.backtesting.vectorized import positions_from_signals, run_vectorized
+
+    df = _master_dataset(n=200)
+    gold = tmp_path / "master_dataset_TEST.parquet"
+    df.to_parquet(gold)
+    monkeypatch.setattr(strategy, "GOLD_PATH", str(tmp_path / "master_dataset_{ticker}.parquet"))
+
+    model = MagicMock()
+    model.predict.side_effect = lambda X, verbose=0: (X[:, -1, 6:7] > 0).astype(float) * 0.4 + 0.3
+
+    old_stdout, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        final_value = strategy.run_backtest("TEST", "LSTM", model=model, scaler=_identity_scaler())
+    finally:
+        sys.stdout = old_stdout
+
+    assert model.predict.call_count == 1
+    prob = strategy.precompute_probabilities(model, _identity_scaler(), df, "LSTM")
+    positions = positions_from_signals(prob > 0.5, prob <= 0.5)
+    expected = run_vectorized(df["Open"], df["Close"], positions)["final_value"][0]
+    assert final_value == pytest.approx(expected)
@@ -0,0 +1,221 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+
+from src.execution import bot as bot_module
+from src.execution.bot import RESULT_COLUMNS, TokenBucket, TradingBot, is_transient
+from src.execution.fake_broker import FakeBroker, api_error
+from src.execution.journal import OrderJournal
+from src.models.prediction_service import PredictionService
+
+PRICES = {"AAA": 100.0, "BBB": 50.0, "CCC": 20.0, "DDD": 10.0}
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(bot_module, "RETRY_BACKOFF", 0.001)
+
+
+def _signals(*rows):
+    return pd.DataFrame(rows, columns=["ticker", "signal", "confidence"])
+
+
+class FlakyBroker(FakeBroker):
+    """Fails the first `failures[symbol]` submissions of a symbol with `status`."""
+
+    def __init__(self, failures, status=503, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = dict(failures)
+        self.status = status
+        self.calls = []
+
+    def submit_order(self, order_data):
+        self.calls.append(order_data.client_order_id)
+        if self.failures.get(order_data.symbol, 0) > 0:
+            self.failures[order_data.symbol] -= 1
+            raise api_error(self.status, "service unavailable")
+        return super().submit_order(order_data)
+
+
+class SlowBroker(FakeBroker):
+    """Each call blocks for `delay` seconds; tracks the peak number of calls in flight."""
+
+    def __init__(self, delay, slow_symbols=None, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.slow_symbols = slow_symbols
+        self.in_flight = 0
+        self.peak = 0
+        self._count_lock = threading.Lock()
+
+    def submit_order(self, order_data):
+        with self._count_lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.slow_symbols is None or order_data.symbol in self.slow_symbols:
+                time.sleep(self.delay)
+            return super().submit_order(order_data)
+        finally:
+            with self._count_lock:
+                self.in_flight -= 1
+
+
+def test_execute_trade_returns_result():
+    broker = FakeBroker(prices=PRICES)
+    bot = TradingBot(client=broker)
+
+    bought = bot.execute_trade("AAA", "BUY", 0.9)
+    assert bought["status"] == "submitted" and bought["order_id"] == broker.orders[0].id
+    assert broker.positions["AAA"].qty == pytest.approx(100.0)
+
+    assert bot.execute_trade("AAA", "BUY", 0.5)["status"] == "skipped"
+    assert bot.execute_trade("AAA", "HOLD", 0.99)["status"] == "skipped"
+    assert bot.execute_trade("BBB", "SELL", 0.9)["status"] == "no_position"
+    assert bot.execute_trade("AAA", "SELL", 0.9)["status"] == "submitted"
+    assert not broker.positions
+
+
+def test_execute_batch_report():
+    broker = FakeBroker(prices=PRICES)
+    TradingBot(client=broker).execute_trade("BBB", "BUY", 0.9)
+
+    report = TradingBot(client=broker).execute_batch(
+        _signals(
+            ("AAA", "BUY", 0.9),
+            ("BBB", "SELL", 0.8),
+            ("CCC", "SELL", 0.95),
+            ("DDD", "HOLD", 0.99),
+            ("EEE", "BUY", 0.9),  # no price: the broker rejects it (422, not retried)
+        )
+    )
+    assert list(report.columns) == RESULT_COLUMNS
+    assert report["status"].tolist() == ["submitted", "submitted", "no_position", "skipped", "failed"]
+    assert report.loc[4, "attempts"] == 1 and "no price" in report.loc[4, "error"]
+    assert set(broker.positions) == {"AAA"}
+
+
+def test_execute_batch_submits_concurrently():
+    broker = SlowBroker(delay=0.1, prices=PRICES)
+    signals = _signals(*[(t, "BUY", 0.9) for t in PRICES])
+
+    start = time.perf_counter()
+    report = TradingBot(client=broker).execute_batch(signals, max_workers=4)
+    elapsed = time.perf_counter() - start
+
+    assert (report["status"] == "submitted").all()
+    assert broker.peak == 4
+    assert elapsed < 0.3  # sequential would take 0.4 s
+
+
+def test_execute_batch_retries_transient_errors():
+    broker = FlakyBroker({"AAA": 2, "BBB": 5}, prices=PRICES)
+    report = TradingBot(client=broker).execute_batch(
+        _signals(("AAA", "BUY", 0.9), ("BBB", "BUY", 0.9)), retries=3
+    )
+    aaa, bbb = report.set_index("ticker").loc[["AAA", "BBB"]].to_dict("records")
+    assert aaa["status"] == "submitted" and aaa["attempts"] == 3
+    assert bbb["status"] == "failed" and bbb["attempts"] == 4
+    # Every retry of an order reuses its client_order_id
+    assert len(set(broker.calls)) == 2
+
+
+def test_execute_batch_does_not_retry_client_errors():
+    broker = FlakyBroker({"AAA": 1}, status=403, prices=PRICES)
+    report = TradingBot(client=broker).execute_batch(_signals(("AAA", "BUY", 0.9)), retries=3)
+    assert report.loc[0, "status"] == "failed" and report.loc[0, "attempts"] == 1
+
+
+def test_execute_batch_times_out_slow_orders():
+    broker = SlowBroker(delay=1.0, slow_symbols={"AAA"}, prices=PRICES)
+    start = time.perf_counter()
+    report = TradingBot(client=broker).execute_batch(
+        _signals(("AAA", "BUY", 0.9), ("BBB", "BUY", 0.9)), timeout=0.05, retries=1
+    )
+    assert time.perf_counter() - start < 0.5
+    status = report.set_index("ticker")["status"]
+    assert status["AAA"] == "timeout" and status["BBB"] == "submitted"
+    assert report.set_index("ticker").loc["AAA", "attempts"] == 2
+
+
+HUNG_BATCH = """
+import pandas as pd
+from src.execution.bot import TradingBot
+from src.execution.fake_broker import FakeBroker
+
+broker = FakeBroker(prices={"AAA": 100.0})
+bot = TradingBot(client=broker)
+broker.latency = 600  # every later call hangs
+signals = pd.DataFrame([("AAA", "BUY", 0.9)], columns=["ticker", "signal", "confidence"])
+print(bot.execute_batch(signals, timeout=0.1, retries=0).loc[0, "status"])
+"""
+
+
+def test_abandoned_calls_do_not_block_exit():
+    root = Path(__file__).resolve().parents[1]
+    env = {**os.environ, "PYTHONPATH": str(root)}
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", HUNG_BATCH], capture_output=True, text=True, cwd=root, env=env, timeout=60
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "timeout"
+    # The process exits right after the batch instead of joining the hung call
+    assert time.perf_counter() - start < 30
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.perf_counter()
+    for _ in range(10):
+        bucket.acquire()
+    # 5 from the burst + 5 at 50/s = ~0.1 s
+    assert 0.08 < time.perf_counter() - start < 0.3
+
+
+def test_is_transient():
+    assert is_transient(api_error(429, "slow down"))
+    assert is_transient(api_error(502, "bad gateway"))
+    assert not is_transient(api_error(403, "forbidden"))
+    assert is_transient(TimeoutError())
+    assert not is_transient(ValueError("bad"))
+
+
+def test_main_reads_the_bucket_set_by_the_manifest(monkeypatch, tmp_path):
+    manifests = yaml.safe_load_all((Path(__file__).parents[1] / "k8s-bot.yaml").read_text())
+    cronjob = next(doc for doc in manifests if doc["kind"] == "CronJob")
+    container = cronjob["spec"]["jobTemplate"]["spec"]["template"]["spec"]["containers"][0]
+    for var in container["env"]:
+        if "value" in var:
+            monkeypatch.setenv(var["name"], var["value"])
+    monkeypatch.delenv("GCS_BUCKET_NAME", raising=False)
+    monkeypatch.setenv("BROKER", "fake")
+
+    buckets = []
+
+    class Client:
+        def bucket(self, name):
+            buckets.append(name)
+            return f"gs://{name}"
+
+    services = []
+
+    def predict_all(self):
+        services.append(self)
+        return _signals(("AAA", "HOLD", 0.5))
+
+    monkeypatch.setattr(bot_module.storage, "Client", Client)
+    monkeypatch.setattr(PredictionService, "predict_all", predict_all)
+    monkeypatch.setattr(bot_module, "OrderJournal", lambda: OrderJournal(tmp_path / "orders.db"))
+
+    bot_module.main()
+    (service,) = services
+    assert set(buckets) == {"market-oracle-tesis-data-lake"}
+    assert service.bucket == service.registry.bucket == "gs://market-oracle-tesis-data-lake"
@@ -0,0 +1,138 @@
+import time
+
+import pandas as pd
+import pytest
+import requests
+from alpaca.common.exceptions import APIError
+from alpaca.trading.client import TradingClient
+from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.trading.requests import MarketOrderRequest
+
+from src.execution import bot as bot_module
+from src.execution.bot import TradingBot
+from src.execution.broker import Broker, make_broker
+from src.execution.fake_broker import FakeBroker
+
+PRICES = {"AAA": 100.0, "BBB": 50.0}
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(bot_module, "RETRY_BACKOFF", 0.001)
+
+
+def _buy(symbol, client_order_id=None, notional=1000):
+    return MarketOrderRequest(
+        symbol=symbol,
+        notional=notional,
+        side=OrderSide.BUY,
+        time_in_force=TimeInForce.DAY,
+        client_order_id=client_order_id,
+    )
+
+
+def test_make_broker(monkeypatch):
+    broker = make_broker("fake", cash=5_000.0, prices=PRICES)
+    assert isinstance(broker, FakeBroker) and broker.cash == 5_000.0
+    assert isinstance(broker, Broker)
+
+    monkeypatch.setenv("BROKER", "fake")
+    assert isinstance(make_broker(), FakeBroker)
+    assert isinstance(TradingBot().client, FakeBroker)
+
+    with pytest.raises(ValueError, match="Unknown broker"):
+        make_broker("ib")
+
+
+def test_make_broker_alpaca(monkeypatch):
+    monkeypatch.delenv("BROKER", raising=False)
+    monkeypatch.delenv("ALPACA_API_KEY", raising=False)
+    monkeypatch.delenv("ALPACA_SECRET_KEY", raising=False)
+    with pytest.raises(ValueError, match="ALPACA_API_KEY"):
+        make_broker()
+
+    client = make_broker("alpaca", api_key="key", secret_key="secret")
+    assert isinstance(client, TradingClient) and isinstance(client, Broker)
+
+
+def test_fake_broker_injects_latency():
+    broker = FakeBroker(prices=PRICES, latency=0.02, jitter=0.01, seed=0)
+    start = time.perf_counter()
+    for _ in range(5):
+        broker.get_clock()
+    assert 0.1 <= time.perf_counter() - start < 0.5
+    assert broker.requests["get_clock"] == 5
+
+
+def test_fake_broker_injects_errors_deterministically():
+    def outcomes(seed):
+        broker = FakeBroker(cash=1e9, prices=PRICES, error_rate=0.3, error_status=502, seed=seed)
+        result = []
+        for _ in range(50):
+            try:
+                broker.submit_order(_buy("AAA"))
+                result.append("ok")
+            except APIError as e:
+                result.append(e.status_code)
+        return result, broker
+
+    first, broker = outcomes(seed=7)
+    assert outcomes(seed=7)[0] == first
+    assert set(first) == {"ok", 502}
+    # Rejected calls never reach the broker state
+    assert len(broker.orders) == first.count("ok")
+    assert broker.requests["submit_order"] == 50
+
+
+def test_fake_broker_rejects_duplicate_client_order_id():
+    broker = FakeBroker(prices=PRICES)
+    broker.submit_order(_buy("AAA", client_order_id="order-1"))
+    with pytest.raises(APIError) as error:
+        broker.submit_order(_buy("BBB", client_order_id="order-1"))
+    assert error.value.status_code == 422
+    assert set(broker.positions) == {"AAA"}
+
+
+def test_fake_broker_dropped_response_still_fills():
+    broker = FakeBroker(prices=PRICES, drop_rate=1.0)
+    with pytest.raises(requests.ConnectionError):
+        broker.submit_order(_buy("AAA", client_order_id="order-1"))
+    assert broker.positions["AAA"].qty == pytest.approx(10.0)
+
+
+def test_bot_retry_after_lost_response_does_not_double_buy():
+    broker = FakeBroker(prices=PRICES, drop_rate=1.0)
+    signals = pd.DataFrame([("AAA", "BUY", 0.9)], columns=["ticker", "signal", "confidence"])
+    report = TradingBot(client=broker).execute_batch(signals, retries=2)
+
+    assert report.loc[0, "status"] == "submitted" and report.loc[0, "attempts"] == 2
+    assert len(broker.orders) == 1
+    assert broker.positions["AAA"].qty == pytest.approx(100.0)
+
+
+def test_bot_retry_after_lost_close_reports_the_sell():
+    broker = FakeBroker(prices=PRICES)
+    bot = TradingBot(client=broker)
+    bot.execute_trade("AAA", "BUY", 0.9)
+    broker.drop_rate = 1.0  # the close fills but its response is lost
+
+    signals = pd.DataFrame([("AAA", "SELL", 0.9)], columns=["ticker", "signal", "confidence"])
+    report = bot.execute_batch(signals, retries=2)
+    assert report.loc[0, "status"] == "submitted" and report.loc[0, "attempts"] == 2
+    broker.drop_rate = 0.0
+    assert not bot.state.has_position("AAA") and not broker.positions
+    assert bot.state.refresh_if_stale() is True  # proceeds re-read from the broker
+    assert bot.state.buying_power == pytest.approx(broker.cash)
+
+
+def test_bot_batch_under_injected_errors():
+    prices = {f"T{i:02d}": 10.0 for i in range(40)}
+    broker = FakeBroker(cash=1e9, prices=prices, latency=0.001, error_rate=0.2, seed=3)
+    signals = pd.DataFrame(
+        [(ticker, "BUY", 0.9) for ticker in prices], columns=["ticker", "signal", "confidence"]
+    )
+    report = TradingBot(client=broker).execute_batch(signals, max_workers=8, retries=5)
+
+    assert (report["status"] == "submitted").all()
+    assert report["attempts"].max() > 1
+    assert len(broker.orders) == len(prices)
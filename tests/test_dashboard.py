@@ -1,4 +1,9 @@
 
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from unittest.mock import MagicMock, patch
 import pandas as pd
@@ -55,7 +60,7 @@ def test_make_prediction_short():
     assert app.make_prediction(None, None, df) == 0.5
 
 @patch("src.dashboard.app.Path")
-@patch("src.dashboard.app.tf.keras.models.load_model")
+@patch("tensorflow.keras.models.load_model")
 @patch("src.dashboard.app.joblib.load")
 def test_load_model(mock_joblib, mock_keras, mock_path):
     # Setup Path resolution
@@ -65,12 +70,31 @@ def test_load_model(mock_joblib, mock_keras, mock_path):
     assert m is not None
     assert s is not None
 
+def test_import_does_not_load_tensorflow():
+    # TensorFlow completo solo se carga en el fallback Keras de load_model
+    code = "import sys, src.dashboard.app; print('tensorflow' in sys.modules)"
+    root = Path(__file__).resolve().parents[1]
+    env = {**os.environ, "PYTHONPATH": str(root)}
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root, env=env
+    )
+    assert out.stdout.strip().splitlines()[-1] == "False"
+
 # Test the UI flow (main)
+@patch("src.dashboard.app.storage.Client")
+def test_get_registry_reads_the_bucket(mock_client_cls):
+    app.get_registry.clear()
+    registry = app.get_registry()
+    mock_client_cls.return_value.bucket.assert_called_once_with(app.BUCKET_NAME)
+    assert registry.bucket is mock_client_cls.return_value.bucket.return_value
+    app.get_registry.clear()
+
 @patch("src.dashboard.app.load_data")
 @patch("src.dashboard.app.load_model")
 @patch("src.dashboard.app.make_prediction")
+@patch("src.dashboard.app.model_version", return_value=None)  # sin versiones registradas
 @patch("src.dashboard.app.st") # Mock streamlit to prevent rendering
-def test_main_flow(mock_st, mock_pred, mock_load_model, mock_load_data):
+def test_main_flow(mock_st, mock_version, mock_pred, mock_load_model, mock_load_data):
     # Setup mocks
     mock_st.sidebar.selectbox.return_value = "AAPL"
     
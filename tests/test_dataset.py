@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.dataset import feature_columns, feature_matrix, prepare_dataset
+
+
+@pytest.fixture
+def master_df():
+    dates = pd.date_range("2024-01-01", periods=8)
+    return pd.DataFrame(
+        {
+            "Open": np.arange(8.0),
+            "High": np.arange(8.0),
+            "Low": np.arange(8.0),
+            "Close": [10.0, 11.0, 10.5, 12.0, 12.0, 13.0, 12.5, 14.0],
+            "Volume": np.arange(8),
+            "rsi_14": [np.nan, np.nan, 50.0, 55.0, 60.0, 45.0, 40.0, 65.0],
+            "macd_line": np.linspace(-1, 1, 8),
+            "Ticker": "TEST",
+            "date_only": dates.date,
+        },
+        index=dates,
+    )
+
+
+def test_feature_sets(master_df):
+    assert feature_columns(master_df.columns, "svm") == ["rsi_14", "macd_line"]
+    assert feature_columns(master_df.columns, "lstm")[:5] == ["Open", "High", "Low", "Close", "Volume"]
+    assert "Ticker" not in feature_columns(master_df.columns, "lstm")
+    with pytest.raises(ValueError):
+        feature_columns(master_df.columns, "xgboost")
+
+
+def test_prepare_dataset_target_and_layout(master_df):
+    ds = prepare_dataset(master_df, feature_set="svm")
+
+    # Filas 0-1 sin RSI y la última sin precio de mañana
+    assert list(ds.index) == list(master_df.index[2:7])
+    np.testing.assert_array_equal(ds.y, [1.0, 0.0, 1.0, 0.0, 1.0])
+    assert ds.X.dtype == np.float32 and ds.y.dtype == np.float32
+    assert ds.X.flags["C_CONTIGUOUS"]
+    assert ds.feature_names == ("rsi_14", "macd_line")
+    np.testing.assert_allclose(ds.X[:, 0], [50.0, 55.0, 60.0, 45.0, 40.0])
+
+
+def test_prepare_dataset_avoids_copies(master_df):
+    ds = prepare_dataset(master_df, feature_set="svm")
+    # El recorte de filas es un slice del buffer y el DataFrame es una vista
+    assert ds.X.base is not None
+    assert np.shares_memory(ds.frame().to_numpy(), ds.X)
+
+
+def test_prepare_dataset_fixed_feature_order(master_df):
+    ds = prepare_dataset(master_df, feature_names=["macd_line", "rsi_14"])
+    assert ds.feature_names == ("macd_line", "rsi_14")
+    np.testing.assert_allclose(ds.X[:, 1], [50.0, 55.0, 60.0, 45.0, 40.0])
+
+
+def test_feature_matrix_tail_keeps_last_row(master_df):
+    X = feature_matrix(master_df, ["Close", "rsi_14"], tail=3)
+    assert X.shape == (3, 2) and X.dtype == np.float32 and X.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(X[-1], [14.0, 65.0])
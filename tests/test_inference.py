@@ -0,0 +1,54 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+
+from src.models.inference import TFLitePredictor
+from src.models.train_lstm import build_lstm_model, export_tflite
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    """Modelo LSTM (pesos aleatorios) y su export TFLite."""
+    model = build_lstm_model((10, 4))
+    path = tmp_path_factory.mktemp("models") / "lstm_TEST.tflite"
+    export_tflite(model, path, seq_length=10, n_features=4)
+    return model, path
+
+
+def test_tflite_predictor_matches_keras(exported):
+    model, path = exported
+    predictor = TFLitePredictor(path)
+    X = np.random.default_rng(0).random((5, 10, 4), dtype=np.float32)
+
+    expected = model.predict(X, verbose=0)
+    got = predictor.predict(X, verbose=0)
+
+    assert got.shape == expected.shape == (5, 1)
+    np.testing.assert_allclose(got, expected, atol=1e-5)
+
+
+def test_tflite_predictor_rejects_wrong_shape(exported):
+    _, path = exported
+    with pytest.raises(ValueError):
+        TFLitePredictor(path).predict(np.zeros((1, 10, 3)))
+
+
+def test_dashboard_prefers_tflite(exported, tmp_path, monkeypatch):
+    from src.dashboard import app
+
+    _, path = exported
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "models").mkdir()
+    (tmp_path / "models" / "lstm_TFL.tflite").write_bytes(path.read_bytes())
+    joblib.dump(MinMaxScaler().fit(np.random.rand(20, 4)), tmp_path / "models" / "scaler_lstm_TFL.pkl")
+
+    model, scaler = app.load_model("TFL")
+
+    assert isinstance(model, TFLitePredictor)
+    prob = app.make_prediction(model, scaler, __import__("pandas").DataFrame(np.random.rand(15, 4)))
+    assert 0.0 <= prob <= 1.0
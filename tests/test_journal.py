@@ -0,0 +1,118 @@
+import sqlite3
+from datetime import date
+
+import pandas as pd
+import pytest
+from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.trading.requests import MarketOrderRequest
+
+from src.execution import bot as bot_module
+from src.execution.bot import TradingBot
+from src.execution.fake_broker import FakeBroker
+from src.execution.journal import OrderJournal, client_order_id_for
+
+PRICES = {"AAA": 100.0, "BBB": 50.0}
+DAY = date(2024, 3, 5)
+BUY_AAA = "mso-20240305-AAA-BUY"
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(bot_module, "RETRY_BACKOFF", 0.001)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = OrderJournal(tmp_path / "orders.db")
+    yield journal
+    journal.close()
+
+
+def _signals(*rows):
+    return pd.DataFrame(rows, columns=["ticker", "signal", "confidence"])
+
+
+def test_client_order_id_is_deterministic():
+    assert client_order_id_for(DAY, "AAA", "BUY") == BUY_AAA
+    assert client_order_id_for(pd.Timestamp("2024-03-05 15:30", tz="UTC"), "AAA", "BUY") == BUY_AAA
+
+
+def test_journal_is_append_only_wal(journal, tmp_path):
+    journal.record(BUY_AAA, "AAA", "BUY", "pending")
+    journal.record(BUY_AAA, "AAA", "BUY", "submitted", order_id="o-1")
+    journal.record("mso-20240305-BBB-BUY", "BBB", "BUY", "pending")
+
+    assert journal.history()["status"].tolist() == ["pending", "submitted", "pending"]
+    assert journal.latest()["status"].tolist() == ["submitted", "pending"]
+    assert journal.last_status(BUY_AAA) == "submitted"
+    assert journal.unresolved()["ticker"].tolist() == ["BBB"]
+
+    # A second connection (a restarted process) sees every committed append
+    conn = sqlite3.connect(tmp_path / "orders.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM order_events").fetchone()[0] == 3
+    conn.close()
+
+
+def test_restarted_bot_does_not_resend(journal):
+    broker = FakeBroker(prices=PRICES)
+    first = TradingBot(client=broker, journal=journal)
+    assert first.execute_trade("AAA", "BUY", 0.9, day=DAY)["status"] == "submitted"
+    assert broker.orders[0].client_order_id == BUY_AAA
+
+    restarted = TradingBot(client=broker, journal=journal)
+    result = restarted.execute_trade("AAA", "BUY", 0.9, day=DAY)
+    assert result["status"] == "duplicate"
+    assert broker.requests["submit_order"] == 1
+    # A new trading day is a new order
+    assert restarted.execute_trade("AAA", "BUY", 0.9, day=date(2024, 3, 6))["status"] == "submitted"
+
+
+def test_startup_reconciles_orders_left_in_flight(journal):
+    broker = FakeBroker(prices=PRICES)
+    broker.submit_order(
+        MarketOrderRequest(
+            symbol="AAA",
+            notional=10_000,
+            side=OrderSide.BUY,
+            time_in_force=TimeInForce.DAY,
+            client_order_id=BUY_AAA,
+        )
+    )
+    # The previous run crashed after sending AAA, before sending BBB and while closing CCC
+    journal.record(BUY_AAA, "AAA", "BUY", "pending")
+    journal.record("mso-20240305-BBB-BUY", "BBB", "BUY", "pending")
+    journal.record("mso-20240305-CCC-SELL", "CCC", "SELL", "timeout")
+
+    bot = TradingBot(client=broker, journal=journal)
+    latest = journal.latest().set_index("ticker")
+    assert latest.loc["AAA", "status"] == "submitted"
+    assert latest.loc["AAA", "order_id"] == broker.orders[0].id
+    assert latest.loc["BBB", "status"] == "failed"
+    assert latest.loc["CCC", "status"] == "submitted"  # no CCC position left
+    assert broker.requests["get_order_by_client_id"] == 2
+
+    report = bot.execute_batch(_signals(("AAA", "BUY", 0.9), ("BBB", "BUY", 0.9)), day=DAY)
+    assert report["status"].tolist() == ["duplicate", "submitted"]
+    assert set(broker.positions) == {"AAA", "BBB"} and len(broker.orders) == 2
+
+
+def test_broker_rejects_resend_after_lost_journal(tmp_path):
+    broker = FakeBroker(prices=PRICES)
+    TradingBot(client=broker, journal=OrderJournal(tmp_path / "a.db")).execute_trade("AAA", "BUY", 0.9, day=DAY)
+
+    # New pod, empty journal: the deterministic id still stops a second fill
+    bot = TradingBot(client=broker, journal=OrderJournal(tmp_path / "b.db"))
+    assert bot.execute_trade("AAA", "BUY", 0.9, day=DAY)["status"] == "duplicate"
+    assert len(broker.orders) == 1
+    assert broker.positions["AAA"].qty == pytest.approx(100.0)
+
+
+def test_concurrent_duplicate_signals_fill_once(journal):
+    broker = FakeBroker(prices=PRICES, latency=0.01, drop_rate=0.3, seed=1)
+    bot = TradingBot(client=broker, journal=journal)
+    report = bot.execute_batch(_signals(*[("AAA", "BUY", 0.9)] * 4), max_workers=4, retries=5, day=DAY)
+
+    assert report["status"].isin(["submitted", "duplicate"]).all()
+    assert len(broker.orders) == 1
+    assert journal.last_status(BUY_AAA) in ("submitted", "duplicate")
@@ -52,3 +52,102 @@ def test_add_technical_features():
     ]
     for col in expected_columns:
         assert col in df_result.columns
+
+# --- Librería ampliada (kernels NumPy) ---
+
+@pytest.fixture
+def ohlcv_data():
+    rng = np.random.default_rng(7)
+    n = 120
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))))
+    spread = rng.uniform(0.001, 0.02, n)
+    return pd.DataFrame({
+        "Open": close.values,
+        "High": close.values * (1 + spread),
+        "Low": close.values * (1 - spread),
+        "Close": close.values,
+        "Volume": rng.integers(1e5, 1e6, n).astype(float),
+    })
+
+def test_calculate_atr_matches_pandas_reference(ohlcv_data):
+    h, l, c = ohlcv_data["High"], ohlcv_data["Low"], ohlcv_data["Close"]
+    prev_close = c.shift()
+    tr = pd.concat([h - l, (h - prev_close).abs(), (l - prev_close).abs()], axis=1).max(axis=1)
+    expected = tr.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+
+    atr = technical_indicators.calculate_atr(h, l, c)
+    np.testing.assert_allclose(atr, expected, equal_nan=True)
+
+def test_calculate_obv(ohlcv_data):
+    c, v = ohlcv_data["Close"], ohlcv_data["Volume"]
+    expected = (np.sign(c.diff()).fillna(0) * v).cumsum()
+    np.testing.assert_allclose(technical_indicators.calculate_obv(c, v), expected)
+
+def test_calculate_stochastic_matches_pandas_reference(ohlcv_data):
+    h, l, c = ohlcv_data["High"], ohlcv_data["Low"], ohlcv_data["Close"]
+    lowest, highest = l.rolling(14).min(), h.rolling(14).max()
+    expected_k = 100 * (c - lowest) / (highest - lowest)
+
+    stoch_k, stoch_d = technical_indicators.calculate_stochastic(h, l, c)
+    np.testing.assert_allclose(stoch_k, expected_k, equal_nan=True)
+    np.testing.assert_allclose(stoch_d, expected_k.rolling(3).mean(), equal_nan=True)
+    assert stoch_k.dropna().between(0, 100).all()
+
+def test_calculate_adx_matches_pandas_reference(ohlcv_data):
+    h, l, c = ohlcv_data["High"], ohlcv_data["Low"], ohlcv_data["Close"]
+    wilder = lambda s: s.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    up, down = h.diff(), -l.diff()
+    plus_dm = up.where((up > down) & (up > 0), 0.0)
+    minus_dm = down.where((down > up) & (down > 0), 0.0)
+    atr = technical_indicators.calculate_atr(h, l, c)
+    plus_di = 100 * wilder(plus_dm) / atr
+    minus_di = 100 * wilder(minus_dm) / atr
+    expected_adx = wilder(100 * (plus_di - minus_di).abs() / (plus_di + minus_di))
+
+    adx, p_di, m_di = technical_indicators.calculate_adx(h, l, c)
+    np.testing.assert_allclose(p_di, plus_di, equal_nan=True)
+    np.testing.assert_allclose(m_di, minus_di, equal_nan=True)
+    np.testing.assert_allclose(adx, expected_adx, equal_nan=True)
+
+def test_calculate_rolling_zscore(ohlcv_data):
+    c = ohlcv_data["Close"]
+    expected = (c - c.rolling(20).mean()) / c.rolling(20).std()
+    zscore = technical_indicators.calculate_rolling_zscore(c)
+    np.testing.assert_allclose(zscore, expected, equal_nan=True, rtol=1e-8)
+
+    # Ventana sin dispersión -> 0 en lugar de división por cero
+    flat = technical_indicators.calculate_rolling_zscore(pd.Series([5.0] * 25))
+    assert (flat.dropna() == 0).all()
+
+def test_calculate_vwap_features(ohlcv_data):
+    h, l, c, v = (ohlcv_data[col] for col in ["High", "Low", "Close", "Volume"])
+    typical = (h + l + c) / 3
+    expected_vwap = (typical * v).rolling(20).sum() / v.rolling(20).sum()
+
+    vwap, distance, ratio = technical_indicators.calculate_vwap_features(h, l, c, v)
+    np.testing.assert_allclose(vwap, expected_vwap, equal_nan=True)
+    np.testing.assert_allclose(distance, c / expected_vwap - 1, equal_nan=True)
+    np.testing.assert_allclose(ratio, v / v.rolling(20).mean(), equal_nan=True)
+
+def test_calculate_multi_horizon_returns(sample_price_data):
+    returns = technical_indicators.calculate_multi_horizon_returns(sample_price_data, horizons=(1, 5))
+    assert list(returns.columns) == ["ret_1d", "ret_5d"]
+    np.testing.assert_allclose(
+        returns["ret_1d"], technical_indicators.calculate_log_returns(sample_price_data), equal_nan=True
+    )
+    assert np.isclose(returns["ret_5d"].iloc[5], np.log(107 / 100))
+
+def test_add_technical_features_extended(ohlcv_data):
+    base = technical_indicators.add_technical_features(ohlcv_data)
+    extended = technical_indicators.add_technical_features(ohlcv_data, extended=True)
+
+    for col in technical_indicators.EXTENDED_FEATURE_COLUMNS:
+        assert col not in base.columns
+        assert col in extended.columns
+    # Las features base no cambian al activar la opción
+    pd.testing.assert_frame_equal(extended[base.columns], base)
+
+def test_add_technical_features_extended_requires_ohlcv():
+    df = pd.DataFrame({"Close": [100.0, 101.0, 102.0]})
+    with pytest.raises(ValueError):
+        technical_indicators.add_technical_features(df, extended=True)
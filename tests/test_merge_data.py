@@ -17,11 +17,12 @@ def merger():
     return DummyMerger()
 
 def test_process_sentiment_aggregation_temporal_shift(merger):
+    # Sesiones regulares: martes 3 y miércoles 4 de enero de 2023
     data = {
         "publishedAt": [
-            "2023-01-01T20:59:00Z", 
-            "2023-01-01T21:01:00Z", 
-            "2023-01-02T10:00:00Z"
+            "2023-01-03T20:59:00Z", 
+            "2023-01-03T21:01:00Z", 
+            "2023-01-04T10:00:00Z"
         ],
         "sentiment_label": ["positive", "negative", "positive"],
         "sentiment_score": [0.9, 0.8, 0.7],
@@ -31,15 +32,34 @@ def test_process_sentiment_aggregation_temporal_shift(merger):
     
     result = merger.process_sentiment_aggregation(df_sentiment)
     
-    # Check Jan 1
-    row_jan1 = result[result["date_only"] == pd.Timestamp("2023-01-01")]
-    assert len(row_jan1) == 1
-    assert np.isclose(row_jan1["daily_sentiment"].values[0], 0.9)
+    # Check Jan 3
+    row_jan3 = result[result["date_only"] == pd.Timestamp("2023-01-03")]
+    assert len(row_jan3) == 1
+    assert np.isclose(row_jan3["daily_sentiment"].values[0], 0.9)
     
-    # Check Jan 2
-    row_jan2 = result[result["date_only"] == pd.Timestamp("2023-01-02")]
-    assert len(row_jan2) == 1
-    assert np.isclose(row_jan2["daily_sentiment"].values[0], -0.05)
+    # Check Jan 4
+    row_jan4 = result[result["date_only"] == pd.Timestamp("2023-01-04")]
+    assert len(row_jan4) == 1
+    assert np.isclose(row_jan4["daily_sentiment"].values[0], -0.05)
+
+def test_process_sentiment_aggregation_rolls_to_next_session(merger):
+    df_sentiment = pd.DataFrame({
+        "publishedAt": [
+            "2024-07-05T20:30:00Z",  # Viernes 16:30 EDT -> lunes 8
+            "2024-07-06T15:00:00Z",  # Sábado -> lunes 8
+            "2024-07-03T17:30:00Z",  # 13:30 EDT en cierre anticipado (13:00) -> viernes 5
+            "2024-07-04T15:00:00Z",  # Feriado (Independence Day) -> viernes 5
+        ],
+        "sentiment_label": ["positive", "negative", "positive", "positive"],
+        "sentiment_score": [0.9, 0.5, 0.6, 0.8],
+    })
+
+    result = merger.process_sentiment_aggregation(df_sentiment).set_index("date_only")
+
+    assert list(result.index) == [pd.Timestamp("2024-07-05"), pd.Timestamp("2024-07-08")]
+    assert result.loc[pd.Timestamp("2024-07-08"), "news_volume"] == 2
+    assert np.isclose(result.loc[pd.Timestamp("2024-07-08"), "daily_sentiment"], 0.2)
+    assert np.isclose(result.loc[pd.Timestamp("2024-07-05"), "daily_sentiment"], 0.7)
 
 def test_process_sentiment_aggregation_empty(merger):
     df = pd.DataFrame()
@@ -102,3 +122,128 @@ def test_merger_main(mock_client, mock_run_pipeline):
 def test_main_execution(mock_client, mock_run_pipeline):
     merge_data.main()
     assert mock_run_pipeline.called
+
+# --- Modo incremental ---
+
+def _synthetic_prices(n_rows):
+    rng = np.random.default_rng(11)
+    close = 200 * np.exp(np.cumsum(rng.normal(0, 0.015, n_rows)))
+    dates = pd.bdate_range("2020-01-01", periods=n_rows)
+    return pd.DataFrame({
+        "Date": dates,
+        "Open": close * 0.99,
+        "High": close * 1.01,
+        "Low": close * 0.98,
+        "Close": close,
+        "Volume": rng.integers(1e6, 5e6, n_rows),
+    })
+
+def _synthetic_news(prices):
+    rng = np.random.default_rng(12)
+    # Noticias en días hábiles, antes y después del cierre (20:00 UTC ~ 15/16h NY)
+    days = prices["Date"].iloc[::3]
+    hours = rng.choice([14, 22], size=len(days))
+    return pd.DataFrame({
+        "publishedAt": (days + pd.to_timedelta(hours, unit="h")).dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "sentiment_label": rng.choice(["positive", "negative", "neutral"], size=len(days)),
+        "sentiment_score": rng.uniform(0.5, 1.0, size=len(days)),
+    })
+
+def _run_merge(tmp_path, prices, news, incremental):
+    raw_dir = tmp_path / "data" / "raw"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    for f in raw_dir.glob("*.parquet"):
+        f.unlink()
+    prices.to_parquet(raw_dir / "TEST_latest.parquet", index=False)
+
+    with patch("src.features.merge_data.storage.Client"), patch(
+        "src.features.merge_data.DataMerger.load_parquet_from_gcs", return_value=news.copy()
+    ):
+        merge_data.DataMerger("fake-bucket", ["TEST"]).run_pipeline(incremental=incremental)
+    return pd.read_parquet(tmp_path / "data" / "gold" / "master_dataset_TEST.parquet")
+
+def test_incremental_merge_matches_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    prices = _synthetic_prices(1000)
+    news = _synthetic_news(prices)
+
+    # Día 1: Gold construido con las primeras 950 sesiones
+    _run_merge(tmp_path, prices.iloc[:950], news, incremental=False)
+    # Día 2: llegan 50 sesiones nuevas -> modo incremental
+    incremental = _run_merge(tmp_path, prices, news, incremental=True)
+    # Referencia: rebuild completo con todo el histórico
+    full = _run_merge(tmp_path, prices, news, incremental=False)
+
+    assert len(incremental) == len(full)
+    assert incremental.index.equals(full.index)
+    assert merge_data.dataset_checksum(incremental) == merge_data.dataset_checksum(full)
+
+def test_update_master_dataset_noop_when_up_to_date(merger):
+    prices = _synthetic_prices(100).set_index("Date")
+    gold = prices.iloc[-10:].copy()
+
+    result = merger.update_master_dataset(prices, pd.DataFrame(), gold)
+    assert result is gold
+
+def test_dataset_checksum_detects_changes():
+    df = pd.DataFrame({"a": [1.0, 2.0]}, index=pd.to_datetime(["2024-01-01", "2024-01-02"]))
+    changed = df.copy()
+    changed.iloc[1, 0] = 2.5
+
+    assert merge_data.dataset_checksum(df) == merge_data.dataset_checksum(df.copy())
+    assert merge_data.dataset_checksum(df) != merge_data.dataset_checksum(changed)
+
+@patch("src.features.merge_data.DataMerger.run_pipeline")
+@patch("src.features.merge_data.storage.Client")
+def test_main_full_rebuild_flag(mock_client, mock_run_pipeline):
+    merge_data.main([])
+    mock_run_pipeline.assert_called_with(incremental=True)
+
+    merge_data.main(["--full-rebuild"])
+    mock_run_pipeline.assert_called_with(incremental=False)
+
+# --- Agregación multi-ticker vectorizada ---
+
+def _multi_ticker_news():
+    return pd.DataFrame({
+        "ticker": ["AAPL", "AAPL", "MSFT", "MSFT", "AAPL"],
+        "publishedAt": [
+            "2024-03-05T14:00:00Z",  # 09:00 EST -> mismo día
+            "2024-03-05T21:30:00Z",  # 16:30 EST -> día siguiente
+            "2024-03-05T15:00:00Z",
+            "2024-07-01T19:59:00Z",  # 15:59 EDT -> mismo día
+            "2024-07-01T20:00:00Z",  # 16:00 EDT -> día siguiente
+        ],
+        "sentiment_label": ["positive", "negative", "neutral", "positive", "negative"],
+        "sentiment_score": [0.9, 0.8, 0.7, 0.6, 0.5],
+    })
+
+def test_aggregate_daily_sentiment_multi_ticker_matches_per_ticker(merger):
+    news = _multi_ticker_news()
+    combined = merger.aggregate_daily_sentiment(news)
+
+    for ticker, group in news.groupby("ticker"):
+        expected = merger.process_sentiment_aggregation(group.reset_index(drop=True))
+        got = combined[combined["ticker"] == ticker].drop(columns="ticker").reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected)
+
+def test_aggregate_daily_sentiment_market_close_cutoff_with_dst(merger):
+    result = merger.aggregate_daily_sentiment(_multi_ticker_news())
+    aapl = result[result["ticker"] == "AAPL"].set_index("date_only")
+
+    assert aapl.loc[pd.Timestamp("2024-03-05"), "news_volume"] == 1
+    assert aapl.loc[pd.Timestamp("2024-03-06"), "news_volume"] == 1
+    # Horario de verano: las 20:00 UTC ya son las 16:00 en Nueva York
+    assert np.isclose(aapl.loc[pd.Timestamp("2024-07-02"), "daily_sentiment"], -0.5)
+
+    msft = result[result["ticker"] == "MSFT"].set_index("date_only")
+    assert np.isclose(msft.loc[pd.Timestamp("2024-07-01"), "daily_sentiment"], 0.6)
+
+def test_aggregate_daily_sentiment_does_not_mutate_input(merger):
+    news = _multi_ticker_news()
+    original = news.copy()
+
+    merger.aggregate_daily_sentiment(news)
+    merger.process_sentiment_aggregation(news)
+
+    pd.testing.assert_frame_equal(news, original)
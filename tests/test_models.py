@@ -58,8 +58,9 @@ def test_lstm_create_sequences_shape(input_rows, window_size, expected_sequences
 @patch("tensorflow.keras.models.Sequential.fit")
 @patch("tensorflow.keras.models.Sequential.save")
 @patch("joblib.dump")
+@patch("src.models.train_lstm.export_tflite")
 def test_lstm_train_flow_and_shapes(
-    mock_joblib_dump, mock_model_save, mock_fit, mock_load_data, mock_storage_client, mock_master_dataset
+    mock_export_tflite, mock_joblib_dump, mock_model_save, mock_fit, mock_load_data, mock_storage_client, mock_master_dataset
 ):
     """
     Prueba el flujo de entrenamiento de LSTM:
@@ -90,6 +91,7 @@ def test_lstm_train_flow_and_shapes(
     mock_model_save.assert_called_once_with("models/lstm_TEST.keras")
     mock_joblib_dump.assert_called_once()
     assert mock_joblib_dump.call_args[0][1] == "models/scaler_lstm_TEST.pkl"
+    assert mock_export_tflite.call_args[0][1] == "models/lstm_TEST.tflite"
 
 
 # --- Pruebas para train_svm.py ---
@@ -141,3 +143,238 @@ def test_svm_train_flow_and_shapes(
         mock_grid_instance.best_estimator_, "models/svm_TEST.pkl"
     )
     mock_joblib_dump.assert_any_call(ANY, "models/scaler_TEST.pkl")
+
+
+@pytest.mark.parametrize("search", ["halving", "random"])
+@patch("src.models.train_svm.storage.Client")
+@patch("src.models.train_svm.SVMTrainer.load_data")
+@patch("joblib.dump")
+def test_svm_alternative_searches_fit_and_time(
+    mock_joblib_dump, mock_load_data, mock_storage_client, mock_master_dataset, search
+):
+    """Successive halving y búsqueda aleatoria entrenan en paralelo y reportan tiempos."""
+    from sklearn.svm import SVC
+
+    mock_load_data.return_value = mock_master_dataset
+    trainer = SVMTrainer(bucket_name="fake-bucket", search=search, n_jobs=2, n_iter=4)
+
+    result = trainer.train(ticker="TEST")
+
+    saved_model = mock_joblib_dump.call_args_list[0][0][0]
+    assert isinstance(saved_model, SVC)
+    assert result["ticker"] == "TEST" and result["search"] == search
+    assert 0 <= result["search_s"] <= result["total_s"]
+    assert 0.0 <= result["accuracy"] <= 1.0
+
+
+@patch("src.models.train_svm.storage.Client")
+@patch("src.models.train_svm.SVMTrainer.load_data")
+@patch("joblib.dump")
+def test_svm_train_registers_version(
+    mock_joblib_dump, mock_load_data, mock_storage_client, mock_master_dataset
+):
+    """Con registro, el modelo y el scaler se registran con features, métricas y huella."""
+    mock_load_data.return_value = mock_master_dataset
+    registry = MagicMock()
+    registry.find.return_value = None
+    registry.register.return_value = "v0001"
+    trainer = SVMTrainer(bucket_name="fake-bucket", search="random", n_iter=2, registry=registry)
+
+    result = trainer.train(ticker="TEST")
+
+    name, artifacts = registry.register.call_args[0]
+    kwargs = registry.register.call_args[1]
+    assert name == "svm_TEST"
+    assert artifacts == {"model": "models/svm_TEST.pkl", "scaler": "models/scaler_TEST.pkl"}
+    assert "Close" not in kwargs["features"]
+    assert kwargs["metrics"]["accuracy"] == result["accuracy"]
+    assert len(kwargs["data_fingerprint"]) == 64
+    assert registry.find.call_args[0] == ("svm_TEST", kwargs["fingerprint"])
+    assert result["version"] == "v0001"
+
+
+@patch("src.models.train_svm.storage.Client")
+@patch("src.models.train_svm.SVMTrainer.load_data")
+def test_svm_train_skips_unchanged_data(
+    mock_load_data, mock_storage_client, mock_master_dataset, tmp_path, monkeypatch
+):
+    """Misma huella (datos, features, hiperparámetros, código) -> no se reentrena."""
+    from src.models.registry import ModelRegistry
+
+    monkeypatch.chdir(tmp_path)
+    mock_load_data.return_value = mock_master_dataset
+    registry = ModelRegistry(root=tmp_path / "registry")
+    trainer = SVMTrainer(bucket_name="fake-bucket", search="random", n_iter=2, registry=registry)
+
+    first = trainer.train(ticker="TEST")
+    second = trainer.train(ticker="TEST")
+    assert not first["skipped"]
+    assert second["skipped"] and second["version"] == first["version"]
+    assert second["accuracy"] == first["accuracy"]
+
+    # Datos nuevos o --force: se entrena una versión nueva
+    mock_load_data.return_value = mock_master_dataset.iloc[:-5]
+    assert trainer.train(ticker="TEST")["version"] == "v0002"
+    trainer.force = True
+    assert trainer.train(ticker="TEST")["version"] == "v0003"
+
+
+@patch("src.models.train_svm.storage.Client")
+def test_svm_invalid_search_mode(mock_storage_client):
+    with pytest.raises(ValueError):
+        SVMTrainer(bucket_name="fake-bucket", search="bayes")
+    with pytest.raises(ValueError):
+        SVMTrainer(bucket_name="fake-bucket", backend="dask")
+
+
+@patch("src.models.train_svm.storage.Client")
+@patch("src.models.train_svm.SVMTrainer.train")
+def test_svm_main_timing_report(mock_train, mock_storage_client):
+    from src.models import train_svm
+
+    mock_train.side_effect = lambda ticker: {"ticker": ticker, "total_s": 1.0}
+    timings = train_svm.main(["--search", "halving", "--n-jobs", "-1"])
+
+    assert [t["ticker"] for t in timings] == train_svm.TICKERS
+
+
+@pytest.mark.parametrize("estimator", ["nystroem", "rff"])
+@patch("src.models.train_svm.storage.Client")
+@patch("src.models.train_svm.SVMTrainer.load_data")
+@patch("joblib.dump")
+def test_svm_approximate_kernel_train(
+    mock_joblib_dump, mock_load_data, mock_storage_client, mock_master_dataset, estimator
+):
+    """El camino aproximado (kernel features + SGD lineal) se entrena y guarda como Pipeline."""
+    from sklearn.pipeline import Pipeline
+
+    mock_load_data.return_value = mock_master_dataset
+    trainer = SVMTrainer(bucket_name="fake-bucket", estimator=estimator, n_components=50)
+
+    result = trainer.train(ticker="TEST")
+
+    saved_model = mock_joblib_dump.call_args_list[0][0][0]
+    assert isinstance(saved_model, Pipeline)
+    assert result["estimator"] == estimator
+
+
+@patch("src.models.train_svm.storage.Client")
+@patch("src.models.train_svm.SVMTrainer.load_data")
+def test_svm_compare_estimators(mock_load_data, mock_storage_client, mock_master_dataset):
+    mock_load_data.return_value = mock_master_dataset
+    trainer = SVMTrainer(bucket_name="fake-bucket", search="random", n_iter=2, n_components=50)
+
+    comparison = trainer.compare_estimators("TEST")
+
+    assert list(comparison.index) == ["svc", "nystroem", "rff"]
+    assert {"accuracy", "fit_s", "n_train"} <= set(comparison.columns)
+    assert (comparison["n_train"] == 79).all()
+
+
+@patch("src.models.train_svm.storage.Client")
+def test_svm_fit_stream_partial_fit(mock_storage_client):
+    """partial_fit por batches aprende una frontera no lineal simple."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3000, 2))
+    y = (np.hypot(X[:, 0], X[:, 1]) < 1.0).astype(int)
+    batches = ((X[i : i + 500], y[i : i + 500]) for i in range(0, 2500, 500))
+
+    trainer = SVMTrainer(bucket_name="fake-bucket", estimator="rff", n_components=200)
+    scaler, model = trainer.fit_stream(batches, gamma=0.5, alpha=1e-4)
+
+    acc = (model.predict(scaler.transform(X[2500:])) == y[2500:]).mean()
+    assert acc > 0.8
+
+    with pytest.raises(ValueError):
+        SVMTrainer(bucket_name="fake-bucket").fit_stream(iter([(X, y)]))
+
+
+@patch("src.models.train_svm.storage.Client")
+@patch("src.models.train_svm.SVMTrainer.load_data")
+def test_svm_walk_forward_fold_table(mock_load_data, mock_storage_client, mock_master_dataset):
+    mock_load_data.return_value = mock_master_dataset
+    trainer = SVMTrainer(bucket_name="fake-bucket", estimator="rff", n_components=20)
+
+    folds = trainer.walk_forward("TEST", n_folds=3, mode="rolling")
+
+    assert len(folds) == 3
+    assert folds["warm_start"].tolist() == [False, True, True]
+    assert {"train_start", "test_end", "accuracy", "fit_s"} <= set(folds.columns)
+
+
+def test_make_window_dataset_gathers_same_windows_as_sequences():
+    """Las ventanas armadas con tf.gather coinciden con create_sequences."""
+    from src.models.train_lstm import make_sequences, make_window_dataset
+
+    data = np.random.rand(30, 3).astype(np.float32)
+    target = np.random.randint(0, 2, size=30).astype(np.float32)
+    X_seq, y_seq = make_sequences(data, target, 5)
+
+    ds = make_window_dataset(data, target, {0: np.arange(0, 25)}, seq_length=5, batch_size=8)
+    windows = np.concatenate([x["window"].numpy() for x, _ in ds])
+    labels = np.concatenate([y.numpy() for _, y in ds])
+
+    np.testing.assert_allclose(windows, X_seq)
+    np.testing.assert_allclose(labels, y_seq)
+
+
+@patch("src.models.train_lstm.storage.Client")
+@patch("src.models.train_lstm.LSTMTrainer.load_data")
+@patch("joblib.dump")
+def test_lstm_train_pooled(
+    mock_joblib_dump, mock_load_data, mock_storage_client, mock_master_dataset, tmp_path, monkeypatch
+):
+    """Un solo modelo con embedding de ticker y métricas por ticker."""
+    os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+    from src.models import train_lstm
+
+    monkeypatch.chdir(tmp_path)
+    datasets = {
+        "AAA": mock_master_dataset,
+        "BBB": mock_master_dataset.assign(Close=mock_master_dataset["Close"] * 10),
+        "CCC": None,
+    }
+    mock_load_data.side_effect = lambda ticker, **kwargs: datasets[ticker]
+
+    trainer = LSTMTrainer(bucket_name="fake-bucket")
+    metrics = trainer.train_pooled(["AAA", "BBB", "CCC"], epochs=1, batch_size=16)
+
+    assert list(metrics.index) == ["AAA", "BBB"]
+    assert (metrics["n_train"] == 69).all()
+    assert metrics["accuracy"].between(0, 1).all()
+    assert (tmp_path / train_lstm.POOLED_MODEL_PATH).exists()
+
+    meta, path = mock_joblib_dump.call_args[0]
+    assert path == train_lstm.POOLED_META_PATH
+    assert meta["tickers"] == ["AAA", "BBB"] and set(meta["scalers"]) == {"AAA", "BBB"}
+
+
+@patch("src.models.train_lstm.storage.Client")
+@patch("src.models.train_lstm.LSTMTrainer.load_data")
+@patch("tensorflow.keras.models.Sequential.fit")
+@patch("tensorflow.keras.models.Sequential.save")
+@patch("joblib.dump")
+@patch("src.models.train_lstm.export_tflite")
+def test_lstm_train_lazy_windows(
+    mock_export_tflite, mock_joblib_dump, mock_model_save, mock_fit, mock_load_data, mock_storage_client, mock_master_dataset
+):
+    """Con lazy_windows, fit recibe un tf.data.Dataset de ventanas (sin tensor 3D materializado)."""
+    import tensorflow as tf
+
+    os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+    mock_load_data.return_value = mock_master_dataset
+    trainer = LSTMTrainer(bucket_name="fake-bucket", lazy_windows=True)
+    trainer.train(ticker="TEST")
+
+    train_set = mock_fit.call_args[0][0]
+    assert isinstance(train_set, tf.data.Dataset)
+    windows_spec, _ = train_set.element_spec
+    assert tuple(windows_spec.shape) == (None, 10, 9)
+    assert sum(int(y.shape[0]) for _, y in train_set) == 69
+    mock_model_save.assert_called_once_with("models/lstm_TEST.keras")
+
+
+def test_make_series_dataset_insufficient_rows():
+    from src.models.train_lstm import make_series_dataset
+
+    assert make_series_dataset(np.zeros((10, 2)), np.zeros(10), seq_length=10) is None
@@ -0,0 +1,88 @@
+import io
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.data.parquet_io import (
+    read_parquet,
+    read_parquet_blob,
+    read_parquet_tail,
+    write_parquet,
+)
+
+
+@pytest.fixture
+def gold_bytes():
+    """Gold sintético desordenado: 10 años hábiles con índice 'Date'."""
+    idx = pd.bdate_range("2014-01-01", periods=2520, name="Date")
+    df = pd.DataFrame(
+        {
+            "Close": np.arange(len(idx), dtype=float),
+            "Open": 1.0,
+            "rsi_14": 50.0,
+            "Ticker": "AAPL",
+        },
+        index=idx,
+    ).sample(frac=1.0, random_state=0)
+    buf = io.BytesIO()
+    write_parquet(df, buf)
+    return buf.getvalue()
+
+
+def test_write_parquet_sorts_and_sets_row_groups(gold_bytes):
+    parquet_file = pq.ParquetFile(io.BytesIO(gold_bytes))
+    assert parquet_file.num_row_groups == 10
+
+    # Ordenado por fecha: las estadísticas de row groups consecutivos no se solapan
+    date_idx = parquet_file.schema_arrow.get_field_index("Date")
+    stats = [
+        parquet_file.metadata.row_group(i).column(date_idx).statistics
+        for i in range(parquet_file.num_row_groups)
+    ]
+    assert all(prev.max < cur.min for prev, cur in zip(stats, stats[1:]))
+
+
+def test_read_parquet_projection_and_date_range(gold_bytes):
+    df = read_parquet(
+        gold_bytes, columns=["Close", "no_existe"], start="2022-01-01", end="2022-12-31"
+    )
+
+    assert list(df.columns) == ["Close"]
+    assert df.index.name == "Date"
+    assert df.index.min() >= pd.Timestamp("2022-01-01")
+    assert df.index.max() <= pd.Timestamp("2022-12-31")
+
+    full = read_parquet(gold_bytes)
+    expected = full.loc["2022-01-01":"2022-12-31", ["Close"]]
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_read_parquet_ignores_range_without_date_column():
+    buf = io.BytesIO()
+    pd.DataFrame({"Close": [1.0, 2.0]}).to_parquet(buf)
+    df = read_parquet(buf.getvalue(), start="2022-01-01")
+    assert len(df) == 2
+
+
+def test_read_parquet_tail_reads_last_rows(gold_bytes):
+    tail = read_parquet_tail(gold_bytes, 20, columns=["Close", "rsi_14"])
+    full = read_parquet(gold_bytes)
+    pd.testing.assert_frame_equal(tail, full[["Close", "rsi_14"]].tail(20))
+
+
+def test_read_parquet_blob(gold_bytes):
+    bucket = MagicMock()
+    blob = bucket.blob.return_value
+    blob.exists.return_value = True
+    blob.download_as_bytes.return_value = gold_bytes
+
+    df = read_parquet_blob(bucket, "gold.parquet", columns=["Close"], start="2023-06-01")
+    assert list(df.columns) == ["Close"]
+    assert df.index.min() >= pd.Timestamp("2023-06-01")
+    assert len(read_parquet_blob(bucket, "gold.parquet", tail_rows=5)) == 5
+
+    blob.exists.return_value = False
+    assert read_parquet_blob(bucket, "missing.parquet") is None
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting import strategy
+
+from src.backtesting.portfolio import (
+    load_panels,
+    long_positions,
+    portfolio_backtest,
+    run_portfolio,
+    target_weights,
+)
+
+
+def _universe(n=60, k=4, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, k)), axis=0))
+    open_ = close * (1 + rng.normal(0, 0.003, (n, k)))
+    return open_, close
+
+
+def _loop_value(open_, close, weights, cash, commission):
+    """Simulación explícita con acciones y caja compartida."""
+    shares = np.zeros(open_.shape[1])
+    for t in range(1, len(open_)):
+        value = cash + shares @ open_[t]
+        value -= commission * np.abs(weights[t - 1] * value - shares * open_[t]).sum()
+        shares = weights[t - 1] * value / open_[t]
+        cash = value - shares @ open_[t]
+    return cash + shares @ close[-1]
+
+
+def test_long_positions_uses_confidence_threshold():
+    prob = np.array([[0.5], [0.58], [0.52], [0.45], [0.4]])
+    # umbral 0.1 -> compra con P > 0.55, venta con P <= 0.45
+    assert long_positions(prob, threshold=0.1)[:, 0].tolist() == [0, 1, 1, 0, 0]
+
+
+def test_target_weights_schemes():
+    long = np.array([[1, 1, 0, 0], [1, 1, 1, 1], [0, 0, 0, 0]])
+    conf = np.array([[0.6, 0.2, 0.9, 0.1], [0.4, 0.3, 0.2, 0.1], [0.5, 0.5, 0.5, 0.5]])
+
+    equal = target_weights(long, scheme="equal")
+    np.testing.assert_allclose(equal[0], [0.5, 0.5, 0, 0])
+    np.testing.assert_allclose(equal[1], [0.25] * 4)
+    np.testing.assert_allclose(equal[2], 0.0)  # sin activos en long: todo en caja
+
+    np.testing.assert_allclose(target_weights(long, conf, "confidence")[0], [0.75, 0.25, 0, 0])
+
+    capped = target_weights(long, conf, "capped", max_weight=0.3)
+    np.testing.assert_allclose(capped[1], [0.3, 0.3, 0.2, 0.1])
+    assert (capped.sum(axis=1) <= 1).all()
+
+    with pytest.raises(ValueError):
+        target_weights(long, scheme="momentum")
+    with pytest.raises(ValueError):
+        target_weights(long, scheme="confidence")
+
+
+@pytest.mark.parametrize("commission", [0.0, 0.001, 0.01])
+def test_run_portfolio_matches_share_simulation(commission):
+    open_, close = _universe()
+    rng = np.random.default_rng(1)
+    long = (rng.uniform(size=open_.shape) > 0.5).astype(np.int8)
+    weights = target_weights(long, rng.uniform(size=open_.shape), "capped", max_weight=0.4)
+
+    result = run_portfolio(open_, close, weights, cash=10000.0, commission=commission)
+    expected = _loop_value(open_, close, weights, 10000.0, commission)
+    assert result["value"][-1] == pytest.approx(expected, rel=1e-10)
+    # Ejecución al día siguiente: el día 0 no hay posición
+    assert result["exposure"][0] == 0 and result["turnover"][0] == 0
+
+
+def test_run_portfolio_cash_only_and_single_asset():
+    open_, close = _universe(k=1)
+    flat = run_portfolio(open_, close, np.zeros_like(open_), cash=5000.0)
+    np.testing.assert_allclose(flat["value"], 5000.0)
+
+    # 100% en un activo sin costos: el valor sigue al precio desde el open del día 1
+    full = run_portfolio(open_, close, np.ones_like(open_), cash=5000.0, commission=0.0)
+    assert full["value"][-1] == pytest.approx(5000.0 * close[-1, 0] / open_[1, 0])
+
+
+def test_run_portfolio_missing_prices_get_no_weight():
+    open_, close = _universe(k=2)
+    open_[:20, 1] = close[:20, 1] = np.nan  # el segundo activo empieza a cotizar el día 20
+    result = run_portfolio(open_, close, np.full(open_.shape, 0.5))
+    assert np.isfinite(result["value"]).all()
+    assert (result["weights"][:20, 1] == 0).all()
+    assert result["exposure"][5] == pytest.approx(0.5)
+
+
+def test_portfolio_backtest_aligns_panels():
+    open_, close = _universe(k=3)
+    dates = pd.bdate_range("2024-01-01", periods=len(close))
+    tickers = ["AAPL", "MSFT", "TSLA"]
+    open_df = pd.DataFrame(open_, index=dates, columns=tickers)
+    close_df = pd.DataFrame(close, index=dates, columns=tickers)
+    prob = pd.DataFrame(0.9, index=dates, columns=tickers[::-1])  # otro orden de columnas
+
+    daily = portfolio_backtest(open_df, close_df, prob, scheme="equal")
+    assert list(daily.columns) == ["value", "exposure", "turnover", "costs"]
+    assert daily.index.equals(dates)
+    assert daily["exposure"].iloc[-1] == pytest.approx(1.0)
+    assert daily["costs"].iloc[1] == pytest.approx(10000.0 * 0.001)
+
+
+def test_load_panels_skips_tickers_that_fail_to_score(monkeypatch, capsys):
+    dates = pd.bdate_range("2024-01-01", periods=5)
+    gold = pd.DataFrame({"Open": 1.0, "Close": 1.0, "rsi_14": 50.0}, index=dates)
+    raw = gold[["Open", "Close"]]  # sin Gold: solo precios crudos
+
+    def precompute(model, scaler, df, model_type):
+        if "rsi_14" not in df:
+            raise ValueError("X has 2 features, but StandardScaler is expecting 3")
+        return np.full(len(df), 0.9)
+
+    monkeypatch.setattr(strategy, "load_backtest_data", lambda t, g: gold if t == "AAPL" else raw)
+    monkeypatch.setattr(strategy, "load_strategy_model", lambda t, m, d: (object(), object()))
+    monkeypatch.setattr(strategy, "precompute_probabilities", precompute)
+
+    open_, close, prob = load_panels(["AAPL", "MSFT"])
+    assert list(close.columns) == list(prob.columns) == ["AAPL"]
+    assert "MSFT" in capsys.readouterr().out
@@ -0,0 +1,111 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.svm import SVC
+
+os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+
+from src.models.prediction_service import (
+    PredictionService,
+    signal_from_probability,
+)
+
+FEATURES = ["Close", "Volume", "rsi_14"]
+
+
+def _frame(n=15, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Close": rng.uniform(100, 200, n),
+            "Volume": rng.uniform(1e6, 2e6, n),
+            "rsi_14": rng.uniform(30, 70, n),
+            "Ticker": "X",
+        },
+        index=pd.bdate_range("2024-01-01", periods=n, name="Date"),
+    )
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    """AAA con TFLite propio; BBB y CCC servidos por el modelo pooled."""
+    from src.models.train_lstm import build_lstm_model, export_tflite
+
+    export_tflite(build_lstm_model((10, 3)), tmp_path / "lstm_AAA.tflite", 10, 3)
+    joblib.dump(MinMaxScaler().fit(_frame()[FEATURES]), tmp_path / "scaler_lstm_AAA.pkl")
+
+    (tmp_path / "lstm_pooled.keras").write_bytes(b"")
+    scalers = {t: MinMaxScaler().fit(_frame()[FEATURES]) for t in ("BBB", "CCC")}
+    joblib.dump(
+        {"tickers": ["BBB", "CCC"], "feature_cols": FEATURES, "scalers": scalers},
+        tmp_path / "lstm_pooled_meta.pkl",
+    )
+    return tmp_path
+
+
+def test_signal_from_probability():
+    assert signal_from_probability(0.9) == ("BUY", pytest.approx(0.8))
+    assert signal_from_probability(0.2) == ("SELL", pytest.approx(0.6))
+    assert signal_from_probability(0.52, hold_band=0.05)[0] == "HOLD"
+
+
+@patch("src.models.prediction_service._load_keras")
+def test_predict_all_batches_pooled_and_caches(mock_load_keras, models_dir):
+    pooled_model = MagicMock()
+    pooled_model.predict.return_value = np.array([[0.9], [0.1]])
+    mock_load_keras.return_value = pooled_model
+
+    service = PredictionService(tickers=["AAA", "BBB", "CCC", "DDD"], models_dir=models_dir)
+    data = {t: _frame(seed=i) for i, t in enumerate(["AAA", "BBB", "CCC"])}
+    data["DDD"] = _frame()
+
+    signals = service.predict_all(data)
+
+    assert list(signals.columns) == ["ticker", "signal", "confidence", "probability", "model"]
+    assert signals["model"].tolist() == ["lstm_tflite", "lstm_pooled", "lstm_pooled", None]
+
+    # Un único predict en batch para los tickers del modelo pooled
+    pooled_model.predict.assert_called_once()
+    batch = pooled_model.predict.call_args[0][0]
+    assert batch["window"].shape == (2, 10, 3)
+    assert batch["ticker"].tolist() == [0, 1]
+
+    by_ticker = signals.set_index("ticker")
+    assert by_ticker.loc["BBB", "signal"] == "BUY"
+    assert by_ticker.loc["CCC", "signal"] == "SELL"
+    assert 0.0 <= by_ticker.loc["AAA", "probability"] <= 1.0
+    assert by_ticker.loc["DDD", "signal"] == "HOLD" and by_ticker.loc["DDD", "confidence"] == 0.0
+
+    # Segunda llamada: los modelos no se vuelven a cargar
+    service.predict_all(data)
+    assert mock_load_keras.call_count == 1
+
+
+def test_predict_all_svm(tmp_path):
+    df = _frame(60).assign(macd_line=np.linspace(-1, 1, 60))
+    X = df[["rsi_14", "macd_line"]]
+    y = (X["macd_line"] > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    joblib.dump(SVC().fit(scaler.transform(X), y), tmp_path / "svm_AAA.pkl")
+    joblib.dump(scaler, tmp_path / "scaler_AAA.pkl")
+
+    service = PredictionService(tickers=["AAA"], model_type="svm", models_dir=tmp_path)
+    signals = service.predict_all({"AAA": df})
+
+    assert signals.loc[0, "model"] == "svm"
+    assert signals.loc[0, "signal"] == "BUY"  # macd_line > 0 en la última fila
+
+
+def test_load_recent_reads_local_gold_tail(tmp_path):
+    gold = tmp_path / "gold"
+    gold.mkdir()
+    _frame(40).to_parquet(gold / "master_dataset_AAA.parquet")
+
+    service = PredictionService(tickers=["AAA"], models_dir=tmp_path, gold_dir=gold)
+    assert len(service.load_recent("AAA")) == 10
+    assert service.load_recent("ZZZ") is None
@@ -0,0 +1,150 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from src.models.prediction_service import PredictionService
+from src.models.registry import ModelRegistry, data_fingerprint, training_fingerprint
+
+
+class FakeBlob:
+    def __init__(self, store, name):
+        self.store, self.name = store, name
+
+    def exists(self):
+        return self.name in self.store
+
+    def upload_from_filename(self, path):
+        with open(path, "rb") as f:
+            self.store[self.name] = f.read()
+
+    def download_to_filename(self, path):
+        with open(path, "wb") as f:
+            f.write(self.store[self.name])
+
+    def download_as_text(self):
+        return self.store[self.name].decode()
+
+
+class FakeBucket:
+    def __init__(self):
+        self.store = {}
+
+    def blob(self, name):
+        return FakeBlob(self.store, name)
+
+
+def _save_svm(tmp_path, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({"rsi_14": rng.normal(size=80), "macd_line": rng.normal(size=80)})
+    y = (X["macd_line"] > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = SVC().fit(scaler.transform(X), y)
+    joblib.dump(model, tmp_path / "svm_AAA.pkl")
+    joblib.dump(scaler, tmp_path / "scaler_AAA.pkl")
+    artifacts = {"model": tmp_path / "svm_AAA.pkl", "scaler": tmp_path / "scaler_AAA.pkl"}
+    return X, model, artifacts
+
+
+def test_register_writes_versioned_manifest(tmp_path):
+    X, _, artifacts = _save_svm(tmp_path)
+    registry = ModelRegistry(root=tmp_path / "registry")
+
+    v1 = registry.register(
+        "svm_AAA", artifacts, data_fingerprint=data_fingerprint(X),
+        features=list(X.columns), metrics={"accuracy": 0.6}, params={"C": 1},
+    )
+    v2 = registry.register("svm_AAA", artifacts, metrics={"accuracy": 0.7})
+
+    assert (v1, v2) == ("v0001", "v0002")
+    manifest = json.loads((tmp_path / "registry" / "svm_AAA" / "manifest.json").read_text())
+    assert manifest["latest"] == "v0002"
+    entry = registry.entry("svm_AAA", "v0001")
+    assert entry["features"] == ["rsi_14", "macd_line"]
+    assert entry["data_fingerprint"] == data_fingerprint(X)
+    assert len(entry["artifacts"]["model"]["sha256"]) == 64
+    assert (tmp_path / "registry" / "svm_AAA" / "v0001" / "svm_AAA.pkl").exists()
+
+
+def test_find_matches_training_fingerprint(tmp_path):
+    X, _, artifacts = _save_svm(tmp_path)
+    fp = training_fingerprint(data_fingerprint(X), X.columns, {"C": 1}, "code-a")
+    registry = ModelRegistry(root=tmp_path / "registry")
+    registry.register("svm_AAA", artifacts, fingerprint=fp)
+    registry.register("svm_AAA", artifacts)
+
+    other_code = training_fingerprint(data_fingerprint(X), X.columns, {"C": 1}, "code-b")
+    other_params = training_fingerprint(data_fingerprint(X), X.columns, {"C": 10}, "code-a")
+    assert registry.find("svm_AAA", fp) == "v0001"
+    assert registry.find("svm_AAA", other_code) is None
+    assert registry.find("svm_AAA", other_params) is None
+    assert registry.find("svm_BBB", fp) is None
+
+
+def test_load_is_mmap_backed_and_cached_by_version(tmp_path):
+    X, model, artifacts = _save_svm(tmp_path)
+    registry = ModelRegistry(root=tmp_path / "registry")
+    registry.register("svm_AAA", artifacts)
+
+    loaded = registry.load("svm_AAA")
+    assert isinstance(loaded.support_vectors_, np.memmap)
+    assert registry.load("svm_AAA") is loaded
+    scaler = registry.load("svm_AAA", "scaler")
+    np.testing.assert_array_equal(
+        loaded.predict(scaler.transform(X)), model.predict(scaler.transform(X))
+    )
+
+
+def test_refresh_hot_swaps_new_version(tmp_path):
+    _, _, artifacts = _save_svm(tmp_path)
+    writer = ModelRegistry(root=tmp_path / "registry")
+    reader = ModelRegistry(root=tmp_path / "registry")
+    writer.register("svm_AAA", artifacts)
+    first = reader.load("svm_AAA")
+
+    writer.register("svm_AAA", _save_svm(tmp_path, seed=1)[2])
+    assert reader.load("svm_AAA") is first  # sin refresh sigue la versión conocida
+    assert reader.refresh() == ["svm_AAA"]
+
+    second = reader.load("svm_AAA")
+    assert second is not first
+    assert ("svm_AAA", "v0001", "model") not in reader._cache
+
+
+def test_checksum_mismatch_raises(tmp_path):
+    _, _, artifacts = _save_svm(tmp_path)
+    registry = ModelRegistry(root=tmp_path / "registry")
+    registry.register("svm_AAA", artifacts)
+    (tmp_path / "registry" / "svm_AAA" / "v0001" / "svm_AAA.pkl").write_bytes(b"corrupto")
+
+    with pytest.raises(ValueError, match="Checksum"):
+        registry.load("svm_AAA")
+
+
+def test_bucket_registry_downloads_into_local_cache(tmp_path):
+    X, model, artifacts = _save_svm(tmp_path)
+    bucket = FakeBucket()
+    ModelRegistry(root=tmp_path / "trainer", bucket=bucket).register("svm_AAA", artifacts)
+    assert "models/registry/svm_AAA/manifest.json" in bucket.store
+
+    consumer = ModelRegistry(root=tmp_path / "consumer", bucket=bucket)
+    loaded = consumer.load("svm_AAA")
+    assert (tmp_path / "consumer" / "svm_AAA" / "v0001" / "svm_AAA.pkl").exists()
+    assert loaded.predict(np.zeros((1, 2))).shape == (1,)
+
+
+def test_prediction_service_prefers_registered_version(tmp_path):
+    X, _, artifacts = _save_svm(tmp_path)
+    registry = ModelRegistry(root=tmp_path / "registry")
+    registry.register("svm_AAA", artifacts)
+
+    service = PredictionService(
+        tickers=["AAA"], model_type="svm", models_dir=tmp_path / "empty", registry=registry
+    )
+    assert service.load_models() == {"AAA": "svm"}
+    signals = service.predict_all({"AAA": X.assign(Close=1.0)})
+    assert signals.loc[0, "signal"] in ("BUY", "SELL")
@@ -0,0 +1,165 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from src.execution.bot import TradingBot
+from src.execution.fake_broker import FakeBroker
+from src.execution.replay import (
+    BAR,
+    NEWS,
+    ReplaySimulator,
+    build_events,
+    load_bars,
+    load_news,
+    relevant_news,
+    session_close_ns,
+)
+from src.features.dataset import prepare_dataset
+from src.models.prediction_service import PredictionService
+
+
+def _gold(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + 0.5,
+            "Low": np.minimum(open_, close) - 0.5,
+            "Close": close,
+            "Volume": 1000.0,
+            "rsi_14": rng.uniform(30, 70, n),
+            "daily_sentiment": 0.0,
+            "news_volume": 0,
+        },
+        index=pd.bdate_range("2024-03-04", periods=n, name="Date"),
+    )
+
+
+@pytest.fixture
+def lake(tmp_path):
+    """Gold datasets for AAA/BBB and scored news for AAA in a temporary lake."""
+    for i, ticker in enumerate(("AAA", "BBB")):
+        _gold(seed=i).to_parquet(tmp_path / f"master_dataset_{ticker}.parquet")
+    # Positive news during the 2nd session, negative news during the 5th (UTC times)
+    pd.DataFrame(
+        {
+            "date": ["2024-03-05T15:00:00Z", "2024-03-05T16:00:00Z", "2024-03-08T15:00:00Z"],
+            "sentiment_label": ["positive", "positive", "negative"],
+            "sentiment_score": [0.9, 0.7, 0.8],
+        }
+    ).to_parquet(tmp_path / "AAA_sentiment.parquet")
+    return {
+        "gold_path": str(tmp_path / "master_dataset_{ticker}.parquet"),
+        "news_path": str(tmp_path / "{ticker}_sentiment.parquet"),
+        "models_dir": tmp_path / "models",
+    }
+
+
+class SentimentService:
+    """Buys on positive session sentiment and sells on negative, with high confidence."""
+
+    tickers = ["AAA", "BBB"]
+
+    def __init__(self):
+        self.seen = []
+
+    def predict_all(self, data=None):
+        rows = []
+        for ticker in self.tickers:
+            df = data[ticker]
+            sentiment = 0.0 if df is None else df["daily_sentiment"].iloc[-1]
+            self.seen.append((ticker, df.index[-1], sentiment))
+            signal = "BUY" if sentiment > 0 else "SELL" if sentiment < 0 else "HOLD"
+            rows.append({"ticker": ticker, "signal": signal, "confidence": 0.9})
+        return pd.DataFrame(rows)
+
+
+def test_events_are_time_ordered_with_news_before_close(lake):
+    bars = load_bars(["AAA", "BBB", "ZZZ"], gold_path=lake["gold_path"])
+    news = relevant_news(load_news(["AAA"], news_path=lake["news_path"]), bars)
+    assert set(bars) == {"AAA", "BBB"}
+
+    events = build_events(bars, news)
+    assert len(events) == 2 * 40 + 3
+    assert (np.diff(events["timestamp"]) >= 0).all()
+    # 2024-03-05 closes at 16:00 New York = 21:00 UTC; both news arrive before that bar
+    close = session_close_ns(pd.DatetimeIndex(["2024-03-05"]))[0]
+    assert pd.Timestamp(close, tz="UTC") == pd.Timestamp("2024-03-05 21:00", tz="UTC")
+    day = events[events["timestamp"] <= close]
+    assert day["kind"].tolist() == [BAR, BAR, NEWS, NEWS, BAR, BAR]
+
+
+def test_replay_drives_features_predictions_and_fills(lake):
+    bars = load_bars(["AAA", "BBB"], gold_path=lake["gold_path"])
+    news = load_news(["AAA"], news_path=lake["news_path"])
+    broker = FakeBroker(cash=100_000.0)
+    service = SentimentService()
+
+    bot = TradingBot(client=broker)
+    report = ReplaySimulator(bot, service, bars, news).run()
+
+    assert report.sessions == 40
+    # Session sentiment comes from the news replayed so far (mean of label * score)
+    sentiment = {(t, d): s for t, d, s in service.seen}
+    assert sentiment[("AAA", pd.Timestamp("2024-03-05"))] == pytest.approx(0.8)
+    assert sentiment[("AAA", pd.Timestamp("2024-03-08"))] == pytest.approx(-0.8)
+    assert sentiment[("BBB", pd.Timestamp("2024-03-05"))] == 0.0
+
+    # One $10k buy at the 2024-03-05 close and the matching sell on 2024-03-08
+    fills = report.fills
+    assert fills["side"].tolist() == ["buy", "sell"]
+    assert fills["notional"].iloc[0] == pytest.approx(10_000.0)
+    assert fills["price"].iloc[0] == pytest.approx(bars["AAA"].loc["2024-03-05", "Close"])
+    assert fills["qty"].iloc[1] == pytest.approx(fills["qty"].iloc[0])
+    assert not broker.positions
+    # Fills reach the bot's cache through the stream, ahead of any wall-clock poll
+    assert bot.state.streaming
+    assert bot.state.buying_power == pytest.approx(broker.cash)
+
+    latency = report.latency.set_index("stage")
+    assert latency.loc["decision", "count"] == 40
+    assert latency.loc["order", "count"] == 80
+    assert (latency["p99_ms"] >= latency["p50_ms"]).all()
+    hist = report.histograms
+    assert hist.groupby("stage")["count"].sum()["prediction"] == 40
+
+
+def test_replay_paces_to_speed(lake):
+    bars = load_bars(["AAA"], gold_path=lake["gold_path"])
+    service = SentimentService()
+    service.tickers = ["AAA"]
+    waits = []
+    ReplaySimulator(
+        TradingBot(client=FakeBroker()), service, bars, speed=86_400, sleep=waits.append
+    ).run(max_sessions=3)
+    # One market day per wall second; the fake sleep does not advance the wall clock,
+    # so each wait is the full offset of that close from the first one
+    assert waits == pytest.approx([1.0, 2.0], abs=0.1)
+
+
+def test_replay_with_prediction_service(lake, tmp_path):
+    """Same loop with the production PredictionService (SVM) scoring from the replay frames."""
+    df = _gold(n=40)
+    dataset = prepare_dataset(df, feature_set="svm")
+    scaler = StandardScaler().fit(dataset.X)
+    lake["models_dir"].mkdir()
+    joblib.dump(SVC().fit(scaler.transform(dataset.X), dataset.y), lake["models_dir"] / "svm_AAA.pkl")
+    joblib.dump(scaler, lake["models_dir"] / "scaler_AAA.pkl")
+
+    bars = load_bars(["AAA"], gold_path=lake["gold_path"])
+    service = PredictionService(tickers=["AAA"], model_type="svm", models_dir=lake["models_dir"])
+    report = ReplaySimulator(TradingBot(client=FakeBroker()), service, bars).run()
+
+    assert len(report.signals) == 40
+    assert report.signals["model"].eq("svm").all()
+    saved = report.save(tmp_path / "replay")
+    assert pd.read_parquet(saved / "latency.parquet")["stage"].tolist()[:3] == [
+        "features",
+        "prediction",
+        "execution",
+    ]
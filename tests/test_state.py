@@ -0,0 +1,170 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.trading.requests import MarketOrderRequest
+
+from src.execution.bot import TradingBot
+from src.execution.fake_broker import FakeBroker
+from src.execution.state import BrokerState
+
+PRICES = {"AAA": 100.0, "BBB": 50.0, "CCC": 20.0, "DDD": 10.0}
+
+
+def _buy(symbol, notional=1000):
+    return MarketOrderRequest(
+        symbol=symbol, notional=notional, side=OrderSide.BUY, time_in_force=TimeInForce.DAY
+    )
+
+
+def _signals(*rows):
+    return pd.DataFrame(rows, columns=["ticker", "signal", "confidence"])
+
+
+def test_state_loads_once_at_startup():
+    broker = FakeBroker(prices=PRICES)
+    broker.submit_order(_buy("AAA"))
+    bot = TradingBot(client=broker)
+
+    assert bot.state.loaded and bot.state.positions == {"AAA": pytest.approx(10.0)}
+    assert bot.state.buying_power == pytest.approx(99_000.0)
+    for _ in range(5):
+        assert bot.check_market_status()
+    assert broker.requests["get_clock"] == 1
+    assert broker.requests["get_account"] == broker.requests["get_all_positions"] == 1
+
+
+def test_clock_is_reread_past_its_next_close():
+    start = datetime(2024, 3, 4, 15, tzinfo=timezone.utc)
+    broker = FakeBroker(now=start)
+    now = [start]
+    state = BrokerState(broker, now=lambda: now[0])
+    state.load()
+
+    now[0] = start + timedelta(hours=6)
+    state.market_open()
+    assert broker.requests["get_clock"] == 1
+
+    broker.is_open = False
+    now[0] = start + timedelta(hours=7)  # past next_close (6h30)
+    assert not state.market_open()
+    assert broker.requests["get_clock"] == 2
+
+
+def test_no_op_sells_and_unaffordable_buys_skip_the_broker():
+    broker = FakeBroker(cash=25_000.0, prices=PRICES)
+    bot = TradingBot(client=broker)
+
+    report = bot.execute_batch(
+        _signals(
+            ("AAA", "BUY", 0.9),
+            ("BBB", "BUY", 0.9),
+            ("CCC", "BUY", 0.9),
+            ("DDD", "SELL", 0.9),
+        ),
+        max_workers=4,
+    )
+    status = report.set_index("ticker")["status"]
+    assert sorted(status[["AAA", "BBB", "CCC"]]) == ["insufficient_funds", "submitted", "submitted"]
+    assert status["DDD"] == "no_position"
+    assert broker.requests["submit_order"] == 2
+    assert broker.requests["close_position"] == 0
+    assert bot.state.buying_power == pytest.approx(5_000.0)
+    assert len(bot.state.positions) == 2
+
+
+def test_rejected_buy_releases_its_reservation():
+    broker = FakeBroker(cash=10_000.0, prices=PRICES)
+    bot = TradingBot(client=broker)
+    assert bot.execute_trade("EEE", "BUY", 0.9)["status"] == "failed"  # no price
+    assert bot.state.buying_power == pytest.approx(10_000.0)
+    assert bot.execute_trade("AAA", "BUY", 0.9)["status"] == "submitted"
+
+
+def test_stale_position_is_dropped_on_404():
+    broker = FakeBroker(prices=PRICES)
+    bot = TradingBot(client=broker)
+    bot.execute_trade("AAA", "BUY", 0.9)
+    broker.close_position("AAA")  # closed outside the bot
+
+    assert bot.execute_trade("AAA", "SELL", 0.9)["status"] == "no_position"
+    assert not bot.state.has_position("AAA")
+
+
+def test_stream_fills_update_positions_and_buying_power():
+    broker = FakeBroker(cash=50_000.0, prices=PRICES)
+    state = BrokerState(broker)
+    state.load()
+    thread = state.start_stream(broker)
+
+    broker.submit_order(_buy("AAA", notional=5_000))  # e.g. placed from the dashboard
+    assert state.positions == {"AAA": pytest.approx(50.0)}
+    assert state.buying_power == pytest.approx(broker.cash) == pytest.approx(45_000.0)
+    assert state.refresh_if_stale() is False  # the stream keeps it current
+
+    broker.close_position("AAA")
+    assert not state.positions
+    assert state.buying_power == pytest.approx(broker.cash) == pytest.approx(50_000.0)
+
+    state.stop_stream()
+    thread.join(timeout=1)
+    assert not state.streaming
+    assert state.refresh_if_stale() is True  # fills may have been missed: poll again
+
+
+def test_stream_and_bot_orders_apply_cash_once():
+    broker = FakeBroker(cash=50_000.0, prices=PRICES)
+    bot = TradingBot(client=broker)
+    bot.state.start_stream(broker)
+
+    bot.execute_trade("AAA", "BUY", 0.9)  # reserved by the bot, filled on the stream
+    assert bot.state.buying_power == pytest.approx(broker.cash)
+    bot.execute_trade("AAA", "SELL", 0.9)  # credited by the stream and by the close
+    assert bot.state.buying_power == pytest.approx(broker.cash) == pytest.approx(50_000.0)
+    bot.state.stop_stream()
+
+
+def test_sell_proceeds_are_available_before_the_next_poll():
+    broker = FakeBroker(cash=20_000.0, prices=PRICES)
+    bot = TradingBot(client=broker)
+
+    statuses = [
+        bot.execute_trade(ticker, signal, 0.9)["status"]
+        for ticker, signal in [("AAA", "BUY"), ("AAA", "SELL"), ("BBB", "BUY"), ("CCC", "BUY")]
+    ]
+    assert statuses == ["submitted"] * 4
+    assert broker.requests["get_account"] == 1  # no poll in between
+    assert bot.state.buying_power == pytest.approx(broker.cash) == pytest.approx(0.0)
+
+
+def test_unfilled_close_forces_a_reread():
+    broker = FakeBroker(prices=PRICES)
+    state = BrokerState(broker)
+    state.load()
+    state.closed("AAA", order=type("Order", (), {"id": "o-1", "filled_qty": "0", "filled_avg_price": None})())
+    assert state.refresh_if_stale() is True
+
+
+def test_polling_fallback_without_stream():
+    broker = FakeBroker(prices=PRICES)
+    state = BrokerState(broker, poll_interval=0.05)
+    state.load()
+    broker.submit_order(_buy("BBB"))
+
+    assert state.refresh_if_stale() is False
+    assert not state.has_position("BBB")
+    time.sleep(0.06)
+    assert state.refresh_if_stale() is True
+    assert state.has_position("BBB")
+
+
+def test_bot_decides_without_cache_when_broker_is_down():
+    broker = FakeBroker(prices=PRICES, error_rate=1.0, seed=0)
+    bot = TradingBot(client=broker)
+    assert not bot.state.loaded
+
+    broker.error_rate = 0.0
+    assert bot.execute_trade("AAA", "SELL", 0.9)["status"] == "no_position"
+    assert bot.state.loaded  # loaded by the next refresh
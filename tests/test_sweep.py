@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from src.backtesting import sweep
+from src.features.dataset import prepare_dataset
+
+
+@pytest.fixture
+def sweep_dirs(tmp_path):
+    """Dataset Maestro y SVM entrenado para el ticker AAA en directorios temporales."""
+    rng = np.random.default_rng(0)
+    n = 150
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    df = pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + 0.5,
+            "Low": np.minimum(open_, close) - 0.5,
+            "Close": close,
+            "Volume": 1000.0,
+            "rsi_14": rng.uniform(30, 70, n),
+            "macd_line": rng.normal(0, 1, n),
+        },
+        index=pd.bdate_range("2023-01-02", periods=n, name="Date"),
+    )
+    df.to_parquet(tmp_path / "master_dataset_AAA.parquet")
+
+    dataset = prepare_dataset(df, feature_set="svm")
+    scaler = StandardScaler().fit(dataset.X)
+    models = tmp_path / "models"
+    models.mkdir()
+    joblib.dump(SVC().fit(scaler.transform(dataset.X), dataset.y), models / "svm_AAA.pkl")
+    joblib.dump(scaler, models / "scaler_AAA.pkl")
+
+    sweep._worker_cache.clear()
+    return {
+        "gold_path": str(tmp_path / "master_dataset_{ticker}.parquet"),
+        "prices_path": str(tmp_path / "missing_{ticker}.parquet"),
+        "models_dir": str(models),
+        "results_path": tmp_path / "results.parquet",
+    }
+
+
+def test_build_grid_stable_ids():
+    grid = sweep.build_grid(["AAA", "BBB"], ["SVM"], [0.0, 0.2], [0.001])
+    assert len(grid) == 4
+    assert len({c["config_id"] for c in grid}) == 4
+    assert sweep.build_grid(["AAA"], ["SVM"], [0.0], [0.001])[0]["config_id"] == grid[0]["config_id"]
+
+
+def test_sweep_runs_and_resumes(sweep_dirs):
+    grid = sweep.build_grid(["AAA", "ZZZ"], ["SVM"], [0.0, 0.1, 0.3], [0.001, 0.002])
+    kwargs = {k: sweep_dirs[k] for k in ("gold_path", "prices_path", "models_dir")}
+
+    results = sweep.run_sweep(grid, sweep_dirs["results_path"], workers=0, **kwargs)
+
+    assert len(results) == 12
+    ok = results[results["status"] == "ok"]
+    assert set(ok["ticker"]) == {"AAA"} and len(ok) == 6
+    assert (results.loc[results["ticker"] == "ZZZ", "error"] == "sin datos").all()
+    assert {"final_value", "sharpe", "sortino", "max_drawdown", "hit_rate", "n_trades"} <= set(ok.columns)
+    stored = pd.read_parquet(sweep_dirs["results_path"])
+    assert stored.shape[0] == 12
+    # Métricas en float32; parámetros y valor final exactos
+    assert stored["sharpe"].dtype == np.float32 and stored["threshold"].dtype == np.float64
+
+    # Reanudación: solo se reintentan las configuraciones con error
+    with patch("src.backtesting.sweep.run_task", wraps=sweep.run_task) as spy:
+        again = sweep.run_sweep(grid, sweep_dirs["results_path"], workers=0, **kwargs)
+    assert [call.args[0] for call in spy.call_args_list] == ["ZZZ"]
+    assert len(again) == 12
+
+
+def test_vectorized_and_backtrader_engines_agree(sweep_dirs):
+    kwargs = {k: sweep_dirs[k] for k in ("gold_path", "prices_path", "models_dir")}
+    rows = {}
+    for engine in sweep.ENGINES:
+        configs = sweep.build_grid(["AAA"], ["SVM"], [0.1], [0.001], engine=engine)
+        rows[engine] = sweep.run_task("AAA", "SVM", configs, **kwargs)[0]
+
+    assert rows["vectorized"]["final_value"] == pytest.approx(rows["backtrader"]["final_value"])
+    assert rows["vectorized"]["n_trades"] == rows["backtrader"]["n_trades"]
+    for key in ("sharpe", "sortino", "max_drawdown", "turnover", "exposure", "hit_rate"):
+        assert rows["vectorized"][key] == pytest.approx(rows["backtrader"][key]), key
+
+
+def test_sweep_process_pool(sweep_dirs):
+    grid = sweep.build_grid(["AAA"], ["SVM"], [0.0, 0.2], [0.001])
+    kwargs = {k: sweep_dirs[k] for k in ("gold_path", "prices_path", "models_dir")}
+    results = sweep.run_sweep(grid, sweep_dirs["results_path"], workers=1, **kwargs)
+    assert (results["status"] == "ok").all() and len(results) == 2
+
+
+def test_evaluation_errors_become_error_rows(sweep_dirs):
+    kwargs = {k: sweep_dirs[k] for k in ("gold_path", "prices_path", "models_dir")}
+    configs = sweep.build_grid(["AAA"], ["SVM"], [0.0, 0.2], [0.001])
+    with patch("src.backtesting.sweep.run_vectorized", side_effect=ValueError("boom")):
+        rows = sweep.run_task("AAA", "SVM", configs, **kwargs)
+    assert [row["status"] for row in rows] == ["error", "error"]
+    assert rows[0]["error"] == "ValueError: boom"
+
+
+def test_main_without_successful_configs(tmp_path, capsys):
+    output = str(tmp_path / "results.parquet")
+    results = sweep.main(["--tickers", "ZZZ", "--model-types", "SVM", "--workers", "0", "--output", output])
+    assert (results["status"] == "error").all()
+    assert "configuraciones con error" in capsys.readouterr().out
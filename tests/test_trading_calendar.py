@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.trading_calendar import TradingCalendar, get_nyse_calendar
+
+
+def _utc_ns(*timestamps):
+    return pd.to_datetime(list(timestamps), utc=True).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _as_dates(days):
+    return list(days.astype("datetime64[D]").astype(str))
+
+
+@pytest.fixture
+def calendar():
+    return get_nyse_calendar()
+
+
+def test_calendar_arrays_are_sorted_int64(calendar):
+    for arr in (calendar.sessions, calendar.opens, calendar.closes):
+        assert arr.dtype == np.int64
+        assert np.all(np.diff(arr) > 0)
+    assert np.all(calendar.opens < calendar.closes)
+
+
+def test_calendar_excludes_weekends_and_holidays(calendar):
+    dates = calendar.session_dates
+    assert (dates.dayofweek < 5).all()
+    for holiday in ["2024-01-01", "2024-07-04", "2024-12-25", "2023-01-02", "2024-03-29"]:
+        assert pd.Timestamp(holiday) not in dates
+
+
+def test_session_days_maps_after_close_weekend_and_early_close(calendar):
+    days = calendar.session_days(
+        _utc_ns(
+            "2024-11-26 20:59",  # martes 15:59 EST -> martes
+            "2024-11-26 21:00",  # martes 16:00 EST -> miércoles
+            "2024-11-28 15:00",  # Thanksgiving -> viernes
+            "2024-11-29 18:30",  # viernes tras el cierre anticipado (13:00 EST) -> lunes
+            "2024-11-30 12:00",  # sábado -> lunes
+        )
+    )
+    assert _as_dates(days) == [
+        "2024-11-26", "2024-11-27", "2024-11-29", "2024-12-02", "2024-12-02"
+    ]
+
+
+def test_session_days_out_of_range_returns_minus_one():
+    calendar = TradingCalendar(
+        sessions=np.array([19724]),  # 2024-01-02
+        opens=_utc_ns("2024-01-02 14:30"),
+        closes=_utc_ns("2024-01-02 21:00"),
+    )
+    days = calendar.session_days(
+        _utc_ns("2024-01-01 12:00", "2024-01-02 14:00", "2024-01-02 15:00", "2024-01-03 15:00")
+    )
+    # Antes de la primera apertura no se sabe si la noticia es de esta sesión
+    assert list(days) == [-1, -1, 19724, -1]
+    assert list(calendar.session_index(_utc_ns("2023-12-29 15:00", "2024-01-02 15:00"))) == [-1, 0]
+
+
+def test_news_before_calendar_start_is_flagged(calendar):
+    first_open = pd.Timestamp(calendar.opens[0], tz="UTC")
+    days = calendar.session_days(_utc_ns(str(first_open - pd.Timedelta(days=400)), str(first_open)))
+    assert days[0] == -1 and days[1] == calendar.sessions[0]
+
+
+def test_calendar_save_load_roundtrip(calendar, tmp_path):
+    path = tmp_path / "sessions.npz"
+    calendar.save(path)
+    loaded = TradingCalendar.load(path)
+    np.testing.assert_array_equal(loaded.closes, calendar.closes)
+    np.testing.assert_array_equal(loaded.sessions, calendar.sessions)
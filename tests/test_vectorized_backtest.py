@@ -0,0 +1,101 @@
+import contextlib
+import io
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.strategy import MLStrategy
+from src.backtesting.vectorized import (
+    COMMISSION,
+    START_CASH,
+    holding_positions,
+    momentum_signals,
+    positions_from_signals,
+    run_vectorized,
+    sweep_thresholds,
+    threshold_signals,
+)
+
+
+def _prices(n=250, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + 0.5,
+            "low": np.minimum(open_, close) - 0.5,
+            "close": close,
+            "volume": 1000,
+        },
+        index=pd.bdate_range("2020-01-01", periods=n),
+    )
+
+
+def test_positions_from_signals_long_flat():
+    entries = np.array([0, 1, 0, 1, 0, 0, 0], dtype=bool)
+    exits = np.array([1, 0, 0, 0, 1, 0, 1], dtype=bool)
+    assert positions_from_signals(entries, exits)[:, 0].tolist() == [0, 1, 1, 1, 0, 0, 0]
+
+
+def test_holding_positions_renews_on_signal():
+    entries = np.array([1, 0, 0, 0, 1, 0, 0, 0], dtype=bool)
+    assert holding_positions(entries, 2)[:, 0].tolist() == [1, 1, 0, 0, 1, 1, 0, 0]
+
+
+def test_next_bar_execution_and_commission():
+    open_ = np.array([10.0, 11.0, 12.0, 13.0])
+    close = np.array([10.5, 11.5, 12.5, 13.5])
+    result = run_vectorized(open_, close, np.array([1, 1, 0, 1]), cash=100.0)
+
+    # Compra al open de la barra 1, vende al open de la 3; la señal final no se ejecuta
+    assert result["position"][:, 0].tolist() == [0, 1, 1, 0]
+    expected = 100.0 - 11.0 * (1 + COMMISSION) + 13.0 * (1 - COMMISSION)
+    assert result["final_value"][0] == pytest.approx(expected)
+    assert result["n_trades"][0] == 2
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_cerebro_on_ml_strategy(seed):
+    df = _prices(seed=seed)
+    cerebro = bt.Cerebro()
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.addstrategy(MLStrategy)
+    cerebro.broker.setcash(START_CASH)
+    cerebro.broker.setcommission(commission=COMMISSION)
+    with contextlib.redirect_stdout(io.StringIO()):
+        cerebro.run()
+
+    entries, exits = momentum_signals(df["close"].to_numpy())
+    result = run_vectorized(
+        df["open"].to_numpy(), df["close"].to_numpy(), positions_from_signals(entries, exits)
+    )
+    assert result["final_value"][0] == pytest.approx(cerebro.broker.getvalue(), rel=1e-12)
+
+
+def test_sweep_columns_match_single_runs():
+    df = _prices()
+    prob = np.random.default_rng(3).uniform(0, 1, len(df))
+    open_, close = df["open"].to_numpy(), df["close"].to_numpy()
+
+    table = sweep_thresholds(open_, close, prob, [0.5, 0.6], [0.0, 0.1], [None, 3])
+    assert len(table) == 8
+
+    mask = (table["buy_threshold"] == 0.6) & (table["sell_threshold"] == 0.5)
+    row = table[mask & table["holding"].isna()].iloc[0]
+    single = run_vectorized(
+        open_, close, positions_from_signals(prob > 0.6, prob <= 0.5)
+    )["final_value"][0]
+    assert row["final_value"] == pytest.approx(single)
+
+
+def test_exit_on_tie_with_sell_threshold():
+    # Con offset de venta 0, p == umbral no compra y cierra la posición (como MLStrategy)
+    prob = np.array([0.7, 0.5, 0.7, 0.4])
+    entries, exits = threshold_signals(prob, 0.5)
+    assert entries[:, 0].tolist() == [True, False, True, False]
+    assert exits[:, 0].tolist() == [False, True, False, True]
+    assert positions_from_signals(entries, exits)[:, 0].tolist() == [1, 0, 1, 0]
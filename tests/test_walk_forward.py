@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.walk_forward import (
+    SGDFoldModel,
+    SVCFoldModel,
+    WalkForwardEngine,
+    walk_forward_splits,
+)
+
+
+@pytest.fixture
+def xy():
+    """Serie sintética con una frontera no lineal estable en el tiempo."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 3))
+    y = (X[:, 0] * X[:, 1] > 0).astype(int)
+    index = pd.bdate_range("2020-01-01", periods=len(X))
+    return X, y, index
+
+
+def test_walk_forward_splits_expanding_and_rolling():
+    expanding = walk_forward_splits(120, n_folds=5)
+    assert [(tr.start, tr.stop, te.start, te.stop) for tr, te in expanding[:2]] == [
+        (0, 20, 20, 40),
+        (0, 40, 40, 60),
+    ]
+    assert expanding[-1][1].stop == 120
+
+    rolling = walk_forward_splits(120, n_folds=5, mode="rolling", train_size=30)
+    assert [(tr.start, tr.stop) for tr, _ in rolling] == [
+        (0, 20),
+        (10, 40),
+        (30, 60),
+        (50, 80),
+        (70, 100),
+    ]
+
+    with pytest.raises(ValueError):
+        walk_forward_splits(5, n_folds=10)
+    with pytest.raises(ValueError):
+        walk_forward_splits(100, mode="anchored")
+
+
+def test_engine_warm_start_chains_sgd_folds(xy):
+    X, y, index = xy
+    engine = WalkForwardEngine(SGDFoldModel(kernel="rff", gamma=0.5, n_components=100), n_folds=4)
+
+    folds = engine.run(X, y, index=index)
+
+    assert list(folds.index) == [0, 1, 2, 3]
+    assert folds["warm_start"].tolist() == [False, True, True, True]
+    assert folds["test_start"].iloc[0] == index[120]
+    assert (folds["accuracy"] > 0.6).all()
+
+    # El mapa de features y el scaler se heredan del primer fold
+    assert engine.last_model_.features is not None
+    assert engine.last_model_.clf.coef_.shape == (1, 100)
+
+
+def test_sgd_warm_start_uses_previous_coefficients(xy):
+    X, y, _ = xy
+    first = SGDFoldModel(kernel=None).fit(X[:300], y[:300])
+    warm = SGDFoldModel(kernel=None).fit(X[:400], y[:400], previous=first)
+
+    assert warm.scaler is first.scaler
+    assert warm.clf.n_iter_ <= SGDFoldModel(kernel=None).fit(X[:400], y[:400]).clf.n_iter_
+
+
+def test_engine_parallel_independent_folds_match_serial(xy):
+    X, y, _ = xy
+    serial = WalkForwardEngine(SVCFoldModel(), n_folds=3, mode="rolling").run(X, y)
+    parallel = WalkForwardEngine(SVCFoldModel(), n_folds=3, mode="rolling", n_jobs=2).run(X, y)
+
+    assert not serial["warm_start"].any()
+    pd.testing.assert_frame_equal(
+        serial.drop(columns="fit_s"), parallel.drop(columns="fit_s")
+    )
+
+
+def test_lstm_fold_model_warm_start(xy):
+    os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+    from src.models.train_lstm import LSTMFoldModel
+
+    X, y, _ = xy
+    engine = WalkForwardEngine(LSTMFoldModel(epochs=1, warm_epochs=1), n_folds=2)
+    folds = engine.run(X[:180], y[:180])
+
+    assert folds["warm_start"].tolist() == [False, True]
+    assert (folds["n_test"] == 60).all()
+    assert engine.last_model_.model.predict(np.zeros((1, 10, 3)), verbose=0).shape == (1, 1)
+
+
+def test_lstm_fold_model_lazy_predictions_match_materialized(xy):
+    os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+    from src.models.train_lstm import LSTMFoldModel
+
+    X, y, _ = xy
+    fold_model = LSTMFoldModel(epochs=1, lazy_windows=True).fit(X[:100], y[:100])
+    lazy_pred = fold_model.predict(X[90:140])
+
+    fold_model.lazy_windows = False
+    np.testing.assert_array_equal(lazy_pred, fold_model.predict(X[90:140]))
+    assert len(lazy_pred) == 40